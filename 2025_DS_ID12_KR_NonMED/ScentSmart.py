@@ -4,7 +4,6 @@ import sys
 import json
 import struct
 import xlsxwriter
-import serial
 
 from datetime import datetime
 
@@ -18,16 +17,31 @@ from PySide6.QtUiTools import QUiLoader
 from PySide6.QtWidgets import QApplication, QWidget, QTableWidgetItem, QScroller, QAbstractItemView, QLineEdit
 
 import dsSerial
+import dsCalibration
+import dsCleaning
 import dsComm
+import dsConsole
+import dsDevice
+import dsDeviceManager
+import dsDiscovery
+import dsLink
+import dsRegister
+import dsMetrics
+import dsScheduler
 import dsSetting
 import dsSound, dsText, dsUtils, dsUiCustom
 import dsTest, dsTestTH, dsTestDC, dsTestID 
 import dsTestDB
+import dsTelemetry
 import dsTrainST, dsTrainSTDB
 import dsTrainID
+import dsUiLoader
+import dsImage
+import dsImageCache
+import dsResource
 
-from dsImage import dsBtnImg, dsBgImg, dsResultImg
-from dsUiChartWidget import scentPieChartWidget, scentLineChartWidget
+from dsImage import dsBgImg, dsResultImg
+from dsUiChartWidget import scentPieChartWidget, scentLineChartWidget, scentSparklineWidget
 from dsUiCustom import scentSlider
 
 os.environ["PYSIDE_DESIGNER_PLUGINS"] = "."
@@ -39,46 +53,133 @@ class UiDlg(QWidget):
     ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
     def __init__(self):
         super().__init__()
+        # 시작시 설정 반영 (serial_backend 등 연결 생성 시 읽는 설정이 있으므로 먼저)
+        self.loadSettingsFile()
         # 시리얼 통신 수신 설정
         self.setSerialReadThread()
-        # 시작시 설정 반영
-        self.loadSettingsFile()
+        # 온도/압력 주기 측정
+        if dsSetting.dsParam['telemetry_onoff'] == 1:
+            self.telemetry.start(dsSetting.dsParam['telemetry_interval_ms'])
+        # 송수신 기록 (현장 문제 재현용)
+        if dsSetting.dsParam['capture_onoff'] == 1:
+            self.device_manager.startCapture()
+        if dsSetting.dsParam['link_monitor_onoff'] == 1:
+            self.link_monitor.start()
+
+    # 아직 로딩하지 않은 다이얼로그는 처음 사용할 때 로딩
+    def __getattr__(self, name):
+        dialogs = self.__dict__.get('dialogs')
+        if dialogs is not None and dialogs.loadFor(name):
+            return self.__dict__[name]
+        raise AttributeError(name)
 
     # 다이얼로그 종료시 오류 해결
     def closeEvent(self, event):
+        self.exportMetrics()
+        # 다이얼로그별 로딩 시간
+        if 'dialogs' in self.__dict__:
+            print("dialogs: ", self.dialogs.export())
+        dsImageCache.printStats()
+        # 발향 유량 보정 결과 (검사 중에는 발향마다 출력하지 않음)
+        flow_compensator = self.__dict__.get('flow_compensator')
+        if flow_compensator is not None and flow_compensator.update_count:
+            print("FlowCompensator: ", flow_compensator.stats())
+        # 진행 중인 분 단위 온도/압력 저장
+        self.telemetry.stop()
+        self.link_monitor.stop()
+        # 포트 탐색 중이면 중단 (탐색 중인 포트를 닫을 때까지 대기)
+        port_discovery = self.__dict__.get('port_discovery')
+        if port_discovery is not None:
+            port_discovery.stop()
+        # 포트를 닫고 수신 스레드 종료
+        self.device_manager.shutdown()
         self.deleteLater()
+
+    # 송수신 지연 측정 결과를 세션 파일(JSON/CSV)로 저장
+    def exportMetrics(self):
+        if not self.metrics.hasSamples():
+            return None
+        paths = self.metrics.export()
+        print("exportMetrics: ", paths)
+        return paths
     
     ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
-    # 시리얼 통신 설정 (Signal, Thread, Read, Write, Console지정)
-    _serial_received_data = Signal(bytes, name="serialReceivedData")
-
+    # 시리얼 통신 설정 (Thread, Read, Write, Console지정)
     def setSerialReadThread(self):
-        self._serial = serial.Serial()
-        self._serial_read_thread = dsSerial.SerialReadThread(self._serial)
-        self._serial_read_thread._serial_received_data.connect(lambda v: self._serial_received_data.emit(v))
-        self._serial_received_data.connect(self.readSerialData)
-        self._serial_read_thread.start(QtCore.QThread.Priority.HighestPriority)
-    
-    def readSerialData(self, rdata):
-        self._serial_console.append("RX(%d):"%len(rdata) + str(rdata.hex()))
-        self._serial_console.moveCursor(QtGui.QTextCursor.End)
-        print("RX(%d):"%len(rdata) + str(rdata.hex()))
-        self.parseReadData(rdata)
+        # 송수신 단계별 지연 측정
+        self.metrics = dsMetrics.metrics
+        # 송수신 콘솔 (링 버퍼, 20 Hz로 묶어서 표시)
+        self.serial_console = dsConsole.SerialConsole(self)
+        # 송신 프레임 구성 (버퍼 재사용)
+        self.frame_builder = dsComm.FrameBuilder()
+        # 장치 연결 관리 (포트별 수신 스레드/명령 큐, slave id로 라우팅)
+        self.device_manager = dsDeviceManager.DeviceManager(self.metrics, self.serial_console, self)
+        self.slave_id = dsSetting.dsParam.get('slave_id', dsDeviceManager.DEFAULT_SLAVE_ID)
+        connection = self.device_manager.addConnection(dsDeviceManager.DEFAULT_CONNECTION, (self.slave_id,))
+        # 기본 연결 (프로토콜 화면의 연결 버튼이 사용)
+        self._serial = connection._serial
+        self._serial_read_thread = connection.read_thread
+        self._serial_write_thread = connection.write_thread
+        self.device_client = connection.client
+        # 레지스터 이름으로 읽기/쓰기 (인접 레지스터 묶음, 센서 값 캐시)
+        self.register_client = dsRegister.RegisterClient(self.submitFrame, self.frame_builder, self.slave_id)
+        # 온도/압력 주기 측정 (명령 큐가 비어 있을 때만 읽음)
+        self.telemetry = dsTelemetry.TelemetrySampler(self.register_client, connection, parent=self)
+        self.telemetry.sampled.connect(self.telemetrySampled)
+        # 통신 상태 확인 (끊기면 발향 스케줄러를 멈추고 재연결 후 같은 단계부터 재개)
+        self.link_monitor = dsLink.LinkMonitor(connection, self.slave_id, parent=self)
+        self.link_monitor.linkChanged.connect(self.linkChanged)
+        # 장치별 출력 보정 (출력 단계별 압력 측정, 발향 세기 -> 출력/시간 변환)
+        self.calibrations = dsCalibration.loadCalibrations()
+        self.calibration_sweep = dsCalibration.CalibrationSweep(self.register_client, parent=self)
+        self.calibration_sweep.progress.connect(self.calibrationProgress)
+        self.calibration_sweep.finished.connect(self.calibrationFinished)
+
+    def telemetrySampled(self, stamp, temperature, pressure):
+        # 프로토콜 화면이 보일 때만 표시
+        if not hasattr(self, 'ui_data_protocol_dlg') or not self.ui_data_protocol_dlg.isVisible():
+            return
+        self.ui_data_protocol_dlg.label_temperature.setText("%.1f" % temperature)
+        self.ui_data_protocol_dlg.label_pressure.setText("%d" % pressure)
+        samples = self.telemetry.ring.latest(self.ui_data_protocol_dlg.widget_telemetry.max_points)
+        self.ui_data_protocol_dlg.widget_telemetry.setSeries(
+            [(dsText.telemetryText['temperature'], "red", [sample[1] for sample in samples], "%.1f"),
+             (dsText.telemetryText['pressure'], "blue", [sample[2] for sample in samples], "%d")])
+
+    def linkChanged(self, state):
+        print("linkChanged: ", state, self.link_monitor.stats())
+        if hasattr(self, 'ui_data_protocol_dlg'):
+            self.ui_data_protocol_dlg.pushButton_connect.setText(
+                {False: dsText.serialText['status_connect'], True: dsText.serialText['status_disconnect']}[dsSerial._is_open(self._serial)])
 
     def write_data(self, wdata):
-        # print("write_data")
-        if dsSerial._is_open(self._serial):
-            self._serial.write(wdata)
-            self._serial_console.append("TX(%d):"%len(wdata) + str(wdata.hex()))
-            self._serial_console.moveCursor(QtGui.QTextCursor.End)
-            print("TX(%d):"%len(wdata) + str(wdata.hex()))
-        else:
-            self._serial_console.append(dsText.serialText['status_close'])
-            self._serial_console.moveCursor(QtGui.QTextCursor.End)
-            print(dsText.serialText['status_close'])
+        return self.device_manager.connection(wdata[0]).write(wdata)
+
+    def slaveId(self, slave_id=None):
+        # 장치를 지정하지 않으면 현재 선택된 장치
+        return self.slave_id if slave_id is None else slave_id
+
+    def setSlaveId(self, slave_id):
+        # 명령 대상 장치 변경 (레지스터 읽기/쓰기, 발향, 통신 상태 확인)
+        if slave_id == self.slave_id:
+            return
+        self.slave_id = slave_id
+        self.register_client.slave_id = slave_id
+        if self.device_manager.connection(slave_id) is self.link_monitor.connection:
+            self.link_monitor.slave_id = slave_id
+        dsSetting.dsParam['slave_id'] = slave_id
+        self.saveSettingsFile()
+        print("setSlaveId: ", slave_id)
+
+    def slaveIdChanged(self, index):
+        self.setSlaveId(index + 1)
+
+    def submitFrame(self, frame, policy=None, retries=None):
+        # slave id(프레임 첫 바이트)에 해당하는 장치의 명령 큐로 전달
+        return self.device_manager.submit(frame, retries=retries, policy=policy)
 
     def setSerialConsole(self, text_console):
-        self._serial_console = text_console
+        self.serial_console.setWidget(text_console, dsSetting.dsParam['console_max_lines'])
 
     ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
     # 텍스트 입력 Enter key 필터링
@@ -136,30 +237,64 @@ class UiDlg(QWidget):
     ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
     # 시작
     def uiDlgStart(self):
+        start = dsMetrics.now()
         self.uiDlgInit()
         self.ui_main_dlg.show()
+        self.dialogs.startup_ms = (dsMetrics.now() - start) * 1000
         dsSound.playGuideSound('intro_main')
+        # 메인 화면 표시 후 다음에 쓸 화면을 유휴 시간에 로딩 (로그인 -> 메뉴 -> 인지 검사 -> 결과)
+        self.dialogs.prefetch(('login', 'menu', 'test_identification', 'messages', 'subject', 'settings'))
 
     # UI 연동 호출: UI객체.objectname.이벤트(QtSignal).connect(함수명)
     def uiDlgInit(self):
-        uiLoader = QUiLoader()
+        # .rcc 묶음 (python dsResource.py): 등록 후 이미지 경로를 :/ 경로로
+        if dsSetting.dsParam['resource_bundle_onoff'] == 1:
+            print("dsResource:", dsImage.setResources(dsResource.register()))
+        # 최적화 이미지 (python dsAssets.py): dsImage 스타일시트와 .ui 로딩 시 경로 변경
+        if dsSetting.dsParam['image_assets_onoff'] == 1:
+            print("dsImage assets:", dsImage.loadManifest())
+        # 버튼 이미지 (표시 크기로 한 번만 디코딩)
+        dsImageCache.setCacheLimit(dsSetting.dsParam['image_cache_kb'])
+        self.image_preloader = dsImageCache.ImagePreloader(self)
+        uiLoader = dsUiLoader.TimedUiLoader(use_cache=dsSetting.dsParam['ui_cache_onoff'] == 1)
         # Custom Widget 등록 (승격된 위젯)
         uiLoader.registerCustomWidget(scentLineChartWidget)
         uiLoader.registerCustomWidget(scentPieChartWidget)
         uiLoader.registerCustomWidget(scentSlider)
-        # UI 개별 로딩
-        self.uiDlgProtocol(uiLoader)
-        self.uiDlgMain(uiLoader)
-        self.uiDlgLogin(uiLoader)
-        self.uiDlgSubject(uiLoader)
-        self.uiDlgMenu(uiLoader)
-        # self.uiDlgTestThreshold(uiLoader)
-        # self.uiDlgTestDiscrimination(uiLoader)
-        self.uiDlgTestIdentification(uiLoader)
-        # self.uiDlgTrainST(uiLoader)
-        # self.uiDlgTrainID(uiLoader)
-        self.uiDlgMessages(uiLoader)
-        self.uiDlgSettings(uiLoader)
+        uiLoader.registerCustomWidget(scentSparklineWidget)
+        # UI 그룹 등록 (처음 사용할 때 로딩, 그룹별 로딩 시간 기록)
+        self.dialogs = dsUiLoader.DialogRegistry(uiLoader, self)
+        self.dialogs.register('protocol', self.uiDlgProtocol, ('ui_data_protocol_dlg',))
+        self.dialogs.register('main', self.uiDlgMain, ('ui_main_dlg',))
+        self.dialogs.register('login', self.uiDlgLogin, ('ui_dlg_login', 'ui_dlg_login_resetpw'))
+        self.dialogs.register('subject', self.uiDlgSubject, ('ui_subject_dlg',))
+        self.dialogs.register('menu', self.uiDlgMenu, ('ui_menu_dlg',))
+        self.dialogs.register('test_threshold', self.uiDlgTestThreshold, (
+            'ui_test_threshold_guide_picture', 'ui_test_threshold_ready', 'ui_test_threshold_try_scent',
+            'ui_test_threshold_response', 'ui_test_threshold_completion', 'ui_test_threshold_results',
+            'ui_test_threshold_start_confirm'))
+        self.dialogs.register('test_discrimination', self.uiDlgTestDiscrimination, (
+            'ui_test_discrimination_guide_picture', 'ui_test_discrimination_ready',
+            'ui_test_discrimination_response', 'ui_test_discrimination_completion',
+            'ui_test_discrimination_results', 'ui_test_discrimination_start_confirm'))
+        self.dialogs.register('test_identification', self.uiDlgTestIdentification, (
+            'ui_test_identification_guide_picture', 'ui_test_identification_ready',
+            'ui_test_identification_response', 'ui_test_identification_completion',
+            'ui_test_identification_results', 'ui_test_identification_start_confirm',
+            'ui_test_identification_result_confirm'))
+        self.dialogs.register('tdi_results', self.uiDlgTDIResults, ('ui_test_results',))
+        self.dialogs.register('train_st', self.uiDlgTrainST, (
+            'ui_train_st_guide_picture', 'ui_train_st_ready', 'ui_train_st_select',
+            'ui_train_st_response', 'ui_train_st_completion', 'ui_train_st_results'))
+        self.dialogs.register('train_id', self.uiDlgTrainID, (
+            'ui_train_id_guide_picture', 'ui_train_id_ready', 'ui_train_id_select',
+            'ui_train_id_scene_choice_0', 'ui_train_id_scene_choice_1', 'ui_train_id_scene_choice_2',
+            'ui_train_id_scene_choice_3', 'ui_train_id_scene_choice_4'))
+        self.dialogs.register('messages', self.uiDlgMessages, ('ui_test_results_save_dlg', 'ui_test_results_review_dlg'))
+        self.dialogs.register('settings', self.uiDlgSettings, ('ui_settings_dlg',))
+        # 시작 시 필요한 화면 (시리얼 연결, 메인)
+        self.dialogs.load('protocol', dsUiLoader.LOAD_STARTUP)
+        self.dialogs.load('main', dsUiLoader.LOAD_STARTUP)
         self.uiDlgTimer()
         self.uiDlgDB()
 
@@ -774,6 +909,11 @@ class UiDlg(QWidget):
             0, [str(x) for x in dsSerial.PARITY])
         self.ui_data_protocol_dlg.comboBox_stopbits.insertItems(
             0, [str(x) for x in dsSerial.STOPBITS])
+        self.ui_data_protocol_dlg.comboBox_slave_id.insertItems(
+            0, [str(x) for x in range(1, dsDeviceManager.SLAVE_ID_MAX + 1)])
+        self.ui_data_protocol_dlg.comboBox_slave_id.setCurrentIndex(self.slave_id - 1)
+        self.ui_data_protocol_dlg.comboBox_slave_id.currentIndexChanged.connect(
+            self.slaveIdChanged)
         self.ui_data_protocol_dlg.pushButton_connect.clicked.connect(
             self.pushButton_connect_clicked)
         self.ui_data_protocol_dlg.pushButton_emit.clicked.connect(
@@ -790,6 +930,8 @@ class UiDlg(QWidget):
             self.pushButton_pressure_clicked)
         self.ui_data_protocol_dlg.pushButton_temperature_pressure.clicked.connect(
             self.pushButton_temperature_pressure_clicked)
+        self.ui_data_protocol_dlg.pushButton_calibrate.clicked.connect(
+            self.pushButton_calibrate_clicked)
         self.ui_data_protocol_dlg.pushButton_back.clicked.connect(
             self.pushButton_back_clicked)
         self.setWindowBySetting(self.ui_data_protocol_dlg)
@@ -801,17 +943,57 @@ class UiDlg(QWidget):
         self.available_port_list = dsSerial._get_available_ports()
         # 시리얼 콘솔로 Text edit 설정
         self.setSerialConsole(self.ui_data_protocol_dlg.textEdit_console)
-        # 기본 설정으로 시리얼 연결 COM
-        if len(self.available_port_list) > 0:
+        # 기본 설정으로 시리얼 연결 COM (설정 파일의 serial_port 우선, 예: 시뮬레이터 pty)
+        port_name = dsSetting.dsParam.get('serial_port', '')
+        if port_name:
+            if self.ui_data_protocol_dlg.comboBox_port.findText(port_name) < 0:
+                self.ui_data_protocol_dlg.comboBox_port.insertItem(0, port_name)
+            self.ui_data_protocol_dlg.comboBox_port.setCurrentText(port_name)
             # self.connect_serial_default(self.available_port_list[0].portName())
             dsSerial._connect_default(self._serial, self._serial_read_thread,
-                                      port_name=self.available_port_list[0].portName())
+                                      port_name=port_name)
+        # 추가 장치 연결 (설정의 devices: 포트별 slave id 목록)
+        devices = dsSetting.dsParam.get('devices', [])
+        self.device_manager.openConfigured(devices)
+        if not port_name and len(self.available_port_list) > 0:
+            # 장치가 응답하는 포트/통신 속도를 찾아 연결 (추가 장치 포트 제외, 지난번 결과 우선)
+            device_ports = [device.get('port') for device in devices]
+            port_names = [dsDiscovery.portPath(x) for x in self.available_port_list]
+            self.port_discovery = dsDiscovery.PortDiscoveryThread(
+                [x for x in port_names if x not in device_ports], self.slave_id)
+            self.port_discovery.finished_discovery.connect(self.portDiscoveryFinished)
+            self.port_discovery.start()
+        self.ui_data_protocol_dlg.pushButton_connect.setText(
+           {False: dsText.serialText['status_connect'], True: dsText.serialText['status_disconnect']}[dsSerial._is_open(self._serial)])
+
+    def portDiscoveryFinished(self, result):
+        if dsSerial._is_open(self._serial):
+            # 탐색 중에 직접 연결한 경우
+            return
+        if result is None:
+            # 응답한 장치가 없으면 첫 번째 포트에 기본 설정으로 연결
+            port_name, baudrate = self.available_port_list[0].portName(), dsSerial.BAUDRATES[0]
+        else:
+            port_name, baudrate = result['port'], result['baudrate']
+        self.ui_data_protocol_dlg.comboBox_port.setCurrentText(os.path.basename(port_name))
+        self.ui_data_protocol_dlg.comboBox_baudrate.setCurrentIndex(dsSerial.BAUDRATES.index(baudrate))
+        dsSerial._connect(self._serial, self._serial_read_thread,
+                          port_name, baudrate, dsSerial.DATABITS[3], dsSerial.FLOWCONTROL[0],
+                          dsSerial.PARITY[0], dsSerial.STOPBITS[0])
         self.ui_data_protocol_dlg.pushButton_connect.setText(
            {False: dsText.serialText['status_connect'], True: dsText.serialText['status_disconnect']}[dsSerial._is_open(self._serial)])
 
     ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
     # 타이머 설정
     def uiDlgTimer(self):
+        # 발향 단계 진행 (발향, 세정, 대기)
+        self.emission_scheduler = dsScheduler.EmissionScheduler(self)
+        self.link_monitor.scheduler = self.emission_scheduler
+        # 발향 단계의 측정 압력으로 보정 곡선 gain 갱신
+        self.flow_compensator = dsCalibration.FlowCompensator(self.emission_scheduler, self.telemetry, self)
+        # 세정 중 압력이 기준값으로 돌아오면 세정 단계 종료 (cleaning_adaptive_onoff)
+        self.adaptive_cleaner = dsCleaning.AdaptiveCleaner(self.emission_scheduler, self.telemetry,
+                                                           self.register_client, self)
         self.test_timer = QTimer(self)
         self.test_timer.setInterval(1000)
         self.test_timer.timeout.connect(self.testTimerTimeout)
@@ -854,50 +1036,72 @@ class UiDlg(QWidget):
         # dsTrainSTDB.createTable()
         dsTestDB.createTableSubject()
         dsTestDB.createTableTestID()
+        dsTestDB.createTableTelemetry()
 
     ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
-    # 수신 데이터 파싱
-    def parseReadData(self, data):
-        print("parseReadData: ", data)
-        # try:
-        #     mid, mfunc, maddress = struct.unpack_from('>BBH', data, offset=0)
-        #     self.ui_data_protocol_dlg.textEdit_console.append("ID:%d, FUNC:%d, ADDR:%d" % (mid, mfunc, maddress))
-        #     self.ui_data_protocol_dlg.textEdit_console.moveCursor(QtGui.QTextCursor.End)
-        #     # print(mid, mfunc, maddress)
-        # except Exception as err:
-        #     print("Protocol Error: ", err)
-
-    ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
-    def requestFrequency(self, frequency): # PWM 주파수수
-        # print("requestScentNo: ", scent_no)
-        sendMsg= dsComm.sendMsgWriteSingleRegister(id=1, 
-                            func=6,
-                            address=4212,
-                            data_command=400)
-        self.write_data(sendMsg)
+    def requestFrequency(self, frequency, slave_id=None): # PWM 주파수
+        # 설정 값은 마지막 값만 의미가 있으므로 대기 중인 같은 쓰기를 교체
+        return self.register_client.write({'pwm_frequency': frequency}, self.slaveId(slave_id),
+                                          dsDevice.POLICY_REPLACE)[0]
 
-    def requestScentNo(self, scent_no, command): # 발향, 세정 통합 메시지  1: 발향만, 4: 발향/세정정
+    def requestScentNo(self, scent_no, command, slave_id=None): # 발향, 세정 통합 메시지  1: 발향만, 4: 발향/세정정
         # print("requestScentNo: ", scent_no)
-        sendMsg= dsComm.sendMsgForEmitClean(id=1, 
+        scent_power, scent_period = self.scentPowerPeriod(slave_id)
+        return self.submitFrame(self.makeScentNoFrame(scent_no, command, slave_id, scent_power, scent_period))
+
+    def calibrationCurve(self, slave_id=None):
+        return self.calibrations.get(dsCalibration.deviceKey(self._serial.port, self.slaveId(slave_id)))
+
+    def scentPowerPeriod(self, slave_id=None):
+        """
+        발향 출력/시간 (보정 곡선이 있으면 발향 세기를 출력/시간으로 변환, 없으면 설정값)
+        :return: (int, int)
+        """
+        scent_power = dsSetting.dsParam['scent_power']
+        scent_period = int(dsSetting.dsParam['scent_run_time'])
+        curve = self.calibrationCurve(slave_id)
+        if dsSetting.dsParam['calibration_onoff'] != 1 or curve is None:
+            return scent_power, scent_period
+        # 측정 유량 보정은 기본 장치(발향 스케줄러, 온도/압력 측정 대상)에만 적용
+        gain = 1.0
+        if self.slaveId(slave_id) == self.slave_id:
+            if self.flow_compensator.curve is not curve:
+                self.flow_compensator.setCurve(curve)
+            gain = self.flow_compensator.gain
+        power, period = dsCalibration.planEmission(curve, dsSetting.dsParam['scent_intensity'],
+                                                   scent_power, scent_period, gain)
+        if self.slaveId(slave_id) == self.slave_id:
+            self.flow_compensator.power = power
+        return power, period
+
+    def makeScentNoFrame(self, scent_no, command, slave_id=None, scent_power=None, scent_period=None): # 설정값으로 발향, 세정 통합 메시지 구성 (미리 구성해 둘 수 있도록 bytes 반환)
+        if scent_power is None:
+            scent_power = dsSetting.dsParam['scent_power']
+        if scent_period is None:
+            scent_period = dsSetting.dsParam['scent_run_time']
+        build_start = dsMetrics.now()
+        sendMsg= self.frame_builder.emitClean(id=self.slaveId(slave_id), 
                             func=16, 
-                            address=4200,
+                            address=dsRegister.REG_COMMAND,
                             qor=8,
                             data_length=16,
                             data_command=command,
                             data_scent_no=scent_no,
-                            data_scent_pump_power=dsSetting.dsParam['scent_power'], 
+                            data_scent_pump_power=scent_power, 
                             data_clean_pump_power=dsSetting.dsParam['cleaning_power'],
-                            data_scent_period=dsSetting.dsParam['scent_run_time'],
+                            data_scent_period=scent_period,
                             data_clean_period=dsSetting.dsParam['cleaning_run_time'],
                             data_scent_delay=dsSetting.dsParam['scent_post_delay'],
                             data_cleanup_delay=dsSetting.dsParam['cleaning_post_delay'])
-        self.write_data(sendMsg)
+        self.metrics.since('build', build_start)
+        return bytes(sendMsg)
         
-    def requestScentNoAndTime(self, scent_no, command, scent_run_time): # 발향, 세정 통합 메시지
+    def requestScentNoAndTime(self, scent_no, command, scent_run_time, slave_id=None): # 발향, 세정 통합 메시지
         # print("requestBySettingValues: ", scent_no)
-        sendMsg = dsComm.sendMsgForEmitClean(id=1, 
+        build_start = dsMetrics.now()
+        sendMsg = self.frame_builder.emitClean(id=self.slaveId(slave_id), 
                             func=16, 
-                            address=4200,
+                            address=dsRegister.REG_COMMAND,
                             qor=8,
                             data_length=16,
                             data_command=command,
@@ -908,14 +1112,16 @@ class UiDlg(QWidget):
                             data_clean_period=dsSetting.dsParam['cleaning_run_time'],
                             data_scent_delay=dsSetting.dsParam['scent_post_delay'],
                             data_cleanup_delay=dsSetting.dsParam['cleaning_post_delay'])      
-        self.write_data(sendMsg)  
+        self.metrics.since('build', build_start)
+        return self.submitFrame(sendMsg)  
     
     def requestScentWithValues(self, scent_no, command, \
-                        scent_pump_power, clean_pump_power, scent_period, clean_period, scent_delay,cleanup_delay): # 발향, 세정 통합 메시지
+                        scent_pump_power, clean_pump_power, scent_period, clean_period, scent_delay,cleanup_delay, slave_id=None): # 발향, 세정 통합 메시지
         # print("requestScentWithValues: ", scent_no)
-        sendMsg = dsComm.sendMsgForEmitClean(id=1, 
+        build_start = dsMetrics.now()
+        sendMsg = self.frame_builder.emitClean(id=self.slaveId(slave_id), 
                             func=16, 
-                            address=4200,
+                            address=dsRegister.REG_COMMAND,
                             qor=8,
                             data_length=16,
                             data_command=command,
@@ -926,85 +1132,91 @@ class UiDlg(QWidget):
                             data_clean_period=clean_period,
                             data_scent_delay=scent_delay,
                             data_cleanup_delay=cleanup_delay)
-        self.write_data(sendMsg)
+        self.metrics.since('build', build_start)
+        return self.submitFrame(sendMsg)
     
+    def runEmission(self, phases):
+        """
+        발향 단계를 끝까지 진행 (이미 진행 중이면 시작하지 않음)
+        :return: bool (모든 단계 완료)
+        """
+        try:
+            self.emission_scheduler.run(phases)
+        except dsScheduler.SchedulerBusyError as err:
+            print(err)
+            return False
+        return True
+
     def progressBarScentAndClean(self, scent_no, progress_bar, label_text):
-        # 명령 전달
-        self.requestScentNo(scent_no, command=1) # 1:발향만, 4:발향/세정
-        # 발향 Progress
-        scent_time = int(dsSetting.dsParam['scent_run_time'])
-        for i in range(1, 101):
-            QtTest.QTest.qWait(scent_time * 9)
-            progress_bar.setValue(i)
-
-        # # 세정 Progress
-        # label_text.setText(dsText.processText['cleaning'])
-        # progress_bar.setStyleSheet(dsUiCustom.pb_red_style)
-        # # 사운드
-        # dsSound.playGuideSound('cleaning_caution')
-        # # for j in range(scent_time_rate+1, 101):
-        # #     QtTest.QTest.qWait(all_time * 10)
-        # #     progress_bar.setValue(j)
-        # cleaning_time = int(dsSetting.dsParam['cleaning_run_time'])
-        # for i in range(1, 101):
-        #     QtTest.QTest.qWait(cleaning_time * 9)
-        #     progress_bar.setValue(i)
-        # progress_bar.setStyleSheet(dsUiCustom.pb_blue_style)
-        
-        # 발향 간격 시간
-        QtTest.QTest.qWait(dsSetting.dsParam['scent_emit_interval']*1000)
+        return self.runEmission(self.scentPhases(scent_no, progress_bar))
+
+    def scentPhases(self, scent_no, progress_bar, on_start=None, slave_id=None):
+        # 발향 1회 단계 목록: 발향 Progress -> 발향 후 대기 -> 발향 간격 시간
+        # 명령 프레임은 미리 구성해 두고 발향 단계 시작 시각에 전송
+        scent_power, scent_time = self.scentPowerPeriod(slave_id)
+        sendMsg = self.makeScentNoFrame(scent_no, 1, slave_id, scent_power, scent_time) # 1:발향만, 4:발향/세정
+        def startEmit():
+            if on_start is not None:
+                on_start()
+            self.submitFrame(sendMsg)
+        return [dsScheduler.makePhase('emit', scent_time * 1000, progress_bar, on_start=startEmit),
+                dsScheduler.makePhase('post_delay', dsSetting.dsParam['scent_post_delay']),
+                dsScheduler.makePhase('interval', dsSetting.dsParam['scent_emit_interval'] * 1000)]
+
+    def guideSequentialScent(self, label_text, sequence):
+        # 1, 2, 3번 향기 안내 문구, 사운드
+        label_text.setText(dsText.processText['progress_scent_%d' % sequence])
+        dsSound.playGuideSound('progress_scent_%d' % sequence)
+
+    def startCleaningProgress(self, progress_bar, label_text, sound=True):
+        # 세정 Progress 시작 (문구, 색상, 사운드)
+        if label_text is not None:
+            label_text.setText(dsText.processText['cleaning'])
+        progress_bar.setValue(0)
+        progress_bar.setStyleSheet(dsUiCustom.pb_red_style)
+        if sound:
+            dsSound.playGuideSound('cleaning_caution')
 
     def progressBarScentAndCleanForTrainST(self, scent_no, progress_bar, label_text):
-        # 명령 전달
-        self.requestScentNoAndTime(scent_no, command=4, scent_run_time=15)
         scent_time = 15
-        for i in range(1, 101):
-            QtTest.QTest.qWait(scent_time * 9)
-            progress_bar.setValue(i)
-
-        # 세정 Progress
-        label_text.setText(dsText.processText['cleaning'])
-        progress_bar.setStyleSheet(dsUiCustom.pb_red_style)
-        # 사운드
-        dsSound.playGuideSound('cleaning_caution')
         cleaning_time = 5
-        for i in range(1, 101):
-            QtTest.QTest.qWait(cleaning_time * 9)
-            progress_bar.setValue(i)
-        progress_bar.setStyleSheet(dsUiCustom.pb_blue_style)
-        
-        # 발향 간격 시간
-        QtTest.QTest.qWait(dsSetting.dsParam['scent_emit_interval']*1000)
+        # 명령 프레임은 미리 구성해 두고 발향 단계 시작 시각에 전송 (재연결 후 단계 재시작 시 재전송)
+        sendMsg = self.makeScentNoFrame(scent_no, 4, None, dsSetting.dsParam['scent_power'], scent_time)
+        return self.runEmission([
+            dsScheduler.makePhase('emit', scent_time * 1000, progress_bar,
+                                  on_start=lambda: self.submitFrame(sendMsg)),
+            dsScheduler.makePhase('post_delay', dsSetting.dsParam['scent_post_delay']),
+            dsScheduler.makePhase('clean', cleaning_time * 1000, progress_bar,
+                                  on_start=lambda: self.startCleaningProgress(progress_bar, label_text)),
+            dsScheduler.makePhase('clean_post_delay', dsSetting.dsParam['cleaning_post_delay'],
+                                  on_start=lambda: progress_bar.setStyleSheet(dsUiCustom.pb_blue_style)),
+            dsScheduler.makePhase('interval', dsSetting.dsParam['scent_emit_interval'] * 1000)])
 
     def progressBarScentAndCleanForTrainID(self, scent_no, progress_bar, label_text):
+        if self.emission_scheduler.running:
+            return False
         progress_bar.setVisible(True)
-        # 명령 전달
-        self.requestScentNo(scent_no, command=4)
-        # 발향 Progress
-        scent_time = int(dsSetting.dsParam['scent_run_time'])
-        for i in range(1, 101):
-            QtTest.QTest.qWait(scent_time * 9)
-            progress_bar.setValue(i)
-
-        # 세정 Progress
-        progress_bar.setStyleSheet(dsUiCustom.pb_red_style)
-        # 사운드
-        # dsSound.playGuideSound('cleaning_caution')
+        # 명령 프레임은 미리 구성해 두고 발향 단계 시작 시각에 전송 (재연결 후 단계 재시작 시 재전송)
+        scent_power, scent_time = self.scentPowerPeriod()
+        sendMsg = self.makeScentNoFrame(scent_no, 4, None, scent_power, scent_time)
         cleaning_time = int(dsSetting.dsParam['cleaning_run_time'])
-        for i in range(1, 101):
-            QtTest.QTest.qWait(cleaning_time * 9)
-            progress_bar.setValue(i)
-        progress_bar.setStyleSheet(dsUiCustom.pb_blue_style)
-        
-        # 발향 간격 시간
-        QtTest.QTest.qWait(dsSetting.dsParam['scent_emit_interval']*1000)
+        done = self.runEmission([
+            dsScheduler.makePhase('emit', scent_time * 1000, progress_bar,
+                                  on_start=lambda: self.submitFrame(sendMsg)),
+            dsScheduler.makePhase('post_delay', dsSetting.dsParam['scent_post_delay']),
+            dsScheduler.makePhase('clean', cleaning_time * 1000, progress_bar,
+                                  on_start=lambda: self.startCleaningProgress(progress_bar, None, sound=False)),
+            dsScheduler.makePhase('clean_post_delay', dsSetting.dsParam['cleaning_post_delay'],
+                                  on_start=lambda: progress_bar.setStyleSheet(dsUiCustom.pb_blue_style)),
+            dsScheduler.makePhase('interval', dsSetting.dsParam['scent_emit_interval'] * 1000)])
         progress_bar.setVisible(False)
+        return done
     
     ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
     # UI Protocol
     def pushButton_connect_clicked(self):
         if dsSerial._is_open(self._serial):
-            dsSerial._disconnect(self._serial, self._serial_read_thread)
+            dsSerial._disconnect(self._serial, self._serial_read_thread, self._serial_write_thread)
         else:
             serial_info = {
                 "port_name": self.ui_data_protocol_dlg.comboBox_port.currentText(),
@@ -1031,25 +1243,15 @@ class UiDlg(QWidget):
         self.requestScentTest(4)
 
     def pushButton_stop_clicked(self):
-        sendMsg = dsComm.sendMsgWriteSingleRegister(id=1, 
-                            func=6, 
-                            address=4200,
-                            data_command=3)
-        self.write_data(sendMsg)
+        # 정지 명령은 대기 중인 명령보다 먼저 전송
+        self.device_manager.client(self.slave_id).clear()
+        return self.register_client.write({'command': dsRegister.CMD_STOP})[0]
 
     def pushButton_temperature_clicked(self):
-        sendMsg = dsComm.sendMsgReadRegister(id=1,
-                                func=4,
-                                address=4043,
-                                qor=2)
-        self.write_data(sendMsg)
-        
+        return self.register_client.read(('temperature',))
+
     def pushButton_pressure_clicked(self):
-        sendMsg = dsComm.sendMsgReadRegister(id=1,
-                                func=4,
-                                address=4045,
-                                qor=1)
-        self.write_data(sendMsg)
+        return self.register_client.read(('pressure',))
         
     def pushButton_temperature_pressure_clicked(self):
         self.requestTempPress()
@@ -1057,6 +1259,28 @@ class UiDlg(QWidget):
     def pushButton_back_clicked(self):
         self.uiDlgChange(self.ui_data_protocol_dlg, self.ui_menu_dlg)
 
+    def pushButton_calibrate_clicked(self):
+        # 선택한 향기 번호로 출력 단계별 발향 (진행 중이면 취소)
+        if self.calibration_sweep.running:
+            self.calibration_sweep.cancel()
+            return
+        self.calibration_sweep.scent_no = self.ui_data_protocol_dlg.sb_scentnum.value()
+        if self.calibration_sweep.start():
+            self.calibrationProgress(0, len(self.calibration_sweep.powers))
+
+    def calibrationProgress(self, level, count):
+        self.ui_data_protocol_dlg.pushButton_calibrate.setText(dsText.calibrationText['running'] % (level, count))
+
+    def calibrationFinished(self, curve):
+        if curve is None:
+            self.ui_data_protocol_dlg.pushButton_calibrate.setText(dsText.calibrationText['failed'])
+            return
+        self.calibrations[dsCalibration.deviceKey(self._serial.port, self.slave_id)] = curve
+        dsCalibration.saveCalibrations(self.calibrations)
+        self.flow_compensator.setCurve(curve)
+        print("calibrationFinished: ", curve)
+        self.ui_data_protocol_dlg.pushButton_calibrate.setText(dsText.calibrationText['done'])
+
     def requestScentTest(self, command):
         scent_no = self.ui_data_protocol_dlg.sb_scentnum.value()
         scent_power = int(self.ui_data_protocol_dlg.textEdit_emit_power.toPlainText())
@@ -1065,7 +1289,7 @@ class UiDlg(QWidget):
         clean_period = int(self.ui_data_protocol_dlg.textEdit_clean_period.toPlainText())
         scent_delay = int(self.ui_data_protocol_dlg.textEdit_scent_delay.toPlainText())
         cleanup_delay = int(self.ui_data_protocol_dlg.textEdit_cleanup_delay.toPlainText())
-        self.requestScentWithValues(scent_no,
+        return self.requestScentWithValues(scent_no,
                              command,
                              scent_power,
                              clean_power,
@@ -1074,12 +1298,9 @@ class UiDlg(QWidget):
                              scent_delay,
                              cleanup_delay)
 
-    def requestTempPress(self):
-        sendMsg = dsComm.sendMsgReadRegister(id=1,
-                                func=4,
-                                address=4043,
-                                qor=3)
-        self.write_data(sendMsg)
+    def requestTempPress(self, slave_id=None):
+        # 온도(4043~4044)와 압력(4045)을 요청 1개로 읽음
+        return self.register_client.read(('temperature', 'pressure'), slave_id=self.slaveId(slave_id))
         
     ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
     # UI Main Widgets
@@ -1483,16 +1704,16 @@ class UiDlg(QWidget):
                 len(dsTestID.id_results) > 1:
             if dsTest.TDI_score > 21: 
                 self.ui_test_results.resultImage.setPixmap(
-                    QtGui.QPixmap(dsResultImg['Good']))  # 배경 이미지 삽입
+                    dsImage.pixmap(dsResultImg['Good']))  # 배경 이미지 삽입
             elif dsTest.TDI_score >= 14.5: 
                 self.ui_test_results.resultImage.setPixmap(
-                    QtGui.QPixmap(dsResultImg['Warning']))  # 배경 이미지 삽입
+                    dsImage.pixmap(dsResultImg['Warning']))  # 배경 이미지 삽입
             else:
                 self.ui_test_results.resultImage.setPixmap(
-                    QtGui.QPixmap(dsResultImg['Bad']))  # 배경 이미지 삽입
+                    dsImage.pixmap(dsResultImg['Bad']))  # 배경 이미지 삽입
         else:
                 self.ui_test_results.resultImage.setPixmap(
-                    QtGui.QPixmap(dsResultImg['None']))  # 배경 이미지 삽입
+                    dsImage.pixmap(dsResultImg['None']))  # 배경 이미지 삽입
             
         self.uiDlgChange(self.ui_menu_dlg, self.ui_test_results)
         # 사운드
@@ -1541,6 +1762,8 @@ class UiDlg(QWidget):
         self.uiDlgChange(self.ui_menu_dlg, self.ui_test_threshold_guide_picture)
         # 사운드
         dsSound.playGuideSound('intro_threshold')
+        # 검사 중 온도/압력 요약 (결과 파일에 저장)
+        self.telemetry.startSession('threshold')
 
     def uiTestThresholdResume(self):
         self.uiTestThresholdResponseRetry()
@@ -1628,6 +1851,8 @@ class UiDlg(QWidget):
             self.ui_test_threshold_response.pb_node_7.setVisible(True)
 
     def testThresholdProceed(self):
+        if self.emission_scheduler.running:
+            return
         dsTest.test_type = 1
         self.ui_test_threshold_response.pb_retry.setVisible(False)
         self.ui_test_threshold_response.label_next.setVisible(False)
@@ -1635,7 +1860,8 @@ class UiDlg(QWidget):
         self.ui_test_threshold_response.ui_menu_btn_quit.setVisible(False)
         self.setResponseUiTestThreshold()
         self.uiDlgShow(self.ui_test_threshold_response)
-        self.sequentialThreshold()
+        if not self.sequentialThreshold():
+            return
         self.ui_test_threshold_response.pb_retry.setVisible(True)
         self.ui_test_threshold_response.label_next.setVisible(True)
         self.ui_test_threshold_response.pb_try_scent.setVisible(True)
@@ -1650,55 +1876,32 @@ class UiDlg(QWidget):
         self.selectResponseThreshold() # 선택했으면 버튼이 나타남
 
     def sequentialThreshold(self):
-        # 1번 향기
-        self.ui_test_threshold_response.label_guide.setText(dsText.processText['progress_scent_1'])
-        # 사운드
-        dsSound.playGuideSound('progress_scent_1')
-        # 진행바
-        if dsTestTH.th_test_data[dsTestTH.th_test_index]['scent_squence'] == 1:
-            self.progressBarScentAndClean(scent_no=dsTestTH.th_test_current_level+dsTestTH.th_scent_offset,
-                                          progress_bar=self.ui_test_threshold_response.pg_scent_1,
-                                          label_text=self.ui_test_threshold_response.label_guide)
-        else:
-            self.progressBarScentAndClean(scent_no=dsTestTH.th_scent_none,
-                                          progress_bar=self.ui_test_threshold_response.pg_scent_1,
-                                          label_text=self.ui_test_threshold_response.label_guide)
-        # 2번 향기
-        self.ui_test_threshold_response.label_guide.setText(dsText.processText['progress_scent_2'])
-        # 사운드
-        dsSound.playGuideSound('progress_scent_2')
-        # 진행바
-        if dsTestTH.th_test_data[dsTestTH.th_test_index]['scent_squence'] == 2:
-            self.progressBarScentAndClean(scent_no=dsTestTH.th_test_current_level+dsTestTH.th_scent_offset,
-                                          progress_bar=self.ui_test_threshold_response.pg_scent_2,
-                                          label_text=self.ui_test_threshold_response.label_guide)
-        else:
-            self.progressBarScentAndClean(scent_no=dsTestTH.th_scent_none,
-                                          progress_bar=self.ui_test_threshold_response.pg_scent_2,
-                                          label_text=self.ui_test_threshold_response.label_guide)
-        # 3번 향기
-        self.ui_test_threshold_response.label_guide.setText(dsText.processText['progress_scent_3'])
-        # 사운드
-        dsSound.playGuideSound('progress_scent_3')
-        # 진행바
-        if dsTestTH.th_test_data[dsTestTH.th_test_index]['scent_squence'] == 3:
-            self.progressBarScentAndClean(scent_no=dsTestTH.th_test_current_level+dsTestTH.th_scent_offset,
-                                          progress_bar=self.ui_test_threshold_response.pg_scent_3,
-                                          label_text=self.ui_test_threshold_response.label_guide)
-        else:
-            self.progressBarScentAndClean(scent_no=dsTestTH.th_scent_none,
-                                          progress_bar=self.ui_test_threshold_response.pg_scent_3,
-                                          label_text=self.ui_test_threshold_response.label_guide)
+        # 1, 2, 3번 향기를 한 번에 구성하여 하나의 타이머로 진행
+        response_dlg = self.ui_test_threshold_response
+        phases = []
+        for sequence, progress_bar in ((1, response_dlg.pg_scent_1),
+                                       (2, response_dlg.pg_scent_2),
+                                       (3, response_dlg.pg_scent_3)):
+            if dsTestTH.th_test_data[dsTestTH.th_test_index]['scent_squence'] == sequence:
+                scent_no = dsTestTH.th_test_current_level+dsTestTH.th_scent_offset
+            else:
+                scent_no = dsTestTH.th_scent_none
+            phases += self.scentPhases(scent_no, progress_bar,
+                                       on_start=lambda n=sequence: self.guideSequentialScent(response_dlg.label_guide, n))
+        return self.runEmission(phases)
        
     def tryScentThreshold(self):
+        if self.emission_scheduler.running:
+            return
         self.ui_test_threshold_try_scent.label_guide.setText(dsText.processText['try_scent_threshold'])
         self.uiDlgShow(self.ui_test_threshold_try_scent)
         # 사운드
         dsSound.playGuideSound('try_scent_threshold')
         # 진행바
-        self.progressBarScentAndClean(scent_no=12,
-                                    progress_bar=self.ui_test_threshold_try_scent.pg_ready,
-                                    label_text=self.ui_test_threshold_try_scent.label_guide)
+        if not self.progressBarScentAndClean(scent_no=12,
+                                             progress_bar=self.ui_test_threshold_try_scent.pg_ready,
+                                             label_text=self.ui_test_threshold_try_scent.label_guide):
+            return
         self.uiDlgHide(self.ui_test_threshold_try_scent)
         self.ui_test_threshold_try_scent.pg_ready.setValue(0)
 
@@ -1747,33 +1950,21 @@ class UiDlg(QWidget):
 
     def checkResponseThreshold(self, number):
         if number == 1:
-            self.ui_test_threshold_response.pb_check_1.setStyleSheet(
-                dsBtnImg['check_s'])
-            self.ui_test_threshold_response.pb_check_2.setStyleSheet(
-                dsBtnImg['null'])
-            self.ui_test_threshold_response.pb_check_3.setStyleSheet(
-                dsBtnImg['null'])
+            dsImageCache.setButtonImage(self.ui_test_threshold_response.pb_check_1, 'check_s')
+            dsImageCache.setButtonImage(self.ui_test_threshold_response.pb_check_2, 'null')
+            dsImageCache.setButtonImage(self.ui_test_threshold_response.pb_check_3, 'null')
         elif number == 2:
-            self.ui_test_threshold_response.pb_check_1.setStyleSheet(
-                dsBtnImg['null'])
-            self.ui_test_threshold_response.pb_check_2.setStyleSheet(
-                dsBtnImg['check_s'])
-            self.ui_test_threshold_response.pb_check_3.setStyleSheet(
-                dsBtnImg['null'])
+            dsImageCache.setButtonImage(self.ui_test_threshold_response.pb_check_1, 'null')
+            dsImageCache.setButtonImage(self.ui_test_threshold_response.pb_check_2, 'check_s')
+            dsImageCache.setButtonImage(self.ui_test_threshold_response.pb_check_3, 'null')
         elif number == 3:
-            self.ui_test_threshold_response.pb_check_1.setStyleSheet(
-                dsBtnImg['null'])
-            self.ui_test_threshold_response.pb_check_2.setStyleSheet(
-                dsBtnImg['null'])
-            self.ui_test_threshold_response.pb_check_3.setStyleSheet(
-                dsBtnImg['check_s'])
+            dsImageCache.setButtonImage(self.ui_test_threshold_response.pb_check_1, 'null')
+            dsImageCache.setButtonImage(self.ui_test_threshold_response.pb_check_2, 'null')
+            dsImageCache.setButtonImage(self.ui_test_threshold_response.pb_check_3, 'check_s')
         else:
-            self.ui_test_threshold_response.pb_check_1.setStyleSheet(
-                dsBtnImg['null'])
-            self.ui_test_threshold_response.pb_check_2.setStyleSheet(
-                dsBtnImg['null'])
-            self.ui_test_threshold_response.pb_check_3.setStyleSheet(
-                dsBtnImg['null'])
+            dsImageCache.setButtonImage(self.ui_test_threshold_response.pb_check_1, 'null')
+            dsImageCache.setButtonImage(self.ui_test_threshold_response.pb_check_2, 'null')
+            dsImageCache.setButtonImage(self.ui_test_threshold_response.pb_check_3, 'null')
 
     def selectResponseThreshold(self):
         if self.ui_test_threshold_response.pg_scent_1.isVisible() == False \
@@ -1804,6 +1995,7 @@ class UiDlg(QWidget):
         else:
             # 검사 종료
             dsTest.test_type = 0
+            self.telemetry.endSession()
             self.uiDlgHide(self.ui_test_threshold_response)
             if dsSetting.dsParam['result_show_onoff'] == 1:
                 # 결과 화면을 구성한다.
@@ -2005,6 +2197,8 @@ class UiDlg(QWidget):
         self.uiDlgChange(self.ui_menu_dlg, self.ui_test_discrimination_guide_picture)
         # 사운드
         dsSound.playGuideSound('intro_discrimination')
+        # 검사 중 온도/압력 요약 (결과 파일에 저장)
+        self.telemetry.startSession('discrimination')
 
     def uiTestDiscriminationResume(self):
         self.uiTestDiscriminationResponseRetry()
@@ -2058,13 +2252,16 @@ class UiDlg(QWidget):
         self.ui_test_discrimination_response.label_guide.setText("")
 
     def testDiscriminationProceed(self):
+        if self.emission_scheduler.running:
+            return
         dsTest.test_type = 2
         self.ui_test_discrimination_response.pb_retry.setVisible(False)
         self.ui_test_discrimination_response.label_next.setVisible(False)
         self.ui_test_discrimination_response.ui_menu_btn_quit.setVisible(False)
         self.setResponseUiTestDiscrimination()
         self.uiDlgShow(self.ui_test_discrimination_response)
-        self.sequentialDiscrimination()
+        if not self.sequentialDiscrimination():
+            return
         self.ui_test_discrimination_response.pb_retry.setVisible(True)
         self.ui_test_discrimination_response.label_next.setVisible(True)
         self.ui_test_discrimination_response.ui_menu_btn_quit.setVisible(True)
@@ -2078,30 +2275,16 @@ class UiDlg(QWidget):
         self.selectResponseDiscrimination() # 선택했으면 버튼이 나타남
 
     def sequentialDiscrimination(self):
-        # 1번 향기
-        self.ui_test_discrimination_response.label_guide.setText(dsText.processText['progress_scent_1'])
-        # 사운드
-        dsSound.playGuideSound('progress_scent_1')
-        # 진행바
-        self.progressBarScentAndClean(scent_no=dsTestDC.dc_test_data[dsTestDC.dc_test_index]['scent_no1'],
-                                      progress_bar=self.ui_test_discrimination_response.pg_scent_1,
-                                      label_text=self.ui_test_discrimination_response.label_guide)
-        # 2번 향기
-        self.ui_test_discrimination_response.label_guide.setText(dsText.processText['progress_scent_2'])
-        # 사운드
-        dsSound.playGuideSound('progress_scent_2')
-        # 진행바
-        self.progressBarScentAndClean(scent_no=dsTestDC.dc_test_data[dsTestDC.dc_test_index]['scent_no2'],
-                                      progress_bar=self.ui_test_discrimination_response.pg_scent_2,
-                                      label_text=self.ui_test_discrimination_response.label_guide)
-        # 3번 향기
-        self.ui_test_discrimination_response.label_guide.setText(dsText.processText['progress_scent_3'])
-        # 사운드
-        dsSound.playGuideSound('progress_scent_3')
-        # 진행바
-        self.progressBarScentAndClean(scent_no=dsTestDC.dc_test_data[dsTestDC.dc_test_index]['scent_no3'],
-                                      progress_bar=self.ui_test_discrimination_response.pg_scent_3,
-                                      label_text=self.ui_test_discrimination_response.label_guide)
+        # 1, 2, 3번 향기를 한 번에 구성하여 하나의 타이머로 진행
+        response_dlg = self.ui_test_discrimination_response
+        test_data = dsTestDC.dc_test_data[dsTestDC.dc_test_index]
+        phases = []
+        for sequence, progress_bar in ((1, response_dlg.pg_scent_1),
+                                       (2, response_dlg.pg_scent_2),
+                                       (3, response_dlg.pg_scent_3)):
+            phases += self.scentPhases(test_data['scent_no%d' % sequence], progress_bar,
+                                       on_start=lambda n=sequence: self.guideSequentialScent(response_dlg.label_guide, n))
+        return self.runEmission(phases)
 
     def uiTestDiscriminationResponseRetry(self):
         self.checkResponseDiscrimination(0)
@@ -2145,33 +2328,21 @@ class UiDlg(QWidget):
 
     def checkResponseDiscrimination(self, number):
         if number == 1:
-            self.ui_test_discrimination_response.pb_check_1.setStyleSheet(
-                dsBtnImg['check_s'])
-            self.ui_test_discrimination_response.pb_check_2.setStyleSheet(
-                dsBtnImg['null'])
-            self.ui_test_discrimination_response.pb_check_3.setStyleSheet(
-                dsBtnImg['null'])
+            dsImageCache.setButtonImage(self.ui_test_discrimination_response.pb_check_1, 'check_s')
+            dsImageCache.setButtonImage(self.ui_test_discrimination_response.pb_check_2, 'null')
+            dsImageCache.setButtonImage(self.ui_test_discrimination_response.pb_check_3, 'null')
         elif number == 2:
-            self.ui_test_discrimination_response.pb_check_1.setStyleSheet(
-                dsBtnImg['null'])
-            self.ui_test_discrimination_response.pb_check_2.setStyleSheet(
-                dsBtnImg['check_s'])
-            self.ui_test_discrimination_response.pb_check_3.setStyleSheet(
-                dsBtnImg['null'])
+            dsImageCache.setButtonImage(self.ui_test_discrimination_response.pb_check_1, 'null')
+            dsImageCache.setButtonImage(self.ui_test_discrimination_response.pb_check_2, 'check_s')
+            dsImageCache.setButtonImage(self.ui_test_discrimination_response.pb_check_3, 'null')
         elif number == 3:
-            self.ui_test_discrimination_response.pb_check_1.setStyleSheet(
-                dsBtnImg['null'])
-            self.ui_test_discrimination_response.pb_check_2.setStyleSheet(
-                dsBtnImg['null'])
-            self.ui_test_discrimination_response.pb_check_3.setStyleSheet(
-                dsBtnImg['check_s'])
+            dsImageCache.setButtonImage(self.ui_test_discrimination_response.pb_check_1, 'null')
+            dsImageCache.setButtonImage(self.ui_test_discrimination_response.pb_check_2, 'null')
+            dsImageCache.setButtonImage(self.ui_test_discrimination_response.pb_check_3, 'check_s')
         else:
-            self.ui_test_discrimination_response.pb_check_1.setStyleSheet(
-                dsBtnImg['null'])
-            self.ui_test_discrimination_response.pb_check_2.setStyleSheet(
-                dsBtnImg['null'])
-            self.ui_test_discrimination_response.pb_check_3.setStyleSheet(
-                dsBtnImg['null'])
+            dsImageCache.setButtonImage(self.ui_test_discrimination_response.pb_check_1, 'null')
+            dsImageCache.setButtonImage(self.ui_test_discrimination_response.pb_check_2, 'null')
+            dsImageCache.setButtonImage(self.ui_test_discrimination_response.pb_check_3, 'null')
 
     def selectResponseDiscrimination(self):
         if self.ui_test_discrimination_response.pg_scent_1.isVisible() == False \
@@ -2204,6 +2375,7 @@ class UiDlg(QWidget):
             # 검사 종료
             # print("id: %d, data: %d" % (dsTestDC.dc_test_index, len(dsTestDC.dc_test_data)))
             dsTest.test_type = 0
+            self.telemetry.endSession()
             self.uiDlgHide(self.ui_test_discrimination_response)
             if dsSetting.dsParam['result_show_onoff'] == 1:
                 # 검사 결과 화면을 구성한다.
@@ -2369,6 +2541,8 @@ class UiDlg(QWidget):
         self.uiDlgChange(self.ui_menu_dlg, self.ui_test_identification_guide_picture)
         # 사운드
         dsSound.playGuideSound('intro_identification')
+        # 검사 중 온도/압력 요약 (결과 파일에 저장)
+        self.telemetry.startSession('identification')
 
     def uiTestIdentificationResume(self):
         self.uiTestIdentificationResponseRetry()
@@ -2419,22 +2593,20 @@ class UiDlg(QWidget):
         # 선택지 이미지 반영
         self.ui_test_identification_response.label_select_1.setText(
             dsTestID.id_test_data[dsTestID.id_test_index]['choice1'])
-        self.ui_test_identification_response.pb_select_1.setStyleSheet(
-            dsBtnImg[dsTestID.id_test_data[dsTestID.id_test_index]['choice1']])
+        dsImageCache.setButtonImage(self.ui_test_identification_response.pb_select_1, dsTestID.id_test_data[dsTestID.id_test_index]['choice1'])
         self.ui_test_identification_response.label_select_2.setText(
             dsTestID.id_test_data[dsTestID.id_test_index]['choice2'])
-        self.ui_test_identification_response.pb_select_2.setStyleSheet(
-            dsBtnImg[dsTestID.id_test_data[dsTestID.id_test_index]['choice2']])
+        dsImageCache.setButtonImage(self.ui_test_identification_response.pb_select_2, dsTestID.id_test_data[dsTestID.id_test_index]['choice2'])
         self.ui_test_identification_response.label_select_3.setText(
             dsTestID.id_test_data[dsTestID.id_test_index]['choice3'])
-        self.ui_test_identification_response.pb_select_3.setStyleSheet(
-            dsBtnImg[dsTestID.id_test_data[dsTestID.id_test_index]['choice3']])
+        dsImageCache.setButtonImage(self.ui_test_identification_response.pb_select_3, dsTestID.id_test_data[dsTestID.id_test_index]['choice3'])
         self.ui_test_identification_response.label_select_4.setText(
             dsTestID.id_test_data[dsTestID.id_test_index]['choice4'])
-        self.ui_test_identification_response.pb_select_4.setStyleSheet(
-            dsBtnImg[dsTestID.id_test_data[dsTestID.id_test_index]['choice4']])
+        dsImageCache.setButtonImage(self.ui_test_identification_response.pb_select_4, dsTestID.id_test_data[dsTestID.id_test_index]['choice4'])
 
     def testIdentificationProceed(self):
+        if self.emission_scheduler.running:
+            return
         dsTest.test_type = 3
         self.ui_test_identification_response.pb_retry.setVisible(False)
         self.ui_test_identification_response.label_next.setVisible(False)
@@ -2442,7 +2614,8 @@ class UiDlg(QWidget):
         self.ui_test_identification_response.ui_menu_btn_result.setVisible(False)
         self.setResponseUiTestIdentification()
         self.uiDlgShow(self.ui_test_identification_response)
-        self.sequentialIdentification()
+        if not self.sequentialIdentification():
+            return
         self.ui_test_identification_response.pb_retry.setVisible(True)
         self.ui_test_identification_response.label_next.setVisible(True)
         self.ui_test_identification_response.ui_menu_btn_quit.setVisible(True)
@@ -2457,8 +2630,13 @@ class UiDlg(QWidget):
     def sequentialIdentification(self):
         # 사운드
         dsSound.playGuideSound('progress_scent')
+        # 발향하는 동안 다음 문항 선택지 이미지 미리 디코딩
+        if dsTestID.id_test_index + 1 < len(dsTestID.id_test_data):
+            item = dsTestID.id_test_data[dsTestID.id_test_index + 1]
+            self.image_preloader.preload((item['choice1'], item['choice2'], item['choice3'], item['choice4']),
+                                         self.ui_test_identification_response.pb_select_1.size())
         # 진행바
-        self.progressBarScentAndClean(scent_no=dsTestID.id_test_data[dsTestID.id_test_index]['scent_no'],
+        return self.progressBarScentAndClean(scent_no=dsTestID.id_test_data[dsTestID.id_test_index]['scent_no'],
                                       progress_bar=self.ui_test_identification_response.pg_scent,
                                       label_text=self.ui_test_identification_response.label_guide)
         
@@ -2514,50 +2692,30 @@ class UiDlg(QWidget):
 
     def checkResponseIdentification(self, number):
         if number == 1:
-            self.ui_test_identification_response.pb_check_1.setStyleSheet(
-                dsBtnImg['check'])
-            self.ui_test_identification_response.pb_check_2.setStyleSheet(
-                dsBtnImg['null'])
-            self.ui_test_identification_response.pb_check_3.setStyleSheet(
-                dsBtnImg['null'])
-            self.ui_test_identification_response.pb_check_4.setStyleSheet(
-                dsBtnImg['null'])
+            dsImageCache.setButtonImage(self.ui_test_identification_response.pb_check_1, 'check')
+            dsImageCache.setButtonImage(self.ui_test_identification_response.pb_check_2, 'null')
+            dsImageCache.setButtonImage(self.ui_test_identification_response.pb_check_3, 'null')
+            dsImageCache.setButtonImage(self.ui_test_identification_response.pb_check_4, 'null')
         elif number == 2:
-            self.ui_test_identification_response.pb_check_1.setStyleSheet(
-                dsBtnImg['null'])
-            self.ui_test_identification_response.pb_check_2.setStyleSheet(
-                dsBtnImg['check'])
-            self.ui_test_identification_response.pb_check_3.setStyleSheet(
-                dsBtnImg['null'])
-            self.ui_test_identification_response.pb_check_4.setStyleSheet(
-                dsBtnImg['null'])
+            dsImageCache.setButtonImage(self.ui_test_identification_response.pb_check_1, 'null')
+            dsImageCache.setButtonImage(self.ui_test_identification_response.pb_check_2, 'check')
+            dsImageCache.setButtonImage(self.ui_test_identification_response.pb_check_3, 'null')
+            dsImageCache.setButtonImage(self.ui_test_identification_response.pb_check_4, 'null')
         elif number == 3:
-            self.ui_test_identification_response.pb_check_1.setStyleSheet(
-                dsBtnImg['null'])
-            self.ui_test_identification_response.pb_check_2.setStyleSheet(
-                dsBtnImg['null'])
-            self.ui_test_identification_response.pb_check_3.setStyleSheet(
-                dsBtnImg['check'])
-            self.ui_test_identification_response.pb_check_4.setStyleSheet(
-                dsBtnImg['null'])
+            dsImageCache.setButtonImage(self.ui_test_identification_response.pb_check_1, 'null')
+            dsImageCache.setButtonImage(self.ui_test_identification_response.pb_check_2, 'null')
+            dsImageCache.setButtonImage(self.ui_test_identification_response.pb_check_3, 'check')
+            dsImageCache.setButtonImage(self.ui_test_identification_response.pb_check_4, 'null')
         elif number == 4:
-            self.ui_test_identification_response.pb_check_1.setStyleSheet(
-                dsBtnImg['null'])
-            self.ui_test_identification_response.pb_check_2.setStyleSheet(
-                dsBtnImg['null'])
-            self.ui_test_identification_response.pb_check_3.setStyleSheet(
-                dsBtnImg['null'])
-            self.ui_test_identification_response.pb_check_4.setStyleSheet(
-                dsBtnImg['check'])
+            dsImageCache.setButtonImage(self.ui_test_identification_response.pb_check_1, 'null')
+            dsImageCache.setButtonImage(self.ui_test_identification_response.pb_check_2, 'null')
+            dsImageCache.setButtonImage(self.ui_test_identification_response.pb_check_3, 'null')
+            dsImageCache.setButtonImage(self.ui_test_identification_response.pb_check_4, 'check')
         else: 
-            self.ui_test_identification_response.pb_check_1.setStyleSheet(
-                dsBtnImg['null'])
-            self.ui_test_identification_response.pb_check_2.setStyleSheet(
-                dsBtnImg['null'])
-            self.ui_test_identification_response.pb_check_3.setStyleSheet(
-                dsBtnImg['null'])
-            self.ui_test_identification_response.pb_check_4.setStyleSheet(
-                dsBtnImg['null'])
+            dsImageCache.setButtonImage(self.ui_test_identification_response.pb_check_1, 'null')
+            dsImageCache.setButtonImage(self.ui_test_identification_response.pb_check_2, 'null')
+            dsImageCache.setButtonImage(self.ui_test_identification_response.pb_check_3, 'null')
+            dsImageCache.setButtonImage(self.ui_test_identification_response.pb_check_4, 'null')
 
     def selectResponseIdentification(self):
         if self.ui_test_identification_response.pg_scent.isVisible() == False \
@@ -2623,6 +2781,7 @@ class UiDlg(QWidget):
             # print("id: %d, data: %d" % (dsTestID.id_test_index, len(dsTestID.id_test_data)))
             dsTestID.id_test_index += 1
             dsTest.test_type = 0
+            self.telemetry.endSession()
             self.uiDlgHide(self.ui_test_identification_response)
             if dsSetting.dsParam['result_show_onoff'] == 1:
                 # 검사 결과 화면을 구성한다.
@@ -2889,12 +3048,14 @@ class UiDlg(QWidget):
         dsSound.playGuideSound('select_train_id')
 
     def initTrainIDScenes(self, scene_list):
+        self.adaptive_cleaner.startSession('train_id')
         dsTrainID.id_train_index = 0
         dsTrainID.id_train_scene_list = scene_list
         dsTrainID.id_train_size = len(dsTrainID.id_train_scene_list)
         print("RH Scene Size:", dsTrainID.id_train_size)
 
     def quitTrainIDScenes(self):
+        self.adaptive_cleaner.endSession()
         dsTrainID.id_train_index = 0
         dsTrainID.id_train_size = 0
         dsTrainID.id_train_scene_list = []
@@ -2948,23 +3109,19 @@ class UiDlg(QWidget):
         print(num_choice)
 
         if num_choice > 0:
-            screen.pb_select_1.setStyleSheet(
-                dsBtnImg[scene['img_btn1']])
+            dsImageCache.setButtonImage(screen.pb_select_1, scene['img_btn1'])
             screen.label_select_1.setText(
                 scene['label_select_1'])
         if num_choice > 1:
-            screen.pb_select_2.setStyleSheet(
-                dsBtnImg[scene['img_btn2']])
+            dsImageCache.setButtonImage(screen.pb_select_2, scene['img_btn2'])
             screen.label_select_2.setText(
                 scene['label_select_2'])
         if num_choice > 2:
-            screen.pb_select_3.setStyleSheet(
-                dsBtnImg[scene['img_btn3']])
+            dsImageCache.setButtonImage(screen.pb_select_3, scene['img_btn3'])
             screen.label_select_3.setText(
                 scene['label_select_3'])
         if num_choice > 3:
-            screen.pb_select_4.setStyleSheet(
-                dsBtnImg[scene['img_btn4']])
+            dsImageCache.setButtonImage(screen.pb_select_4, scene['img_btn4'])
             screen.label_select_4.setText(
                 scene['label_select_4'])
 
@@ -2976,7 +3133,7 @@ class UiDlg(QWidget):
     
     def emitTrainIDSceneScent(self, scene):
         if scene['scent'] > 0 and scene['scent'] < 9:
-            self.progressBarScentAndCleanForTrainID(scent_no=scene['scent'],
+            return self.progressBarScentAndCleanForTrainID(scent_no=scene['scent'],
                                       progress_bar=self.train_id_screen.pg_scent,
                                       label_text=self.train_id_screen.label_guide)
 
@@ -2985,6 +3142,8 @@ class UiDlg(QWidget):
 
     def uiTrainIDNext(self):
         print("uiTrainIDNext")
+        if self.emission_scheduler.running:
+            return
         # 다음 항목
         dsTrainID.id_train_index = dsTrainID.id_train_index + 1
         self.continueTrainIDScenes()
@@ -2994,110 +3153,71 @@ class UiDlg(QWidget):
         self.quitTrainIDScenes()
     
     def uiTrainIDChoice1Check1(self):
-        self.ui_train_id_scene_choice_1.pb_check_1.setStyleSheet(
-                dsBtnImg['check'])
+        dsImageCache.setButtonImage(self.ui_train_id_scene_choice_1.pb_check_1, 'check')
 
     def uiTrainIDChoice2Check1(self):
-        self.ui_train_id_scene_choice_2.pb_check_1.setStyleSheet(
-                dsBtnImg['check'])
-        self.ui_train_id_scene_choice_2.pb_check_2.setStyleSheet(
-                dsBtnImg['null'])
+        dsImageCache.setButtonImage(self.ui_train_id_scene_choice_2.pb_check_1, 'check')
+        dsImageCache.setButtonImage(self.ui_train_id_scene_choice_2.pb_check_2, 'null')
         
     def uiTrainIDChoice2Check2(self):
-        self.ui_train_id_scene_choice_2.pb_check_1.setStyleSheet(
-                dsBtnImg['null'])
-        self.ui_train_id_scene_choice_2.pb_check_2.setStyleSheet(
-                dsBtnImg['check'])
+        dsImageCache.setButtonImage(self.ui_train_id_scene_choice_2.pb_check_1, 'null')
+        dsImageCache.setButtonImage(self.ui_train_id_scene_choice_2.pb_check_2, 'check')
         
     def uiTrainIDChoice3Check1(self):
-        self.ui_train_id_scene_choice_3.pb_check_1.setStyleSheet(
-                dsBtnImg['check'])
-        self.ui_train_id_scene_choice_3.pb_check_2.setStyleSheet(
-                dsBtnImg['null'])
-        self.ui_train_id_scene_choice_3.pb_check_3.setStyleSheet(
-                dsBtnImg['null'])
+        dsImageCache.setButtonImage(self.ui_train_id_scene_choice_3.pb_check_1, 'check')
+        dsImageCache.setButtonImage(self.ui_train_id_scene_choice_3.pb_check_2, 'null')
+        dsImageCache.setButtonImage(self.ui_train_id_scene_choice_3.pb_check_3, 'null')
         
     def uiTrainIDChoice3Check2(self):
-        self.ui_train_id_scene_choice_3.pb_check_1.setStyleSheet(
-                dsBtnImg['null'])
-        self.ui_train_id_scene_choice_3.pb_check_2.setStyleSheet(
-                dsBtnImg['check'])
-        self.ui_train_id_scene_choice_3.pb_check_3.setStyleSheet(
-                dsBtnImg['null'])
+        dsImageCache.setButtonImage(self.ui_train_id_scene_choice_3.pb_check_1, 'null')
+        dsImageCache.setButtonImage(self.ui_train_id_scene_choice_3.pb_check_2, 'check')
+        dsImageCache.setButtonImage(self.ui_train_id_scene_choice_3.pb_check_3, 'null')
 
     def uiTrainIDChoice3Check3(self):
-        self.ui_train_id_scene_choice_3.pb_check_1.setStyleSheet(
-                dsBtnImg['null'])
-        self.ui_train_id_scene_choice_3.pb_check_2.setStyleSheet(
-                dsBtnImg['null'])
-        self.ui_train_id_scene_choice_3.pb_check_3.setStyleSheet(
-                dsBtnImg['check'])
+        dsImageCache.setButtonImage(self.ui_train_id_scene_choice_3.pb_check_1, 'null')
+        dsImageCache.setButtonImage(self.ui_train_id_scene_choice_3.pb_check_2, 'null')
+        dsImageCache.setButtonImage(self.ui_train_id_scene_choice_3.pb_check_3, 'check')
 
     def uiTrainIDChoice4Check1(self):
-        self.ui_train_id_scene_choice_4.pb_check_1.setStyleSheet(
-                dsBtnImg['check'])
-        self.ui_train_id_scene_choice_4.pb_check_2.setStyleSheet(
-                dsBtnImg['null'])
-        self.ui_train_id_scene_choice_4.pb_check_3.setStyleSheet(
-                dsBtnImg['null'])
-        self.ui_train_id_scene_choice_4.pb_check_4.setStyleSheet(
-                dsBtnImg['null'])
+        dsImageCache.setButtonImage(self.ui_train_id_scene_choice_4.pb_check_1, 'check')
+        dsImageCache.setButtonImage(self.ui_train_id_scene_choice_4.pb_check_2, 'null')
+        dsImageCache.setButtonImage(self.ui_train_id_scene_choice_4.pb_check_3, 'null')
+        dsImageCache.setButtonImage(self.ui_train_id_scene_choice_4.pb_check_4, 'null')
 
     def uiTrainIDChoice4Check2(self):
-        self.ui_train_id_scene_choice_4.pb_check_1.setStyleSheet(
-                dsBtnImg['null'])
-        self.ui_train_id_scene_choice_4.pb_check_2.setStyleSheet(
-                dsBtnImg['check'])
-        self.ui_train_id_scene_choice_4.pb_check_3.setStyleSheet(
-                dsBtnImg['null'])
-        self.ui_train_id_scene_choice_4.pb_check_4.setStyleSheet(
-                dsBtnImg['null'])
+        dsImageCache.setButtonImage(self.ui_train_id_scene_choice_4.pb_check_1, 'null')
+        dsImageCache.setButtonImage(self.ui_train_id_scene_choice_4.pb_check_2, 'check')
+        dsImageCache.setButtonImage(self.ui_train_id_scene_choice_4.pb_check_3, 'null')
+        dsImageCache.setButtonImage(self.ui_train_id_scene_choice_4.pb_check_4, 'null')
 
     def uiTrainIDChoice4Check3(self):
-        self.ui_train_id_scene_choice_4.pb_check_1.setStyleSheet(
-                dsBtnImg['null'])
-        self.ui_train_id_scene_choice_4.pb_check_2.setStyleSheet(
-                dsBtnImg['null'])
-        self.ui_train_id_scene_choice_4.pb_check_3.setStyleSheet(
-                dsBtnImg['check'])
-        self.ui_train_id_scene_choice_4.pb_check_4.setStyleSheet(
-                dsBtnImg['null'])
+        dsImageCache.setButtonImage(self.ui_train_id_scene_choice_4.pb_check_1, 'null')
+        dsImageCache.setButtonImage(self.ui_train_id_scene_choice_4.pb_check_2, 'null')
+        dsImageCache.setButtonImage(self.ui_train_id_scene_choice_4.pb_check_3, 'check')
+        dsImageCache.setButtonImage(self.ui_train_id_scene_choice_4.pb_check_4, 'null')
 
     def uiTrainIDChoice4Check4(self):
-        self.ui_train_id_scene_choice_4.pb_check_1.setStyleSheet(
-                dsBtnImg['null'])
-        self.ui_train_id_scene_choice_4.pb_check_2.setStyleSheet(
-                dsBtnImg['null'])
-        self.ui_train_id_scene_choice_4.pb_check_3.setStyleSheet(
-                dsBtnImg['null'])
-        self.ui_train_id_scene_choice_4.pb_check_4.setStyleSheet(
-                dsBtnImg['check'])
+        dsImageCache.setButtonImage(self.ui_train_id_scene_choice_4.pb_check_1, 'null')
+        dsImageCache.setButtonImage(self.ui_train_id_scene_choice_4.pb_check_2, 'null')
+        dsImageCache.setButtonImage(self.ui_train_id_scene_choice_4.pb_check_3, 'null')
+        dsImageCache.setButtonImage(self.ui_train_id_scene_choice_4.pb_check_4, 'check')
 
     def clearUiTrainIDChoiceChecks(self):
-        self.ui_train_id_scene_choice_1.pb_check_1.setStyleSheet(
-                dsBtnImg['null'])
-        self.ui_train_id_scene_choice_2.pb_check_1.setStyleSheet(
-                dsBtnImg['null'])
-        self.ui_train_id_scene_choice_2.pb_check_2.setStyleSheet(
-                dsBtnImg['null'])
-        self.ui_train_id_scene_choice_3.pb_check_1.setStyleSheet(
-                dsBtnImg['null'])
-        self.ui_train_id_scene_choice_3.pb_check_2.setStyleSheet(
-                dsBtnImg['null'])
-        self.ui_train_id_scene_choice_3.pb_check_3.setStyleSheet(
-                dsBtnImg['null'])
-        self.ui_train_id_scene_choice_4.pb_check_1.setStyleSheet(
-                dsBtnImg['null'])
-        self.ui_train_id_scene_choice_4.pb_check_2.setStyleSheet(
-                dsBtnImg['null'])
-        self.ui_train_id_scene_choice_4.pb_check_3.setStyleSheet(
-                dsBtnImg['null'])
-        self.ui_train_id_scene_choice_4.pb_check_4.setStyleSheet(
-                dsBtnImg['null'])
+        dsImageCache.setButtonImage(self.ui_train_id_scene_choice_1.pb_check_1, 'null')
+        dsImageCache.setButtonImage(self.ui_train_id_scene_choice_2.pb_check_1, 'null')
+        dsImageCache.setButtonImage(self.ui_train_id_scene_choice_2.pb_check_2, 'null')
+        dsImageCache.setButtonImage(self.ui_train_id_scene_choice_3.pb_check_1, 'null')
+        dsImageCache.setButtonImage(self.ui_train_id_scene_choice_3.pb_check_2, 'null')
+        dsImageCache.setButtonImage(self.ui_train_id_scene_choice_3.pb_check_3, 'null')
+        dsImageCache.setButtonImage(self.ui_train_id_scene_choice_4.pb_check_1, 'null')
+        dsImageCache.setButtonImage(self.ui_train_id_scene_choice_4.pb_check_2, 'null')
+        dsImageCache.setButtonImage(self.ui_train_id_scene_choice_4.pb_check_3, 'null')
+        dsImageCache.setButtonImage(self.ui_train_id_scene_choice_4.pb_check_4, 'null')
 
     ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
     # 훈련
     def initTrainST(self):
+        self.adaptive_cleaner.endSession()
         dsTrainST.st_train_index = 0
         self.ui_train_st_response.hs_selfcheck.setValue(0)
         self.ui_train_st_response.label_selfcheck.setText(
@@ -3134,20 +3254,16 @@ class UiDlg(QWidget):
         # 선택지 이미지 반영
         self.ui_train_st_select.label_select_1.setText(
             dsTrainST.st_train_data[1]['name'])
-        self.ui_train_st_select.pb_select_1.setStyleSheet(
-            dsBtnImg[dsTrainST.st_train_data[1]['name']])
+        dsImageCache.setButtonImage(self.ui_train_st_select.pb_select_1, dsTrainST.st_train_data[1]['name'])
         self.ui_train_st_select.label_select_2.setText(
             dsTrainST.st_train_data[2]['name'])
-        self.ui_train_st_select.pb_select_2.setStyleSheet(
-            dsBtnImg[dsTrainST.st_train_data[2]['name']])
+        dsImageCache.setButtonImage(self.ui_train_st_select.pb_select_2, dsTrainST.st_train_data[2]['name'])
         self.ui_train_st_select.label_select_3.setText(
             dsTrainST.st_train_data[3]['name'])
-        self.ui_train_st_select.pb_select_3.setStyleSheet(
-            dsBtnImg[dsTrainST.st_train_data[3]['name']])
+        dsImageCache.setButtonImage(self.ui_train_st_select.pb_select_3, dsTrainST.st_train_data[3]['name'])
         self.ui_train_st_select.label_select_4.setText(
             dsTrainST.st_train_data[4]['name'])
-        self.ui_train_st_select.pb_select_4.setStyleSheet(
-            dsBtnImg[dsTrainST.st_train_data[4]['name']])
+        dsImageCache.setButtonImage(self.ui_train_st_select.pb_select_4, dsTrainST.st_train_data[4]['name'])
         self.uiDlgShow(self.ui_train_st_select)
         # 사운드
         dsSound.playGuideSound('select_train_st')
@@ -3178,6 +3294,9 @@ class UiDlg(QWidget):
         dsSound.playGuideSound('intro_menu')
 
     def TrainSTProceed(self):
+        if self.emission_scheduler.running:
+            return
+        self.adaptive_cleaner.startSession('train_st')
         self.uiDlgHide(self.ui_train_st_select)
         self.ui_train_st_response.pb_back.setVisible(False)
         self.ui_train_st_response.pb_next.setVisible(False)
@@ -3189,23 +3308,23 @@ class UiDlg(QWidget):
         # self.ui_train_st_response.label_guide.setText('Olfactory training scent diffusion is in progress')
         self.ui_train_st_response.label_guide.setText(dsText.processText['progress_scent'])
         self.waitTrainSTReady()
-        self.ui_train_st_response.pb_select.setStyleSheet(
-            dsBtnImg[dsTrainST.st_train_data[dsTrainST.st_train_index]['name']])
+        dsImageCache.setButtonImage(self.ui_train_st_response.pb_select, dsTrainST.st_train_data[dsTrainST.st_train_index]['name'])
         self.ui_train_st_response.label_select.setText(
             dsTrainST.st_train_data[dsTrainST.st_train_index]['name'])
         self.uiDlgShow(self.ui_train_st_response)
-        self.sequentialTrainST()
-        self.rateTrainST()
+        if self.sequentialTrainST():
+            self.rateTrainST()
 
     def sequentialTrainST(self):
         # 사운드
         dsSound.playGuideSound('progress_scent_train')
         # 진행바
         self.ui_train_st_response.pg_scent.setVisible(True)
-        self.progressBarScentAndCleanForTrainST(scent_no=dsTrainST.st_train_data[dsTrainST.st_train_index]['scent_no'],
+        done = self.progressBarScentAndCleanForTrainST(scent_no=dsTrainST.st_train_data[dsTrainST.st_train_index]['scent_no'],
                                       progress_bar=self.ui_train_st_response.pg_scent,
                                       label_text=self.ui_train_st_response.label_guide)
         self.ui_train_st_response.pg_scent.setVisible(False)
+        return done
 
     def rateTrainST(self):
         self.ui_train_st_response.pb_back.setVisible(True)
@@ -3408,7 +3527,8 @@ class UiDlg(QWidget):
     def loadSettingsFile(self):
         if os.path.isfile('settings'):
             json_data = open('settings').read()
-            dsSetting.dsParam = json.loads(json_data)
+            # 다른 모듈이 import한 dsParam도 갱신되도록 같은 dict에 반영 (새 설정 키는 기본값 유지)
+            dsSetting.dsParam.update(json.loads(json_data))
             print(dsSetting.dsParam)
 
     # 설정을 파일에 저장한다.
@@ -3782,9 +3902,32 @@ class UiDlg(QWidget):
             chart_id.set_style(10)
             worksheet_id.insert_chart('F4', chart_id, {'x_offset': 5, 'y_offset': 5})
 
+        # 검사 중 온도/압력 요약 Sheet
+        self.saveTelemetrySheet(workbook)
+
         # 닫기
         workbook.close()
 
+    def saveTelemetrySheet(self, workbook):
+        summaries = self.telemetry.sessionSummaries()
+        if not summaries:
+            return
+        worksheet_tm = workbook.add_worksheet(dsText.reportText['report_sheet_telemetry'])
+        text = dsText.telemetryText
+        titles = [text['session'], text['start'], text['end'], text['count']]
+        for field in dsTelemetry.FIELDS:
+            for stat in ('min', 'mean', 'max'):
+                titles.append('%s %s' % (text[field], text[stat]))
+        worksheet_tm.write_row(0, 0, titles)
+        row = 1
+        for name, summary in summaries.items():
+            values = [name, summary['start'], summary['end'], summary['count']]
+            for field in dsTelemetry.FIELDS:
+                for stat in ('min', 'mean', 'max'):
+                    values.append(round(summary['%s_%s' % (field, stat)], 2))
+            worksheet_tm.write_row(row, 0, values)
+            row += 1
+
     def saveDataResultsTemp(self):
         self.setTestsScores()
         if len(dsTestTH.th_results) > 1 or \
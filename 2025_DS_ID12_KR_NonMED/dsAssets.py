@@ -0,0 +1,309 @@
+""" Image Assets (ui/images 화면 크기로 축소, 재압축, 작은 아이콘 atlas, dsImage가 사용하는 manifest 생성) """
+import os
+import sys
+import glob
+import json
+import time
+import hashlib
+import argparse
+import subprocess
+import xml.etree.ElementTree as ElementTree
+
+from PySide6.QtCore import Qt, QSize, QBuffer, QByteArray, QIODevice
+from PySide6.QtGui import QImage, QImageWriter, QImageReader, QPainter
+
+import dsImage
+
+SRC_DIR = "./ui/images"
+OUT_DIR = "./ui/images_opt"
+UI_DIR = "./ui"
+WEBP_QUALITY = 90       # PNG -> WebP (손실 압축, 알파 유지)
+JPG_QUALITY = 85
+MIN_SAVING = 0.1        # 10% 이상 줄어들 때만 변환 파일 사용
+RESIZE_MIN_SAVING = 0.1 # 픽셀 수가 10% 이상 줄어들 때만 축소 (1~2 픽셀 차이로 흐려지지 않도록)
+ATLAS_MAX_SIDE = 128    # 가로, 세로 모두 이 크기 이하인 이미지는 atlas로
+ATLAS_WIDTH = 1024
+ATLAS_PADDING = 2
+
+# dsImage 사전 -> 적용되는 위젯 (.ui 파일, objectName)
+DSIMAGE_WIDGETS = {'dsBtnImg': ('ui_test_identification_3_response.ui', 'pb_select_1'),
+                   'dsBgImg': ('ui_train_id_choice_0.ui', 'label_background')}
+
+def normPath(path):
+    # .ui, dsImage와 같은 형식 (./ui/images/...)
+    return "./" + os.path.relpath(path).replace(os.sep, '/')
+
+def fileHash(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+def _widgetGeometry(widget):
+    for prop in widget.findall('property'):
+        if prop.get('name') == 'geometry':
+            rect = prop.find('rect')
+            return int(rect.findtext('width')), int(rect.findtext('height'))
+    return None
+
+def _widgetStyle(widget):
+    for prop in widget.findall('property'):
+        if prop.get('name') == 'styleSheet':
+            return prop.findtext('string')
+    return None
+
+def collectUses(ui_dir=UI_DIR):
+    """
+    이미지별 화면 사용 (스타일시트 속성, 위젯 크기)
+    :return: dict (경로 -> [(속성, width, height)])
+    """
+    uses = {}
+    widgets = {}
+    for ui_path in sorted(glob.glob(os.path.join(ui_dir, "*.ui"))):
+        for widget in ElementTree.parse(ui_path).getroot().iter('widget'):
+            geometry = _widgetGeometry(widget)
+            widgets[(os.path.basename(ui_path), widget.get('name'))] = geometry
+            style = _widgetStyle(widget)
+            if not style or geometry is None:
+                continue
+            for prop, path in dsImage.STYLE_PATTERN.findall(style):
+                uses.setdefault(path, []).append((prop, geometry[0], geometry[1]))
+    for name, key in DSIMAGE_WIDGETS.items():
+        geometry = widgets.get(key)
+        if geometry is None:
+            continue
+        for style in getattr(dsImage, name).values():
+            for prop, path in dsImage.STYLE_PATTERN.findall(style):
+                uses.setdefault(path, []).append((prop, geometry[0], geometry[1]))
+    # dsResultImg 등 QPixmap으로 쓰는 이미지는 원본 크기
+    for path in dsImage.dsResultImg.values():
+        uses.setdefault(path, []).append((None, 0, 0))
+    return uses
+
+def targetSize(size, uses):
+    """
+    화면에 그려지는 최대 크기 (축소만)
+    border-image: 위젯 크기로 늘림, image: 비율 유지하여 위젯 안에 맞춤, background-image: 원본 크기
+    :return: QSize
+    """
+    width = 0
+    height = 0
+    for prop, widget_width, widget_height in uses:
+        if prop == 'border-image':
+            shown = QSize(widget_width, widget_height)
+        elif prop == 'image':
+            shown = size.scaled(widget_width, widget_height, Qt.AspectRatioMode.KeepAspectRatio)
+            if shown.width() > size.width():
+                shown = size
+        else:
+            return size
+        width = max(width, shown.width())
+        height = max(height, shown.height())
+    if not uses or width <= 0 or height <= 0:
+        return size
+    target = QSize(min(width, size.width()), min(height, size.height()))
+    if target.width() * target.height() > size.width() * size.height() * (1 - RESIZE_MIN_SAVING):
+        return size
+    return target
+
+def encodeImage(image, fmt, quality):
+    data = QByteArray()
+    buffer = QBuffer(data)
+    buffer.open(QIODevice.OpenModeFlag.WriteOnly)
+    writer = QImageWriter(buffer, fmt.encode())
+    writer.setQuality(quality)
+    if not writer.write(image):
+        raise RuntimeError("%s encode failed: %s" % (fmt, writer.errorString()))
+    buffer.close()
+    return bytes(data)
+
+def optimizeImage(path, uses, out_dir=OUT_DIR, src_dir=SRC_DIR):
+    """
+    화면 크기로 축소 후 PNG -> WebP, JPG -> JPG 재압축 (MIN_SAVING 이상 줄어들 때만 사용)
+    :return: dict (manifest 항목)
+    """
+    source = normPath(path)
+    image = QImage(path)
+    if image.isNull():
+        raise RuntimeError("image load failed: %s" % path)
+    size = image.size()
+    target = targetSize(size, uses)
+    resized = target != size
+    if resized:
+        image = image.scaled(target, Qt.AspectRatioMode.IgnoreAspectRatio, Qt.TransformationMode.SmoothTransformation)
+    source_bytes = os.path.getsize(path)
+    stem, ext = os.path.splitext(os.path.relpath(path, src_dir))
+    if ext.lower() == '.png':
+        fmt, quality, out_ext = 'webp', WEBP_QUALITY, '.webp'
+    else:
+        fmt, quality, out_ext = 'jpg', JPG_QUALITY, ext
+    data = encodeImage(image, fmt, quality)
+    entry = {'hash': fileHash(path),
+             'bytes': source_bytes,
+             'size': [size.width(), size.height()],
+             'out_size': [target.width(), target.height()]}
+    if not resized and len(data) > source_bytes * (1 - MIN_SAVING):
+        entry['path'] = source
+        entry['out_bytes'] = source_bytes
+        return entry
+    out_path = os.path.join(out_dir, stem + out_ext)
+    os.makedirs(os.path.dirname(out_path), exist_ok=True)
+    with open(out_path, 'wb') as f:
+        f.write(data)
+    entry['path'] = normPath(out_path)
+    entry['out_bytes'] = len(data)
+    return entry
+
+def packAtlases(images, out_dir=OUT_DIR):
+    """
+    작은 아이콘을 줄 단위(shelf)로 atlas PNG에 배치 (QPixmap 사용 시 dsImage.pixmap에서 잘라서 사용)
+    스타일시트 url()은 이미지 일부를 지정할 수 없으므로 개별 파일도 유지한다.
+    :return: list (atlas 경로)
+    """
+    small = [(source, entry) for source, entry in images.items()
+             if max(entry['out_size']) <= ATLAS_MAX_SIDE]
+    small.sort(key=lambda item: (-item[1]['out_size'][1], item[0]))
+    placed = []
+    x = y = row_height = 0
+    for source, entry in small:
+        width, height = entry['out_size']
+        if x + width > ATLAS_WIDTH:
+            x = 0
+            y += row_height + ATLAS_PADDING
+            row_height = 0
+        placed.append((source, entry, x, y))
+        x += width + ATLAS_PADDING
+        row_height = max(row_height, height)
+    if not placed:
+        return []
+    atlas = QImage(ATLAS_WIDTH, y + row_height, QImage.Format.Format_ARGB32_Premultiplied)
+    atlas.fill(Qt.GlobalColor.transparent)
+    painter = QPainter(atlas)
+    for source, entry, x, y in placed:
+        painter.drawImage(x, y, QImage(entry['path']))
+    painter.end()
+    atlas_path = normPath(os.path.join(out_dir, "atlas_0.png"))
+    os.makedirs(out_dir, exist_ok=True)
+    if not atlas.save(atlas_path, 'png'):
+        raise RuntimeError("atlas save failed: %s" % atlas_path)
+    for source, entry, x, y in placed:
+        entry['atlas'] = atlas_path
+        entry['rect'] = [x, y] + entry['out_size']
+    return [atlas_path]
+
+def loadManifest(path=dsImage.ASSET_MANIFEST):
+    if not os.path.isfile(path):
+        return {}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f).get('images', {})
+
+def buildAssets(src_dir=SRC_DIR, out_dir=OUT_DIR, manifest_path=dsImage.ASSET_MANIFEST, force=False):
+    """
+    빌드 단계: 원본 hash가 바뀐 이미지만 다시 변환, atlas와 manifest는 매번 새로 작성
+    :return: dict (manifest)
+    """
+    previous = {} if force else loadManifest(manifest_path)
+    uses = collectUses()
+    images = {}
+    built = 0
+    paths = sorted(glob.glob(os.path.join(src_dir, "**", "*.png"), recursive=True)
+                   + glob.glob(os.path.join(src_dir, "**", "*.jpg"), recursive=True))
+    for path in paths:
+        source = normPath(path)
+        entry = previous.get(source)
+        if entry is not None and os.path.isfile(entry['path']) and entry['hash'] == fileHash(path):
+            entry.pop('atlas', None)
+            entry.pop('rect', None)
+            images[source] = entry
+            continue
+        try:
+            images[source] = optimizeImage(path, uses.get(source, []), out_dir, src_dir)
+            built += 1
+        except RuntimeError as err:
+            print("dsAssets:", err)
+    atlases = packAtlases(images, out_dir)
+    manifest = {'webp_quality': WEBP_QUALITY,
+                'jpg_quality': JPG_QUALITY,
+                'atlases': atlases,
+                'images': images}
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent='\t')
+    print("built %d, up to date %d, atlas icons %d (%s)" % (
+        built, len(images) - built, sum(1 for entry in images.values() if 'atlas' in entry), manifest_path))
+    return manifest
+
+def _rss_kb():
+    # 현재 RSS (Linux /proc, 다른 OS는 None)
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+def benchDecode(paths, repeat=3):
+    """
+    이미지 디코딩 시간 (파일별 최소값 합계 ms), 디코딩 후 메모리 (bytes)
+    :return: (ms, bytes)
+    """
+    total_ms = 0
+    total_bytes = 0
+    for path in paths:
+        times = []
+        for i in range(repeat):
+            start = time.perf_counter()
+            image = QImageReader(path).read()
+            times.append((time.perf_counter() - start) * 1000)
+        total_ms += min(times)
+        total_bytes += image.sizeInBytes()
+    return total_ms, total_bytes
+
+def benchRss(paths):
+    """
+    모든 이미지를 QPixmap으로 올린 뒤 늘어난 RSS (KB)
+    :return: int 또는 None
+    """
+    from PySide6.QtGui import QPixmap
+    before = _rss_kb()
+    pixmaps = [QPixmap(path) for path in paths]
+    after = _rss_kb()
+    if before is None or after is None:
+        return None
+    return after - before
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="ui/images 최적화 (빌드 단계)")
+    parser.add_argument('--force', action='store_true', help="모두 다시 변환")
+    parser.add_argument('--bench', action='store_true', help="원본/최적화 이미지 크기, 디코딩 시간, RSS 비교")
+    parser.add_argument('--bench-mode', choices=('original', 'assets'), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.bench_mode is not None:
+        from PySide6.QtGui import QGuiApplication
+        app = QGuiApplication.instance() or QGuiApplication(sys.argv)
+        images = loadManifest()
+        paths = list(images) if args.bench_mode == 'original' else [entry['path'] for entry in images.values()]
+        print(json.dumps({'rss_kb': benchRss(paths)}))
+        sys.stdout.flush()
+        os._exit(0)
+    manifest = buildAssets(force=args.force)
+    if args.bench:
+        images = manifest['images']
+        original = list(images)
+        optimized = [entry['path'] for entry in images.values()]
+        source_bytes = sum(entry['bytes'] for entry in images.values())
+        out_bytes = sum(entry['out_bytes'] for entry in images.values())
+        print("disk: %.1f MB -> %.1f MB" % (source_bytes / 1e6, out_bytes / 1e6))
+        for name, paths in (('original', original), ('assets', optimized)):
+            ms, decoded = benchDecode(paths)
+            print("decode %-8s %7.1f ms, %.1f MB decoded" % (name, ms, decoded / 1e6))
+        # RSS는 QPixmap 캐시가 섞이지 않도록 별도 프로세스
+        for mode in ('original', 'assets'):
+            output = subprocess.run([sys.executable, __file__, '--bench-mode', mode],
+                                    capture_output=True).stdout.decode('utf-8')
+            lines = output.strip().splitlines()
+            rss_kb = json.loads(lines[-1])['rss_kb'] if lines and lines[-1].startswith('{') else None
+            print("rss    %-8s %s" % (mode, "n/a" if rss_kb is None else "%.1f MB" % (rss_kb / 1024)))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
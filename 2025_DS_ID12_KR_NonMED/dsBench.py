@@ -0,0 +1,360 @@
+""" Digital Scent 통신 성능 측정 (python dsBench.py, 정확성 검사는 python -m pytest tests) """
+import os
+import sys
+import json
+import time
+import random
+import struct
+import timeit
+import argparse
+import tempfile
+import subprocess
+
+import dsComm
+import dsCrc
+import dsFrame
+
+BASELINE_FILE = "dsBench.json"
+# 기준 대비 허용 범위 (처리량은 80% 미만, 지연은 150% 초과이면 성능 저하로 표시)
+RATE_TOLERANCE = 0.8
+LATENCY_TOLERANCE = 1.5
+
+# 기존 crc16_modbus 구현 (비교 기준)
+def _crc16ModbusLegacy(init_crc, dat, len):
+    crc = [init_crc >> 8, init_crc & 0xFF]
+    for b in dat:
+        tmp = dsCrc.CRC16_TABLE[crc[0] ^ b]
+        crc[0] = (tmp & 0xFF) ^ crc[1]
+        crc[1] = tmp>>8
+    return struct.pack("<H", (crc[0]|crc[1]<<8))
+
+# 기존 sendMsgForEmitClean 구현 (print 제외, 비교 기준)
+def _sendMsgForEmitCleanLegacy(id, func, address, qor, data_length, \
+                        data_command, data_scent_no, data_scent_pump_power, data_clean_pump_power, \
+                        data_scent_period, data_clean_period, data_scent_delay, data_cleanup_delay):
+    mid = bytes([id])
+    mfunc = bytes([func])
+    maddress = struct.pack(">H", address)
+    mqor = struct.pack(">H", qor)
+    mdata_length = bytes([data_length])
+    mdata_command = struct.pack(">H", data_command)
+    mdata_scent_no = struct.pack(">H", data_scent_no)
+    mdata_scent_pump_power = struct.pack(">H", data_scent_pump_power)
+    mdata_scent_period = struct.pack(">H", data_scent_period)
+    mdata_clean_pump_power = struct.pack(">H", data_clean_pump_power)
+    mdata_clean_period = struct.pack(">H", data_clean_period)
+    mdata_scent_delay = struct.pack(">H", data_scent_delay)
+    mdata_cleanup_delay = struct.pack(">H", data_cleanup_delay)
+    mdata = mid + mfunc + maddress + mqor + mdata_length + mdata_command \
+        + mdata_scent_no + mdata_scent_pump_power + mdata_clean_pump_power \
+        + mdata_scent_period + mdata_clean_period + mdata_scent_delay + mdata_cleanup_delay
+    return mdata + _crc16ModbusLegacy(0xFFFF, mdata, len(mdata))
+
+# 발향/세정 명령 프레임 인자 (requestScentNo 기본 설정값)
+BENCH_EMIT_CLEAN = (1, 16, 4200, 8, 16, 4, 10, 40, 80, 3, 4, 500, 500)
+
+# 발향/세정 명령 프레임 (CRC 제외 23 bytes)
+BENCH_FRAME = _sendMsgForEmitCleanLegacy(*BENCH_EMIT_CLEAN)[:-2]
+
+def _rate(stmt, number):
+    best = min(timeit.repeat(stmt, number=number, repeat=5))
+    return number / best
+
+def benchCrc(number=20000):
+    print("CRC16 (%d bytes, backend: %s)" % (len(BENCH_FRAME), dsCrc.CRC16_BACKEND))
+    frame = BENCH_FRAME
+    view = memoryview(bytearray(frame + dsCrc.crc16Bytes(frame)))
+    base = _rate(lambda: _crc16ModbusLegacy(0xFFFF, frame, len(frame)), number)
+    results = [
+        ('legacy crc16_modbus', base),
+        ('dsComm.crc16_modbus', _rate(lambda: dsComm.crc16_modbus(0xFFFF, frame, len(frame)), number)),
+        ('dsCrc.crc16', _rate(lambda: dsCrc.crc16(frame), number)),
+        ('dsCrc.checkFrame(memoryview)', _rate(lambda: dsCrc.checkFrame(view), number)),
+    ]
+    for name, rate in results:
+        print("  %-32s %12.0f calls/s  x%.2f" % (name, rate, rate / base))
+    return results
+
+def benchFrame(number=20000):
+    print("Frame build (emit/clean, %d bytes)" % (dsComm.emit_clean_struct.size + 2))
+    args = BENCH_EMIT_CLEAN
+    builder = dsComm.FrameBuilder()
+    base = _rate(lambda: _sendMsgForEmitCleanLegacy(*args), number)
+    results = [
+        ('legacy sendMsgForEmitClean', base),
+        ('dsComm.sendMsgForEmitClean', _rate(lambda: dsComm.sendMsgForEmitClean(*args), number)),
+        ('FrameBuilder.emitClean', _rate(lambda: builder.emitClean(*args), number)),
+    ]
+    for name, rate in results:
+        print("  %-32s %12.0f frames/s  x%.2f" % (name, rate, rate / base))
+    return results
+
+def _runEventLoop(ms):
+    from PySide6.QtCore import QEventLoop, QTimer
+    loop = QEventLoop()
+    QTimer.singleShot(ms, loop.quit)
+    loop.exec()
+
+def benchReader(idle_ms=2000, samples=50):
+    """
+    수신 backend 비교 (pty 사용, Linux/macOS): 대기 중 CPU 사용량, 깨어난 횟수,
+    바이트 도착 -> 프레임 시그널 처리까지의 지연
+    :return: dict (backend별 결과)
+    """
+    try:
+        from PySide6.QtCore import QCoreApplication, QEventLoop, QTimer
+        import dsSerial
+        import dsSimulator
+    except ImportError as err:
+        print("Reader backend: skipped (%s)" % err)
+        return {}
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv)
+    print("Reader backend (idle %d ms, %d frames)" % (idle_ms, samples))
+    # 응답 프레임 (온도/압력 읽기 응답)
+    frame = bytes.fromhex('01040641c4000003e8')
+    frame += dsCrc.crc16Bytes(frame)
+    results = {}
+    for backend in dsSerial.SERIAL_BACKENDS:
+        master, slave, slave_name = dsSimulator.openPty()
+        _serial, reader = dsSerial.createSerial(backend)
+        received = []
+        loop = QEventLoop()
+        def onFrame(data, rx_time):
+            received.append(time.perf_counter())
+            loop.quit()
+        reader._serial_received_data.connect(onFrame)
+        reader.start()
+        dsSerial._connect_default(_serial, reader, slave_name)
+        # 대기 중 (수신 데이터 없음)
+        _runEventLoop(100)
+        wakeups = reader.wakeup_count
+        cpu = time.process_time()
+        _runEventLoop(idle_ms)
+        cpu = time.process_time() - cpu
+        wakeups = reader.wakeup_count - wakeups
+        # 지연: 장치 쪽(pty master)에서 프레임을 쓴 시각 -> 시그널 처리 시각
+        latency = []
+        for i in range(samples):
+            del received[:]
+            _runEventLoop(10)
+            QTimer.singleShot(50, loop.quit)    # 응답이 없을 때 대기 한도
+            sent = time.perf_counter()
+            os.write(master, frame)
+            loop.exec()
+            if received:
+                latency.append((received[0] - sent) * 1000)
+        dsSerial._disconnect(_serial, reader)
+        reader.stop()
+        os.close(master)
+        os.close(slave)
+        latency.sort()
+        result = {'cpu_ms_per_s': cpu * 1000 / (idle_ms / 1000),
+                  'wakeups_per_s': wakeups / (idle_ms / 1000),
+                  'received': len(latency),
+                  'p50_ms': latency[len(latency) // 2] if latency else 0.0,
+                  'p95_ms': latency[int(len(latency) * 0.95)] if latency else 0.0}
+        results[backend] = result
+        print("  %-12s cpu %6.2f ms/s  wakeups %6.1f /s  latency p50 %6.3f ms  p95 %6.3f ms  (%d/%d)" % (
+            backend, result['cpu_ms_per_s'], result['wakeups_per_s'],
+            result['p50_ms'], result['p95_ms'], result['received'], samples))
+    return results
+
+def makeResponseFrame(rnd, slave_id=1):
+    """
+    임의의 정상 응답 프레임 (읽기 3/4, 쓰기 6/16 에코, 예외 응답)
+    :return: bytes (CRC 포함)
+    """
+    kind = rnd.randrange(4)
+    if kind == 0:
+        count = rnd.randrange(1, 16) * 2
+        body = bytes([slave_id, rnd.choice((3, 4)), count]) + bytes(rnd.randrange(256) for _ in range(count))
+    elif kind == 1:
+        body = struct.pack(">BBHH", slave_id, 6, rnd.randrange(65536), rnd.randrange(65536))
+    elif kind == 2:
+        body = struct.pack(">BBHH", slave_id, 16, rnd.randrange(65536), rnd.randrange(1, 124))
+    else:
+        body = bytes([slave_id, rnd.choice((3, 4, 6, 16)) | 0x80, rnd.randrange(1, 5)])
+    return body + dsCrc.crc16Bytes(body)
+
+def makeFrameStream(count, seed=1):
+    rnd = random.Random(seed)
+    frames = [makeResponseFrame(rnd) for _ in range(count)]
+    return frames, b"".join(frames)
+
+def benchParse(count=2000, baudrate=9600):
+    """
+    수신 프레임 분리 처리량 (RtuFrameParser.feed): 한 번에 넣는 경우와 작은 조각으로 나누어 넣는 경우
+    :return: dict
+    """
+    frames, stream = makeFrameStream(count)
+    print("RX parse (%d frames, %d bytes)" % (count, len(stream)))
+    results = {}
+    for name, chunk in (('bulk', len(stream)), ('chunk_8', 8), ('byte', 1)):
+        chunks = [stream[i:i + chunk] for i in range(0, len(stream), chunk)]
+        def parse():
+            parser = dsFrame.RtuFrameParser(baudrate)
+            parsed = 0
+            for data in chunks:
+                parsed += len(parser.feed(data, 0.0))
+            return parsed
+        best = min(timeit.repeat(parse, number=1, repeat=5))
+        results[name] = {'frames_per_s': count / best, 'bytes_per_s': len(stream) / best}
+        print("  %-10s %12.0f frames/s  %12.0f bytes/s" % (name, results[name]['frames_per_s'], results[name]['bytes_per_s']))
+    return results
+
+def roundTrip(baudrate, samples=30):
+    """
+    통신 속도 1개의 요청 -> 응답 왕복 지연 (pty 시뮬레이터, 선로 전송 시간 포함)
+    :return: dict
+    """
+    from PySide6.QtCore import QCoreApplication
+    import dsDeviceManager
+    import dsSimulator
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv)
+    builder = dsComm.FrameBuilder()
+    device, slave_name = dsSimulator.startPtyDevice(baudrate=baudrate, latency_ms=1, seed=1)
+    manager = dsDeviceManager.DeviceManager()
+    connection = manager.addConnection(dsDeviceManager.DEFAULT_CONNECTION, (1,))
+    connection.open(slave_name, baudrate)
+    latency = []
+    for i in range(samples):
+        start = time.perf_counter()
+        request = manager.submit(bytes(builder.readRegister(1, 4, 4043, 3)))
+        request.wait(1000)
+        if request.ok():
+            latency.append((time.perf_counter() - start) * 1000)
+    manager.shutdown()
+    device.stop()
+    latency.sort()
+    return {'received': len(latency),
+            'p50_ms': latency[len(latency) // 2] if latency else 0.0,
+            'p95_ms': latency[int(len(latency) * 0.95)] if latency else 0.0}
+
+def benchRoundTrip(samples=30, baudrates=None, isolated=True):
+    """
+    요청 -> 응답 왕복 지연 (통신 속도별, isolated: 통신 속도마다 새 프로세스에서 측정)
+    :return: dict (통신 속도별 결과)
+    """
+    try:
+        import dsSerial
+    except ImportError as err:
+        print("Round trip: skipped (%s)" % err)
+        return {}
+    if baudrates is None:
+        baudrates = dsSerial.BAUDRATES
+    print("Round trip (temperature/pressure read, %d samples)" % samples)
+    results = {}
+    for baudrate in baudrates:
+        if isolated:
+            result = runStage('round_trip', baudrate, samples)
+        else:
+            result = roundTrip(baudrate, samples)
+        if result is None:
+            print("  %6d bps  failed" % baudrate)
+            continue
+        results[str(baudrate)] = result
+        print("  %6d bps  p50 %7.2f ms  p95 %7.2f ms  (%d/%d)" % (
+            baudrate, result['p50_ms'], result['p95_ms'], result['received'], samples))
+    return results
+
+# 새 프로세스에서 실행하는 pty 측정 (python dsBench.py --stage 이름 --out 결과 파일 인자...)
+STAGES = {'reader': benchReader, 'round_trip': roundTrip}
+failed_stages = []
+
+def runStage(name, *args):
+    """
+    pty 측정 1개를 새 Python 프로세스에서 실행 (출력은 그대로 표시)
+    측정마다 Qt 스레드/이벤트 루프를 새로 시작하므로 앞 측정의 상태가 다음 측정에 남지 않음
+    :return: dict (실패하면 None)
+    """
+    fd, path = tempfile.mkstemp(prefix='dsBench_', suffix='.json')
+    os.close(fd)
+    try:
+        sys.stdout.flush()
+        command = [sys.executable, os.path.abspath(__file__), '--stage', name, '--out', path]
+        returncode = subprocess.call(command + [str(x) for x in args])
+        if returncode != 0:
+            print("Stage %s%s: exit %d" % (name, list(args), returncode))
+            failed_stages.append(name)
+            return None
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    finally:
+        os.remove(path)
+
+def _isLowerBetter(key):
+    return key.endswith('_ms') or key in ('cpu_ms_per_s', 'wakeups_per_s')
+
+def _isHigherBetter(section, key):
+    return key.endswith('_per_s') or section in ('crc', 'frame')
+
+def compareBaseline(results, baseline, section='', path=''):
+    """
+    기준 결과와 비교하여 성능이 떨어진 항목 목록
+    :return: list of str
+    """
+    regressions = []
+    for key, value in results.items():
+        if key not in baseline:
+            continue
+        name = path + '/' + str(key) if path else str(key)
+        base = baseline[key]
+        if isinstance(value, dict) and isinstance(base, dict):
+            regressions += compareBaseline(value, base, section or key, name)
+        elif isinstance(value, (int, float)) and isinstance(base, (int, float)) and base > 0:
+            if _isLowerBetter(key):
+                if value > base * LATENCY_TOLERANCE:
+                    regressions.append("%s: %.3f -> %.3f" % (name, base, value))
+            elif _isHigherBetter(section, key):
+                if value < base * RATE_TOLERANCE:
+                    regressions.append("%s: %.0f -> %.0f" % (name, base, value))
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Digital Scent 통신 성능 측정")
+    parser.add_argument('--save', metavar='PATH', nargs='?', const=BASELINE_FILE, help="결과를 기준 파일로 저장")
+    parser.add_argument('--baseline', metavar='PATH', help="기준 파일과 비교 (성능 저하 시 종료 코드 1)")
+    parser.add_argument('--quick', action='store_true', help="적은 반복 (pty 측정 제외)")
+    parser.add_argument('--stage', choices=sorted(STAGES), help=argparse.SUPPRESS)
+    parser.add_argument('--out', help=argparse.SUPPRESS)
+    parser.add_argument('stage_args', nargs='*', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.stage:
+        # runStage가 실행한 측정 1개
+        result = STAGES[args.stage](*args.stage_args)
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump(result, f)
+        # 결과를 저장했으므로 인터프리터 정리 없이 종료 (이 PySide6 빌드는 Qt 객체 정리 중에 abort 될 수 있음)
+        sys.stdout.flush()
+        os._exit(0)
+    number = 2000 if args.quick else 20000
+    results = {'crc': dict(benchCrc(number)),
+               'frame': dict(benchFrame(number)),
+               'parse': benchParse(200 if args.quick else 2000)}
+    if not args.quick:
+        results['reader'] = runStage('reader') or {}
+        results['round_trip'] = benchRoundTrip()
+    status = 0
+    if failed_stages:
+        status = 1
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compareBaseline(results, baseline['results'])
+        print("Baseline %s (%s): %s" % (args.baseline, baseline.get('date', ''),
+                                        "OK" if not regressions else "%d regressions" % len(regressions)))
+        for regression in regressions:
+            print("  " + regression)
+        if regressions:
+            status = 1
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump({'date': time.strftime('%Y-%m-%d %H:%M:%S'),
+                       'python': sys.version.split()[0],
+                       'crc_backend': dsCrc.CRC16_BACKEND,
+                       'results': results}, f, ensure_ascii=False, indent='\t')
+        print("Saved:", args.save)
+    return status
+
+if __name__ == '__main__':
+    sys.exit(main())
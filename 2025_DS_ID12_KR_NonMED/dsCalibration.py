@@ -0,0 +1,329 @@
+""" Pump Calibration (출력별 압력 측정, 장치별 보정 곡선, 발향 세기 -> 출력/시간 변환) """
+import os
+import sys
+import json
+import math
+import argparse
+from datetime import datetime
+
+from PySide6.QtCore import QObject, QTimer, QElapsedTimer
+from PySide6.QtCore import Signal # Slot
+
+import dsRegister
+
+CALIBRATION_FILE = "dsCalibration.json"
+SWEEP_POWERS = (20, 30, 40, 50, 60, 70, 80, 90, 100)
+SWEEP_PERIOD_S = 2      # 출력 단계별 발향 시간
+SWEEP_REST_MS = 1000    # 단계 사이 대기 (압력이 기준값으로 돌아올 때까지)
+SAMPLE_MS = 250         # 압력 읽기 주기 (압력 레지스터 캐시 200 ms보다 길게)
+SETTLE_MS = 500         # 펌프 기동 직후 샘플 제외
+BASELINE_SAMPLES = 2    # 단계마다 발향 전 기준 압력 샘플 수
+
+POWER_MIN = 10          # 변환 결과 출력 범위
+POWER_MAX = 100
+PERIOD_MIN_S = 1        # 발향 시간 범위 (레지스터 단위: 초)
+PERIOD_MAX_S = 30
+
+GAIN_ALPHA = 0.3        # 측정 유량 보정 (지수 평균 비율)
+GAIN_MIN = 0.5
+GAIN_MAX = 2.0
+
+def deviceKey(port, slave_id):
+    # 장치별 보정 값 구분 (포트 + slave id)
+    return "%s:%d" % (port, slave_id)
+
+def fitLine(points):
+    """
+    최소 제곱 직선 (압력 상승 = slope * 출력 + intercept)
+    :return: (slope, intercept)
+    """
+    n = len(points)
+    if n < 2:
+        raise ValueError("calibration needs at least 2 points")
+    mean_x = sum(x for x, y in points) / n
+    mean_y = sum(y for x, y in points) / n
+    sxx = sum((x - mean_x) ** 2 for x, y in points)
+    if sxx == 0:
+        raise ValueError("calibration points have the same power")
+    sxy = sum((x - mean_x) * (y - mean_y) for x, y in points)
+    slope = sxy / sxx
+    return slope, mean_y - slope * mean_x
+
+def makeCurve(points, temperature=None, base_pressure=None):
+    """
+    출력별 압력 상승 측정값 -> 보정 곡선
+    :return: dict
+    """
+    slope, intercept = fitLine(points)
+    if slope <= 0:
+        raise ValueError("pressure does not rise with pump power (slope %.3f)" % slope)
+    residual = math.sqrt(sum((y - (slope * x + intercept)) ** 2 for x, y in points) / len(points))
+    return {'slope': slope,
+            'intercept': intercept,
+            'residual': residual,
+            'points': [list(point) for point in points],
+            'temperature': temperature,
+            'base_pressure': base_pressure,
+            'date': datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+
+def predictRise(curve, power):
+    return max(0.0, curve['slope'] * power + curve['intercept'])
+
+def powerForRise(curve, rise):
+    return (rise - curve['intercept']) / curve['slope']
+
+def planEmission(curve, intensity, ref_power, ref_period, gain=1.0,
+                 power_min=POWER_MIN, power_max=POWER_MAX):
+    """
+    발향 세기 -> (출력, 발향 시간)
+    세기 1.0은 보정 시점에 ref_power/ref_period 설정으로 나가는 양 (압력 상승 x 시간).
+    같은 양을 가장 짧은 시간에 내보내도록 시간을 정하고 출력을 맞춘다.
+    gain: 측정 유량 / 보정 곡선 예측 (카트리지 상태, 온도 변화 반영)
+    :return: (int, int)
+    """
+    target = intensity * predictRise(curve, ref_power) * ref_period
+    rise_max = predictRise(curve, power_max) * gain
+    if target <= 0 or rise_max <= 0:
+        return ref_power, ref_period
+    period = min(max(int(math.ceil(target / rise_max)), PERIOD_MIN_S), PERIOD_MAX_S)
+    power = powerForRise(curve, target / period / gain)
+    power = min(max(int(round(power)), power_min), power_max)
+    return power, period
+
+def loadCalibrations(path=CALIBRATION_FILE):
+    """
+    장치별 보정 곡선
+    :return: dict (deviceKey -> curve)
+    """
+    if not os.path.isfile(path):
+        return {}
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError) as err:
+        print("dsCalibration loadCalibrations:", err)
+        return {}
+
+def saveCalibrations(calibrations, path=CALIBRATION_FILE):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(calibrations, f, ensure_ascii=False, indent='\t')
+
+class CalibrationSweep(QObject):
+    """
+    출력 단계별로 짧게 발향하면서 압력을 읽어 보정 곡선을 만든다.
+    단계마다 발향 전 기준 압력과 발향 중 압력(펌프 기동 직후 제외)의 평균 차이를 측정값으로 사용한다.
+    모든 명령은 RegisterClient(장치 명령 큐)를 거치므로 다른 요청과 섞여도 순서가 유지된다.
+    """
+    progress = Signal(int, int, name="progress")         # 완료 단계, 전체 단계
+    finished = Signal(object, name="finished")           # curve dict 또는 None (실패/취소)
+
+    def __init__(self, register_client, scent_no=1, powers=SWEEP_POWERS, period_s=SWEEP_PERIOD_S, parent=None):
+        QObject.__init__(self, parent)
+        self.register_client = register_client
+        self.scent_no = scent_no
+        self.powers = list(powers)
+        self.period_s = period_s
+        self.timer = QTimer(self)
+        self.timer.setInterval(SAMPLE_MS)
+        self.timer.timeout.connect(self._onTick)
+        self.clock = QElapsedTimer()
+        self.running = False
+        self.reset()
+
+    def reset(self):
+        self.level = 0
+        self.state = 'baseline'
+        self.baseline = []
+        self.samples = []
+        self.points = []
+        self.base_pressures = []
+        self.temperature = None
+        self.pending = False
+        self.error = None
+
+    def start(self):
+        if self.running:
+            return False
+        self.reset()
+        self.running = True
+        self.register_client.read(('temperature',), callback=self._onTemperature)
+        self.clock.start()
+        self.timer.start()
+        return True
+
+    def cancel(self):
+        if not self.running:
+            return
+        self.register_client.write({'command': dsRegister.CMD_STOP})
+        self._finish("cancelled")
+
+    def _onTemperature(self, values):
+        self.temperature = values.get('temperature')
+
+    def _emit(self, power):
+        # 발향만 (세정 없음), 단계 사이 대기는 여기서 관리
+        self.register_client.write({'command': dsRegister.CMD_EMIT,
+                                    'scent_no': self.scent_no,
+                                    'scent_power': power,
+                                    'clean_power': 0,
+                                    'scent_period': self.period_s,
+                                    'clean_period': 0,
+                                    'scent_delay': 0,
+                                    'cleanup_delay': 0})
+
+    def _readPressure(self, samples):
+        if self.pending:
+            return
+        self.pending = True
+        def onValues(values):
+            self.pending = False
+            if 'pressure' in values:
+                samples.append(values['pressure'])
+        self.register_client.read(('pressure',), callback=onValues)
+
+    def _onTick(self):
+        if not self.running:
+            return
+        elapsed = self.clock.elapsed()
+        if self.state == 'baseline':
+            if len(self.baseline) < BASELINE_SAMPLES:
+                self._readPressure(self.baseline)
+                return
+            self._emit(self.powers[self.level])
+            self.samples = []
+            self.state = 'emit'
+            self.clock.start()
+        elif self.state == 'emit':
+            if elapsed < SETTLE_MS:
+                return
+            if elapsed < self.period_s * 1000 - SAMPLE_MS:
+                # 펌프가 멈추기 전에 응답이 오도록 마지막 주기는 읽지 않음
+                self._readPressure(self.samples)
+                return
+            if elapsed < self.period_s * 1000:
+                return
+            self._addPoint()
+            self.state = 'rest'
+            self.clock.start()
+        elif self.state == 'rest' and elapsed >= SWEEP_REST_MS:
+            self.level += 1
+            self.progress.emit(self.level, len(self.powers))
+            if self.level >= len(self.powers):
+                self._finish()
+                return
+            self.baseline = []
+            self.state = 'baseline'
+
+    def _addPoint(self):
+        power = self.powers[self.level]
+        if not self.baseline or not self.samples:
+            print("CalibrationSweep: no pressure samples at power", power)
+            return
+        base = sum(self.baseline) / len(self.baseline)
+        rise = sum(self.samples) / len(self.samples) - base
+        self.base_pressures.append(base)
+        self.points.append((power, rise))
+        print("CalibrationSweep: power %d rise %.1f (%d samples)" % (power, rise, len(self.samples)))
+
+    def _finish(self, error=None):
+        self.timer.stop()
+        self.running = False
+        curve = None
+        if error is None:
+            try:
+                base_pressure = sum(self.base_pressures) / len(self.base_pressures) if self.base_pressures else None
+                curve = makeCurve(self.points, self.temperature, base_pressure)
+            except ValueError as err:
+                error = str(err)
+        self.error = error
+        if error is not None:
+            print("CalibrationSweep failed:", error)
+        self.finished.emit(curve)
+
+class FlowCompensator(QObject):
+    """
+    검사 중 발향 단계의 압력(온도/압력 주기 측정 값)을 보정 곡선 예측과 비교하여 gain을 갱신한다.
+    카트리지 잔량, 주변 온도 등으로 유량이 달라지면 다음 발향부터 출력/시간 변환에 반영된다.
+    """
+    def __init__(self, scheduler, telemetry, parent=None):
+        QObject.__init__(self, parent)
+        self.curve = None
+        self.gain = 1.0
+        self.power = None       # 진행 중인 발향 출력 (planEmission 결과)
+        self.phase = None
+        self.phase_clock = QElapsedTimer()
+        self.base_pressure = None
+        self.samples = []
+        self.update_count = 0
+        self.measured = None    # 마지막 발향의 압력 상승 (측정/예측)
+        self.predicted = None
+        scheduler.phaseChanged.connect(self._onPhase)
+        scheduler.finished.connect(self._onFinished)
+        telemetry.sampled.connect(self._onSampled)
+
+    def setCurve(self, curve):
+        self.curve = curve
+        self.gain = 1.0
+        self.base_pressure = None if curve is None else curve.get('base_pressure')
+
+    def _onPhase(self, name):
+        if self.phase == 'emit':
+            self._update()
+        self.phase = name
+        self.phase_clock.start()
+        self.samples = []
+
+    def _onFinished(self, elapsed_ms):
+        self._onPhase(None)
+
+    def _onSampled(self, stamp, temperature, pressure):
+        if self.phase == 'emit':
+            if self.phase_clock.elapsed() >= SETTLE_MS:
+                self.samples.append(pressure)
+        elif self.phase in (None, 'interval'):
+            # 펌프가 멈춘 구간 압력 (기준값)
+            if self.base_pressure is None:
+                self.base_pressure = pressure
+            else:
+                self.base_pressure += (pressure - self.base_pressure) * GAIN_ALPHA
+
+    def _update(self):
+        if self.curve is None or self.power is None or not self.samples or self.base_pressure is None:
+            return
+        predicted = predictRise(self.curve, self.power)
+        if predicted <= 0:
+            return
+        measured = sum(self.samples) / len(self.samples) - self.base_pressure
+        ratio = min(max(measured / predicted, GAIN_MIN), GAIN_MAX)
+        self.gain += (ratio - self.gain) * GAIN_ALPHA
+        self.update_count += 1
+        self.measured = measured
+        self.predicted = predicted
+
+    def stats(self):
+        return {'gain': self.gain,
+                'updates': self.update_count,
+                'measured': self.measured,
+                'predicted': self.predicted}
+
+def main(argv=None):
+    # 장치 없이 보정 파일 확인 (변환 결과 표)
+    parser = argparse.ArgumentParser(description="발향 출력 보정 파일 확인")
+    parser.add_argument('--path', default=CALIBRATION_FILE)
+    parser.add_argument('--power', type=int, default=40, help="기준 출력 (scent_power)")
+    parser.add_argument('--period', type=int, default=3, help="기준 발향 시간 (scent_run_time)")
+    args = parser.parse_args(argv)
+    calibrations = loadCalibrations(args.path)
+    if not calibrations:
+        print("no calibration:", args.path)
+        return 1
+    for key, curve in calibrations.items():
+        print("%s: rise = %.3f * power + %.3f (residual %.2f, %s, %s C)" % (
+            key, curve['slope'], curve['intercept'], curve['residual'], curve['date'], curve['temperature']))
+        for intensity in (0.5, 1.0, 1.5, 2.0):
+            power, period = planEmission(curve, intensity, args.power, args.period)
+            print("  intensity %.1f -> power %d, period %d s" % (intensity, power, period))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
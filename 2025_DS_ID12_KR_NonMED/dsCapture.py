@@ -0,0 +1,208 @@
+""" Serial Capture (송수신 바이너리 기록, 재생) """
+import os
+import sys
+import mmap
+import time
+import struct
+import argparse
+import threading
+from datetime import datetime
+
+from PySide6.QtCore import QThread
+from PySide6.QtCore import Signal # Slot
+
+import dsFrame
+import dsMetrics
+
+CAPTURE_DIR = "./capture"
+CAPTURE_EXT = ".dscap"
+CHUNK_SIZE = 1 << 20    # 파일을 늘리는 단위 (1 MB)
+
+# 파일 헤더: magic, version, baudrate
+HEADER = struct.Struct('<6sHI')
+MAGIC = b'DSCAP\x00'
+VERSION = 1
+# 레코드: 방향, 길이, 시각(time.monotonic 초) + 바이트
+RECORD = struct.Struct('<BHd')
+DIR_END = 0     # 미리 할당된 빈 영역 (기록 끝)
+DIR_RX = 1
+DIR_TX = 2
+DIR_NAMES = {DIR_RX: 'RX', DIR_TX: 'TX'}
+
+def capturePath(name, directory=CAPTURE_DIR):
+    # 예: ./capture/default_20250101_093000.dscap
+    return os.path.join(directory, "%s_%s%s" % (name, datetime.now().strftime('%Y%m%d_%H%M%S'), CAPTURE_EXT))
+
+class CaptureWriter:
+    """
+    mmap 추가 전용 기록 파일
+    CHUNK_SIZE 단위로 미리 할당하고 레코드를 이어서 쓴다. 빈 영역은 0(DIR_END)이므로
+    프로그램이 비정상 종료되어도 마지막으로 쓴 레코드까지 읽을 수 있다.
+    수신 스레드(RX)와 GUI 스레드(TX)에서 함께 호출한다.
+    """
+    def __init__(self, path, baudrate=9600, chunk_size=CHUNK_SIZE):
+        directory = os.path.dirname(path)
+        if directory and not os.path.isdir(directory):
+            os.makedirs(directory)
+        self.path = path
+        self.chunk_size = chunk_size
+        self.lock = threading.Lock()
+        self.file = open(path, 'w+b')
+        self.file.truncate(chunk_size)
+        self.map = mmap.mmap(self.file.fileno(), chunk_size)
+        self.map[:HEADER.size] = HEADER.pack(MAGIC, VERSION, baudrate)
+        self.offset = HEADER.size
+        self.record_count = 0
+
+    def setBaudrate(self, baudrate):
+        with self.lock:
+            if self.map is not None:
+                self.map[:HEADER.size] = HEADER.pack(MAGIC, VERSION, baudrate)
+
+    def append(self, direction, data, stamp=None):
+        if stamp is None:
+            stamp = time.monotonic()
+        size = RECORD.size + len(data)
+        with self.lock:
+            if self.map is None:
+                return
+            end = self.offset + size
+            if end + RECORD.size > len(self.map):
+                # 다음 기록 끝 표시(DIR_END)가 들어갈 공간까지 확보
+                new_size = (end // self.chunk_size + 1) * self.chunk_size
+                self.map.close()
+                self.file.truncate(new_size)
+                self.map = mmap.mmap(self.file.fileno(), new_size)
+            RECORD.pack_into(self.map, self.offset, direction, len(data), stamp)
+            self.map[self.offset + RECORD.size:end] = data
+            self.offset = end
+            self.record_count += 1
+
+    def close(self):
+        # 사용한 크기로 줄여서 닫음
+        with self.lock:
+            if self.map is None:
+                return
+            self.map.flush()
+            self.map.close()
+            self.map = None
+            self.file.truncate(self.offset)
+            self.file.close()
+
+def readCapture(path):
+    """
+    기록 파일 읽기
+    :return: (baudrate, list of (stamp, direction, bytes))
+    """
+    records = []
+    with open(path, 'rb') as f:
+        data = f.read()
+    magic, version, baudrate = HEADER.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise ValueError("not a capture file: %s" % path)
+    offset = HEADER.size
+    while offset + RECORD.size <= len(data):
+        direction, length, stamp = RECORD.unpack_from(data, offset)
+        if direction == DIR_END:
+            break
+        offset += RECORD.size
+        records.append((stamp, direction, data[offset:offset + length]))
+        offset += length
+    return baudrate, records
+
+def replayFrames(path, speed=0):
+    """
+    RX 기록을 수신 경로(RtuFrameParser)에 다시 넣어 프레임 분리
+    프레임 간격 판단에는 기록된 시각을 사용하므로 재생 속도와 관계없이 결과가 같다.
+    speed: 0이면 대기 없이, 1이면 기록 속도, 10이면 10배속
+    :return: dict (frames, crc_errors, dropped_bytes, parse_s, ...)
+    """
+    baudrate, records = readCapture(path)
+    parser = dsFrame.RtuFrameParser(baudrate)
+    frames = []
+    parse_s = 0.0
+    start = time.monotonic()
+    first = records[0][0] if records else 0.0
+    for stamp, direction, data in records:
+        if speed > 0:
+            delay = (stamp - first) / speed - (time.monotonic() - start)
+            if delay > 0:
+                time.sleep(delay)
+        if direction == DIR_TX:
+            frames.append((stamp, DIR_TX, data))
+            continue
+        parse_start = time.perf_counter()
+        parsed = parser.feed(data, stamp)
+        parse_s += time.perf_counter() - parse_start
+        for frame in parsed:
+            frames.append((stamp, DIR_RX, frame))
+    return {'baudrate': baudrate,
+            'records': len(records),
+            'frames': frames,
+            'rx_frames': sum(1 for frame in frames if frame[1] == DIR_RX),
+            'tx_frames': sum(1 for frame in frames if frame[1] == DIR_TX),
+            'crc_errors': parser.crc_errors,
+            'dropped_bytes': parser.dropped_bytes,
+            'duration_s': records[-1][0] - first if records else 0.0,
+            'parse_s': parse_s}
+
+class CaptureReplayThread(QThread):
+    """
+    기록 파일을 수신 스레드처럼 재생 (SerialReadThread와 같은 _serial_received_data 시그널)
+    DeviceConnection._onFrame / DeviceClient.onFrame에 연결하여 응답 처리까지 재현한다.
+    """
+    _serial_received_data = Signal(bytes, float, name="serialReceivedData")
+    replay_finished = Signal(object, name="replayFinished")    # replayFrames 결과 (frames 제외)
+
+    def __init__(self, path, speed=1.0):
+        QThread.__init__(self)
+        self.path = path
+        self.speed = speed
+        self.running = True
+        self.console = None
+
+    def stop(self):
+        self.running = False
+        self.wait()
+
+    def run(self):
+        baudrate, records = readCapture(self.path)
+        self.parser = dsFrame.RtuFrameParser(baudrate)
+        start = time.monotonic()
+        first = records[0][0] if records else 0.0
+        for stamp, direction, data in records:
+            if not self.running:
+                break
+            if self.speed > 0:
+                delay = (stamp - first) / self.speed - (time.monotonic() - start)
+                if delay > 0:
+                    time.sleep(delay)
+            if direction == DIR_RX:
+                for frame in self.parser.feed(data, stamp):
+                    if self.console is not None:
+                        self.console.appendFrame("RX", frame)
+                    self._serial_received_data.emit(frame, dsMetrics.now())
+            elif self.console is not None:
+                self.console.appendFrame("TX", data)
+        self.replay_finished.emit({'records': len(records),
+                                   'crc_errors': self.parser.crc_errors,
+                                   'dropped_bytes': self.parser.dropped_bytes})
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="송수신 기록 재생")
+    parser.add_argument('path')
+    parser.add_argument('--speed', type=float, default=0, help="0: 대기 없음, 1: 기록 속도")
+    parser.add_argument('--dump', action='store_true', help="프레임 출력")
+    args = parser.parse_args(argv)
+    result = replayFrames(args.path, args.speed)
+    if args.dump:
+        first = result['frames'][0][0] if result['frames'] else 0.0
+        for stamp, direction, frame in result['frames']:
+            print("%10.3f %s(%d):%s" % ((stamp - first) * 1000, DIR_NAMES[direction], len(frame), frame.hex()))
+    for key, value in result.items():
+        if key != 'frames':
+            print(key, value)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
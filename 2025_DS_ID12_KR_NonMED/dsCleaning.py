@@ -0,0 +1,134 @@
+""" Adaptive Cleaning (세정 중 압력이 기준값으로 돌아오면 세정 종료, 검사별 단축 시간 기록) """
+import os
+import csv
+from datetime import datetime
+
+from PySide6.QtCore import QObject, QTimer, QElapsedTimer
+from PySide6.QtCore import Signal # Slot
+
+import dsMetrics
+import dsRegister
+import dsSetting
+
+POLL_MS = 250               # 세정 중 압력 읽기 주기 (압력 레지스터 캐시 200 ms보다 길게)
+SETTLED_SAMPLES = 2         # 연속으로 기준값 이내이면 세정 완료
+TOLERANCE_MIN = 5           # 기준 압력 허용 범위 (압력 단위)
+TOLERANCE_RATIO = 0.05      # 세정 중 최대 상승 대비 허용 범위
+BASELINE_ALPHA = 0.3        # 기준 압력 (지수 평균 비율)
+LOG_FILE = "cleaning.csv"   # METRICS_DIR 아래 검사별 세정 기록
+
+class AdaptiveCleaner(QObject):
+    """
+    발향 스케줄러의 'clean' 단계 동안 압력을 읽어 기준 압력(펌프가 멈춘 구간의 온도/압력 측정 값)으로
+    돌아오면 장치에 정지 명령을 보내고 스케줄러의 세정 단계를 끝낸다.
+    설정 cleaning_adaptive_onoff가 켜져 있을 때만 동작하며, cleaning_min_time_ms 전에는 끝내지 않고
+    최대는 단계 길이(cleaning_run_time)이다.
+    """
+    cleaned = Signal(int, int, name="cleaned")     # 실제 세정 시간 ms, 단축 시간 ms
+
+    def __init__(self, scheduler, telemetry, register_client, parent=None):
+        QObject.__init__(self, parent)
+        self.scheduler = scheduler
+        self.register_client = register_client
+        self.base_pressure = None
+        self.phase = None
+        self.peak_rise = 0
+        self.settled = 0
+        self.pending = False
+        self.clock = QElapsedTimer()
+        self.timer = QTimer(self)
+        self.timer.setInterval(POLL_MS)
+        self.timer.timeout.connect(self._onPoll)
+        self.session_name = None
+        self.sessions = {}      # 검사 이름 -> {'cycles', 'clean_ms', 'saved_ms'}
+        scheduler.phaseChanged.connect(self._onPhase)
+        scheduler.finished.connect(self._onFinished)
+        telemetry.sampled.connect(self._onSampled)
+
+    def _onSampled(self, stamp, temperature, pressure):
+        # 펌프가 멈춘 구간 압력 (기준값)
+        if self.scheduler.running and self.phase != 'interval':
+            return
+        if self.base_pressure is None:
+            self.base_pressure = pressure
+        else:
+            self.base_pressure += (pressure - self.base_pressure) * BASELINE_ALPHA
+
+    def _onPhase(self, name):
+        self.timer.stop()
+        self.phase = name
+        if name == 'clean' and dsSetting.dsParam['cleaning_adaptive_onoff'] == 1 and self.base_pressure is not None:
+            self.peak_rise = 0
+            self.settled = 0
+            self.clock.start()
+            self.timer.start()
+
+    def _onFinished(self, elapsed_ms):
+        self.timer.stop()
+        self.phase = None
+
+    def _onPoll(self):
+        if self.pending or self.scheduler.paused:
+            return
+        self.pending = True
+        self.register_client.read(('pressure',), callback=self._onPressure)
+
+    def _onPressure(self, values):
+        self.pending = False
+        if self.phase != 'clean' or not self.timer.isActive() or 'pressure' not in values:
+            return
+        rise = values['pressure'] - self.base_pressure
+        self.peak_rise = max(self.peak_rise, rise)
+        tolerance = max(TOLERANCE_MIN, self.peak_rise * TOLERANCE_RATIO)
+        self.settled = self.settled + 1 if rise <= tolerance else 0
+        if self.settled >= SETTLED_SAMPLES and self.clock.elapsed() >= dsSetting.dsParam['cleaning_min_time_ms']:
+            self._endClean()
+
+    def _endClean(self):
+        self.timer.stop()
+        clean_ms = self.clock.elapsed()
+        # 장치의 남은 세정/세정 후 대기를 멈추고 스케줄러는 다음 단계로
+        self.register_client.write({'command': dsRegister.CMD_STOP})
+        saved_ms = self.scheduler.endPhase()
+        session = self.sessions.setdefault(self.session_name or 'default', {'cycles': 0, 'clean_ms': 0, 'saved_ms': 0})
+        session['cycles'] += 1
+        session['clean_ms'] += clean_ms
+        session['saved_ms'] += saved_ms
+        print("AdaptiveCleaner: clean %d ms, saved %d ms" % (clean_ms, saved_ms))
+        self.cleaned.emit(clean_ms, saved_ms)
+
+    def startSession(self, name):
+        # 같은 이름이 진행 중이면 이어서 기록
+        if self.session_name == name:
+            return
+        self.endSession()
+        self.session_name = name
+        self.sessions[name] = {'cycles': 0, 'clean_ms': 0, 'saved_ms': 0}
+
+    def endSession(self):
+        """
+        검사별 단축 시간 기록 (세정 단축이 있었던 경우만)
+        :return: dict 또는 None
+        """
+        name = self.session_name
+        self.session_name = None
+        session = self.sessions.get(name)
+        if session is None or session['cycles'] == 0:
+            return None
+        print("AdaptiveCleaner session %s: %d cycles, cleaning %.1f s, saved %.1f s" % (
+            name, session['cycles'], session['clean_ms'] / 1000, session['saved_ms'] / 1000))
+        writeLog(name, session)
+        return session
+
+def writeLog(name, session, directory=dsMetrics.METRICS_DIR):
+    # 세션마다 한 줄 추가 (date, session, cycles, clean_s, saved_s)
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, LOG_FILE)
+    is_new = not os.path.isfile(path)
+    with open(path, 'a', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        if is_new:
+            writer.writerow(['date', 'session', 'cycles', 'clean_s', 'saved_s'])
+        writer.writerow([datetime.now().strftime('%Y-%m-%d %H:%M:%S'), name, session['cycles'],
+                         '%.1f' % (session['clean_ms'] / 1000), '%.1f' % (session['saved_ms'] / 1000)])
+    return path
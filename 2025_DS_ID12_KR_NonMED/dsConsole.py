@@ -0,0 +1,81 @@
+""" Serial Console (송수신 로그 버퍼링, 일정 주기로 묶어서 표시) """
+from collections import deque
+
+from PySide6.QtCore import QObject, QTimer
+from PySide6.QtWidgets import QPlainTextEdit
+
+FLUSH_MS = 50           # 화면 갱신 주기 (20 Hz)
+PENDING_MAX = 1000      # 화면에 표시되기 전 대기 줄 최대 개수 (초과 시 오래된 줄부터 버림)
+CONSOLE_MAX_LINES = 2000
+
+def formatFrame(direction, data):
+    # 예: RX(8):01061068000300d7
+    return "%s(%d):%s" % (direction, len(data), data.hex())
+
+class SerialConsole(QObject):
+    """
+    송수신 로그를 링 버퍼에 모았다가 FLUSH_MS마다 한 번에 위젯에 추가한다.
+    append는 수신 스레드에서도 호출할 수 있고(deque append), 위젯 갱신은 GUI 스레드에서만 한다.
+    위젯이 보이지 않는 동안에는 표시하지 않고 최근 PENDING_MAX 줄만 유지한다.
+    """
+    def __init__(self, parent=None, flush_ms=FLUSH_MS, pending_max=PENDING_MAX):
+        QObject.__init__(self, parent)
+        self.widget = None
+        self.pending = deque(maxlen=pending_max)
+        self.appended_count = 0
+        self.flushed_count = 0
+        self.paused = False
+        self.timer = QTimer(self)
+        self.timer.setInterval(flush_ms)
+        self.timer.timeout.connect(self.flush)
+        self.timer.start()
+
+    def setWidget(self, widget, max_lines=CONSOLE_MAX_LINES):
+        self.widget = widget
+        if isinstance(widget, QPlainTextEdit):
+            # 오래된 줄은 위젯이 자동으로 삭제 (문서 크기 제한)
+            widget.setMaximumBlockCount(max_lines)
+
+    def setPendingMax(self, pending_max):
+        self.pending = deque(self.pending, maxlen=pending_max)
+
+    def append(self, text):
+        self.pending.append(text)
+        self.appended_count += 1
+
+    def appendFrame(self, direction, data):
+        self.append(formatFrame(direction, data))
+
+    def dropped(self):
+        # 표시되지 못하고 버려진 줄 수
+        return self.appended_count - self.flushed_count - len(self.pending)
+
+    def pause(self):
+        self.paused = True
+
+    def resume(self):
+        self.paused = False
+
+    def clear(self):
+        self.flushed_count += len(self.pending)
+        self.pending.clear()
+        if self.widget is not None:
+            self.widget.clear()
+
+    def flush(self):
+        widget = self.widget
+        if widget is None or self.paused or not self.pending or not widget.isVisible():
+            return
+        pending = self.pending
+        lines = [pending.popleft() for _ in range(len(pending))]
+        self.flushed_count += len(lines)
+        text = "\n".join(lines)
+        scroll_bar = widget.verticalScrollBar()
+        at_end = scroll_bar.value() >= scroll_bar.maximum()
+        # 묶어서 한 번만 추가 (레이아웃 갱신 1회)
+        if isinstance(widget, QPlainTextEdit):
+            widget.appendPlainText(text)
+        else:
+            widget.append(text)
+        if at_end:
+            scroll_bar.setValue(scroll_bar.maximum())
@@ -0,0 +1,228 @@
+""" Scent Device Client (명령 큐, 요청/응답 매칭) """
+from collections import deque
+
+from PySide6.QtCore import QObject, QTimer, QEventLoop
+from PySide6.QtCore import Signal # Slot
+
+import dsComm
+import dsMetrics
+
+QUEUE_MAX = 32          # 대기 명령 최대 개수
+IN_FLIGHT_MAX = 1       # 응답을 기다리는 명령 최대 개수 (RS-485: 1개)
+TIMEOUT_MS = 300        # 명령별 응답 대기 시간
+READ_RETRIES = 2        # 읽기 명령 재시도 횟수 (쓰기 명령은 중복 발향 방지를 위해 0)
+# 큐가 가득 찼을 때 (또는 같은 레지스터 쓰기가 대기 중일 때) 처리 방식
+POLICY_DROP = 'drop'        # 새 명령 실패 (queue_full)
+POLICY_REPLACE = 'replace'  # 같은 slave id/주소의 대기 중인 쓰기 명령을 새 값으로 교체
+WRITE_FUNCS = (5, 6, 15, 16)
+
+def isMatchedResponse(request, response):
+    # slave id, 기능 코드, 주소(쓰기) 또는 바이트 수(읽기)로 요청/응답 매칭
+    if request['id'] != response['id'] or request['func'] != response['func']:
+        return False
+    if response['exception']:
+        return True
+    if response['address'] is not None:
+        return request['address'] == response['address']
+    if request['func'] in (3, 4):
+        return request['qor'] == response['qor']
+    return True
+
+class DeviceRequest(QObject):
+    """장치 명령 1개 (응답 또는 실패 시 finished 시그널 발생)"""
+    finished = Signal(object, name="finished")
+
+    def __init__(self, frame, timeout_ms=TIMEOUT_MS, retries=None):
+        QObject.__init__(self)
+        self.frame = bytes(frame)
+        self.request = dsComm.parseRequest(self.frame)
+        self.timeout_ms = timeout_ms
+        if retries is None:
+            retries = READ_RETRIES if self.request['func'] in (1, 2, 3, 4) else 0
+        self.retries = retries
+        self.attempts = 0
+        self.response = None
+        self.error = None
+        self.done = False
+        self.timer = None
+        self.sent_at = None
+
+    def ok(self):
+        return self.done and self.error is None
+
+    def wait(self, timeout_ms=None):
+        """
+        응답(또는 실패)까지 이벤트 루프를 돌며 대기
+        :return: dict (응답) 또는 None
+        """
+        if not self.done:
+            loop = QEventLoop()
+            self.finished.connect(loop.quit)
+            if timeout_ms is not None:
+                QTimer.singleShot(timeout_ms, loop.quit)
+            loop.exec()
+        return self.response
+
+class DeviceClient(QObject):
+    """
+    명령을 큐에 쌓아 한 번에 하나씩(또는 in_flight_max개) 전송하고,
+    응답을 요청과 매칭하여 DeviceRequest를 완료한다.
+    """
+    responseReceived = Signal(object, object, name="responseReceived")   # request, response
+    requestFailed = Signal(object, name="requestFailed")                 # request
+    queueDepthChanged = Signal(int, name="queueDepthChanged")
+
+    def __init__(self, write_func, queue_max=QUEUE_MAX, in_flight_max=IN_FLIGHT_MAX, metrics=None,
+                 policy=POLICY_DROP):
+        QObject.__init__(self)
+        self.write_func = write_func
+        self.metrics = metrics
+        self.policy = policy
+        self.queue_max = queue_max
+        self.in_flight_max = in_flight_max
+        self.queue = deque()
+        self.in_flight = []
+        self.unmatched_count = 0
+        self.timeout_count = 0
+        self.retry_count = 0
+        self.replaced_count = 0
+
+    def _findPendingWrite(self, request):
+        # 대기 중(전송 전)인 같은 slave id/주소의 쓰기 명령
+        if request.request['func'] not in WRITE_FUNCS:
+            return -1
+        key = (request.request['id'], request.request['address'])
+        for index, pending in enumerate(self.queue):
+            if pending.request['func'] in WRITE_FUNCS and \
+                    (pending.request['id'], pending.request['address']) == key:
+                return index
+        return -1
+
+    def submit(self, frame, timeout_ms=TIMEOUT_MS, retries=None, policy=None):
+        """
+        명령 프레임을 큐에 넣음 (frame은 복사되므로 FrameBuilder의 memoryview 사용 가능)
+        policy: POLICY_DROP / POLICY_REPLACE (None이면 self.policy)
+        :return: DeviceRequest
+        """
+        request = DeviceRequest(frame, timeout_ms, retries)
+        policy = self.policy if policy is None else policy
+        if policy == POLICY_REPLACE:
+            index = self._findPendingWrite(request)
+            if index >= 0:
+                # 같은 순서 위치에서 새 값으로 교체 (이전 명령은 replaced로 실패)
+                replaced = self.queue[index]
+                self.queue[index] = request
+                self.replaced_count += 1
+                self._finish(replaced, error='replaced')
+                return request
+        if len(self.queue) >= self.queue_max:
+            # 큐가 비기를 기다리지 않음 (submit 안에서 이벤트 루프를 돌리면 호출하는 쪽이 재진입됨)
+            self._finish(request, error='queue_full')
+            return request
+        self.queue.append(request)
+        self.queueDepthChanged.emit(len(self.queue))
+        self._pump()
+        return request
+
+    def clear(self):
+        # 대기 중인 명령과 아직 쓰지 않은 명령 취소 (송신 큐도 함께 비움, 전송한 명령은 응답/timeout까지 유지)
+        while self.queue:
+            self._finish(self.queue.popleft(), error='cancelled')
+        for request in [x for x in self.in_flight if x.sent_at is None]:
+            self.in_flight.remove(request)
+            self._finish(request, error='cancelled')
+        self.queueDepthChanged.emit(0)
+
+    def _pump(self):
+        while self.queue and len(self.in_flight) < self.in_flight_max:
+            request = self.queue.popleft()
+            self.queueDepthChanged.emit(len(self.queue))
+            self._send(request)
+
+    def _send(self, request):
+        # 송신 큐에 넣음 (응답 대기는 onWritten에서 송신 완료 후 시작)
+        # (QSerialPort 송신은 write_func 안에서 바로 완료 알림이 올 수 있으므로 먼저 추가)
+        request.attempts += 1
+        request.sent_at = None
+        self.in_flight.append(request)
+        if not self.write_func(request.frame):
+            if request in self.in_flight:
+                self.in_flight.remove(request)
+            self._finish(request, error='not_open')
+
+    def onWritten(self, frame, ok, written_at=None):
+        """
+        송신 스레드의 쓰기 완료 알림 (쓰기 순서대로)
+        성공: 완료 시각부터 응답 timeout 시작, 실패: write_error로 실패
+        """
+        for request in self.in_flight:
+            if request.sent_at is None and request.frame == frame:
+                break
+        else:
+            # 취소된 명령
+            return
+        if not ok:
+            self.in_flight.remove(request)
+            self._finish(request, error='write_error')
+            self._pump()
+            return
+        request.sent_at = dsMetrics.now() if written_at is None else written_at
+        # broadcast(id 0)는 응답이 없음
+        if request.request['id'] == 0:
+            self.in_flight.remove(request)
+            self._finish(request)
+            self._pump()
+            return
+        # 재시도 시에는 같은 timer를 다시 시작
+        if request.timer is None:
+            request.timer = QTimer(self)
+            request.timer.setSingleShot(True)
+            request.timer.timeout.connect(lambda: self._onTimeout(request))
+        request.timer.start(request.timeout_ms)
+
+    def _onTimeout(self, request):
+        if request not in self.in_flight:
+            return
+        self.in_flight.remove(request)
+        self.timeout_count += 1
+        if request.attempts <= request.retries:
+            self.retry_count += 1
+            self._send(request)
+        else:
+            self._finish(request, error='timeout')
+        self._pump()
+
+    def _finish(self, request, response=None, error=None):
+        if request.timer is not None:
+            request.timer.stop()
+            request.timer.deleteLater()
+            request.timer = None
+        request.response = response
+        request.error = error
+        request.done = True
+        if error is None:
+            if response is not None:
+                self.responseReceived.emit(request, response)
+        else:
+            self.requestFailed.emit(request)
+        request.finished.emit(response)
+
+    def onFrame(self, rdata, rx_time=None):
+        """
+        수신 프레임(CRC 확인됨)을 전송 중인 명령과 매칭 (rx_time: 수신 스레드의 프레임 분리 시각)
+        :return: dict (해석된 응답)
+        """
+        response = dsComm.parseResponse(rdata)
+        for request in self.in_flight:
+            if request.sent_at is not None and isMatchedResponse(request.request, response):
+                self.in_flight.remove(request)
+                if self.metrics is not None and rx_time is not None:
+                    self.metrics.record('turnaround', rx_time - request.sent_at)
+                if response['exception']:
+                    self._finish(request, response, error='exception')
+                else:
+                    self._finish(request, response)
+                self._pump()
+                return response
+        self.unmatched_count += 1
+        return response
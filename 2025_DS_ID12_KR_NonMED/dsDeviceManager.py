@@ -0,0 +1,277 @@
+""" Scent Device Manager (포트별 연결, slave id별 명령 라우팅) """
+from PySide6 import QtCore
+from PySide6.QtCore import QObject, QElapsedTimer
+from PySide6.QtCore import Signal # Slot
+
+import dsSerial
+import dsDevice
+import dsCapture
+import dsMetrics
+import dsText
+import dsSetting
+
+DEFAULT_CONNECTION = 'default'
+DEFAULT_SLAVE_ID = 1
+SLAVE_ID_MAX = 247      # Modbus RTU 장치 주소 범위 1~247 (0: broadcast)
+
+def makeCounters():
+    # slave id별 통계
+    return {'tx': 0, 'rx': 0, 'tx_bytes': 0, 'rx_bytes': 0,
+            'timeouts': 0, 'exceptions': 0, 'errors': 0, 'write_errors': 0}
+
+class DeviceConnection(QObject):
+    """
+    시리얼 포트 1개 (serial, 수신 스레드, 명령 큐)
+    RS-485 버스에 여러 장치가 있으면 같은 연결을 여러 slave id가 공유한다 (명령은 한 번에 하나).
+    """
+    frameReceived = Signal(bytes, object, name="frameReceived")   # 수신 프레임, 해석된 응답
+
+    def __init__(self, name, metrics=None, console=None, parent=None, backend=None):
+        QObject.__init__(self, parent)
+        self.name = name
+        self.port_name = ''
+        self.metrics = metrics if metrics is not None else dsMetrics.LatencyRecorder()
+        self.console = console
+        self.capture = None
+        self.counters = {}
+        self.clock = QElapsedTimer()
+        self.clock.start()
+        if backend is None:
+            backend = dsSetting.dsParam.get('serial_backend', dsSerial.SERIAL_BACKEND_PYSERIAL)
+        self.backend = backend
+        self._serial, self.read_thread = dsSerial.createSerial(backend)
+        # 송신 큐 (GUI 스레드는 포트에 직접 쓰지 않음)
+        self.write_thread = dsSerial.createWriter(self._serial, self.read_thread, backend)
+        self.write_thread.metrics = self.metrics
+        self.write_thread.console = console
+        self.write_thread._serial_written.connect(self._onWritten)
+        self.write_thread.start(QtCore.QThread.Priority.HighestPriority)
+        self.client = dsDevice.DeviceClient(self.write, metrics=self.metrics)
+        self.client.requestFailed.connect(self._onRequestFailed)
+        self.read_thread.console = console
+        # 수신 스레드 -> GUI 스레드 (queued connection)
+        self.read_thread._serial_received_data.connect(self._onFrame)
+        self.read_thread.start(QtCore.QThread.Priority.HighestPriority)
+
+    def _counters(self, slave_id):
+        counters = self.counters.get(slave_id)
+        if counters is None:
+            counters = self.counters[slave_id] = makeCounters()
+        return counters
+
+    def isOpen(self):
+        return dsSerial._is_open(self._serial)
+
+    def open(self, port_name, baudrate=9600):
+        # 설정한 통신 속도로 바로 연결 (8N1, flow control 없음)
+        self.port_name = port_name
+        status = dsSerial._connect(self._serial, self.read_thread, port_name, baudrate,
+                                   dsSerial.DATABITS[3], dsSerial.FLOWCONTROL[0],
+                                   dsSerial.PARITY[0], dsSerial.STOPBITS[0])
+        self.clock.start()
+        return status
+
+    def close(self):
+        self.client.clear()
+        self.write_thread.clear()
+        if self.isOpen():
+            dsSerial._disconnect(self._serial, self.read_thread, self.write_thread)
+
+    def shutdown(self):
+        # 포트를 닫고 수신 스레드 종료
+        self.close()
+        self.read_thread.stop()
+        self.write_thread.stop()
+        self.stopCapture()
+
+    def startCapture(self, path=None):
+        """
+        송수신 기록 시작 (TX: write, RX: 수신 스레드의 원본 바이트)
+        :return: 기록 파일 경로
+        """
+        self.stopCapture()
+        if path is None:
+            path = dsCapture.capturePath(self.name)
+        self.capture = dsCapture.CaptureWriter(path, self._serial.baudrate)
+        self.read_thread.capture = self.capture
+        self.write_thread.capture = self.capture
+        print("startCapture:", self.name, path)
+        return path
+
+    def stopCapture(self):
+        capture = self.capture
+        if capture is None:
+            return
+        self.read_thread.capture = None
+        self.write_thread.capture = None
+        self.capture = None
+        capture.close()
+        print("stopCapture:", self.name, capture.path, capture.record_count)
+
+    def write(self, wdata):
+        if not self.isOpen():
+            if self.console is not None:
+                self.console.append(dsText.serialText['status_close'])
+            print(dsText.serialText['status_close'], self.name)
+            return False
+        # 송신 큐에 넣고 바로 반환 (실제 쓰기, metrics/console/capture는 송신 스레드)
+        self.write_thread.write(wdata)
+        counters = self._counters(wdata[0])
+        counters['tx'] += 1
+        counters['tx_bytes'] += len(wdata)
+        return True
+
+    def _onWritten(self, wdata, ok, written_at):
+        if not ok:
+            # 쓰기 실패 (명령은 write_error로 실패)
+            self._counters(wdata[0])['write_errors'] += 1
+            if self.console is not None:
+                self.console.append("TX failed(%d):%s" % (len(wdata), wdata.hex()))
+        # 송신 완료 시각부터 응답 대기
+        self.client.onWritten(wdata, ok, written_at)
+
+    def _onFrame(self, rdata, rx_time):
+        # rx_time: 수신 스레드의 프레임 분리 시각 (시그널로 함께 전달되므로 프레임과 어긋나지 않음)
+        self.metrics.since('dispatch', rx_time)
+        counters = self._counters(rdata[0])
+        counters['rx'] += 1
+        counters['rx_bytes'] += len(rdata)
+        response = None
+        try:
+            # 전송 중인 명령과 매칭하여 응답 처리
+            response = self.client.onFrame(rdata, rx_time)
+            if response['exception']:
+                counters['exceptions'] += 1
+        except Exception as err:
+            counters['errors'] += 1
+            print("Protocol Error: ", self.name, err)
+        self.frameReceived.emit(rdata, response)
+
+    def _onRequestFailed(self, request):
+        counters = self._counters(request.request['id'])
+        if request.error == 'timeout':
+            counters['timeouts'] += 1
+        elif request.error != 'exception':
+            counters['errors'] += 1
+
+    def stats(self):
+        """
+        slave id별 통계와 초당 송수신 프레임 수
+        :return: dict
+        """
+        elapsed = self.clock.elapsed() / 1000 if self.clock.isValid() else 0
+        result = {}
+        for slave_id, counters in self.counters.items():
+            item = dict(counters)
+            item['tx_per_s'] = counters['tx'] / elapsed if elapsed > 0 else 0.0
+            item['rx_per_s'] = counters['rx'] / elapsed if elapsed > 0 else 0.0
+            result[slave_id] = item
+        return {'port': self.port_name,
+                'crc_errors': self.read_thread.parser.crc_errors,
+                'dropped_bytes': self.read_thread.parser.dropped_bytes,
+                'unmatched': self.client.unmatched_count,
+                'retries': self.client.retry_count,
+                'queue_depth': len(self.client.queue),
+                'replaced': self.client.replaced_count,
+                'write_queue_depth': self.write_thread.depth(),
+                'write_queue_max': self.write_thread.depth_max,
+                'partial_writes': self.write_thread.partial_count,
+                'slaves': result}
+
+class DeviceManager(QObject):
+    """
+    여러 포트(연결)를 열고 slave id로 명령을 라우팅한다.
+    포트마다 수신 스레드와 명령 큐가 따로 있으므로 서로 다른 포트의 장치는 동시에 동작한다.
+    검사 진행 상태(dsTest 등)와 화면, 발향 스케줄러는 UiDlg에 하나뿐이므로 검사는 한 번에 한 명만 진행한다.
+    """
+    def __init__(self, metrics=None, console=None, parent=None):
+        QObject.__init__(self, parent)
+        self.metrics = metrics
+        self.console = console
+        self.connections = {}
+        self.routes = {}
+
+    def addConnection(self, name, slave_ids=(), metrics=None):
+        """
+        연결 추가 (metrics가 없으면 연결별 기록기 사용)
+        :return: DeviceConnection
+        """
+        if name in self.connections:
+            connection = self.connections[name]
+        else:
+            if metrics is None and not self.connections:
+                metrics = self.metrics
+            connection = DeviceConnection(name, metrics=metrics, console=self.console, parent=self)
+            self.connections[name] = connection
+        for slave_id in slave_ids:
+            self.routes[slave_id] = connection
+        return connection
+
+    def addSlave(self, name, slave_id):
+        self.routes[slave_id] = self.connections[name]
+
+    def connection(self, slave_id=DEFAULT_SLAVE_ID):
+        """
+        slave id가 연결된 포트 (등록되지 않은 id는 기본 연결)
+        :return: DeviceConnection
+        """
+        connection = self.routes.get(slave_id)
+        if connection is None:
+            connection = self.connections[DEFAULT_CONNECTION]
+        return connection
+
+    def client(self, slave_id=DEFAULT_SLAVE_ID):
+        return self.connection(slave_id).client
+
+    def submit(self, frame, timeout_ms=dsDevice.TIMEOUT_MS, retries=None, policy=None):
+        """
+        프레임의 slave id(첫 바이트)로 연결을 찾아 명령 큐에 넣음 (broadcast는 모든 연결)
+        :return: DeviceRequest
+        """
+        if frame[0] == 0:
+            requests = [connection.client.submit(frame, timeout_ms, retries, policy)
+                        for connection in self.connections.values() if connection.isOpen()]
+            if requests:
+                return requests[0]
+        return self.connection(frame[0]).client.submit(frame, timeout_ms, retries, policy)
+
+    def openConfigured(self, devices):
+        """
+        설정의 장치 목록 열기 ([{'port': 'COM4', 'slave_ids': [2, 3]}, ...])
+        :return: list of DeviceConnection (연결 성공)
+        """
+        opened = []
+        for device in devices:
+            port_name = device.get('port', '')
+            if not port_name:
+                continue
+            connection = self.addConnection(device.get('name', port_name),
+                                            device.get('slave_ids', [DEFAULT_SLAVE_ID]))
+            if connection.isOpen() or connection.open(port_name, device.get('baudrate', 9600)):
+                opened.append(connection)
+        return opened
+
+    def clear(self):
+        for connection in self.connections.values():
+            connection.client.clear()
+            connection.write_thread.clear()
+
+    def closeAll(self):
+        for connection in self.connections.values():
+            connection.close()
+
+    def shutdown(self):
+        for connection in self.connections.values():
+            connection.shutdown()
+
+    def startCapture(self, directory=dsCapture.CAPTURE_DIR):
+        # 연결마다 기록 파일 1개
+        return [connection.startCapture(dsCapture.capturePath(name, directory))
+                for name, connection in self.connections.items()]
+
+    def stopCapture(self):
+        for connection in self.connections.values():
+            connection.stopCapture()
+
+    def stats(self):
+        return {name: connection.stats() for name, connection in self.connections.items()}
@@ -0,0 +1,155 @@
+""" Port Discovery (포트/통신 속도 자동 탐색) """
+import os
+import sys
+import json
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import serial
+from PySide6.QtCore import QThread
+from PySide6.QtCore import Signal # Slot
+
+import dsComm
+import dsFrame
+import dsRegister
+import dsSerial
+
+DISCOVERY_CACHE = "dsPort.json"
+PROBE_SLAVE_ID = 1
+PROBE_TIMEOUT = 0.15    # 통신 속도 1개당 응답 대기 (초)
+PROBE_WORKERS = 8       # 동시에 탐색하는 포트 수
+
+def portPath(port_info):
+    # pyserial로 열 수 있는 경로 (Windows: COM3, 그 외: /dev/ttyUSB0)
+    if sys.platform.startswith('win'):
+        return port_info.portName()
+    return port_info.systemLocation()
+
+def loadCache(path=DISCOVERY_CACHE):
+    """
+    지난번 찾은 포트/통신 속도
+    :return: dict 또는 None
+    """
+    if not os.path.isfile(path):
+        return None
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError) as err:
+        print("dsDiscovery loadCache:", err)
+        return None
+
+def saveCache(result, path=DISCOVERY_CACHE):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(result, f, ensure_ascii=False, indent='\t')
+
+def probeFrame(slave_id=PROBE_SLAVE_ID):
+    # 온도/압력 읽기 (requestTempPress와 같은 요청)
+    return dsComm.sendMsgReadRegister(slave_id, 4, dsRegister.REG_TEMPERATURE, 3)
+
+def probePort(port_name, baudrates, slave_id=PROBE_SLAVE_ID, timeout=PROBE_TIMEOUT, stop_event=None):
+    """
+    포트 1개를 통신 속도별로 열어 읽기 요청을 보내고 CRC가 맞는 응답이 오는 속도를 찾음
+    :return: dict (port, baudrate, slave_id, elapsed_ms) 또는 None
+    """
+    request = probeFrame(slave_id)
+    start = time.monotonic()
+    for baudrate in baudrates:
+        if stop_event is not None and stop_event.is_set():
+            return None
+        try:
+            _serial = serial.Serial(port_name, baudrate, timeout=0.01, write_timeout=timeout)
+        except (serial.SerialException, OSError, ValueError):
+            # 다른 프로그램이 사용 중이거나 열 수 없는 포트
+            return None
+        try:
+            _serial.reset_input_buffer()
+            _serial.write(request)
+            parser = dsFrame.RtuFrameParser(baudrate)
+            deadline = time.monotonic() + timeout
+            while time.monotonic() < deadline:
+                if stop_event is not None and stop_event.is_set():
+                    return None
+                buf = _serial.read(_serial.in_waiting or 1)
+                for frame in parser.feed(buf, time.monotonic()):
+                    if frame[0] == slave_id and frame[1] & 0x7F == request[1]:
+                        return {'port': port_name, 'baudrate': baudrate, 'slave_id': slave_id,
+                                'elapsed_ms': int((time.monotonic() - start) * 1000)}
+        except (serial.SerialException, OSError) as err:
+            print("dsDiscovery probePort:", port_name, baudrate, err)
+        finally:
+            _serial.close()
+    return None
+
+def orderedBaudrates(first=None):
+    # 지난번 속도, 기본 속도(9600) 순서로 먼저 시도
+    baudrates = list(dsSerial.BAUDRATES)
+    for baudrate in (9600, first):
+        if baudrate in baudrates:
+            baudrates.remove(baudrate)
+            baudrates.insert(0, baudrate)
+    return baudrates
+
+def discover(port_names, baudrates=None, slave_id=PROBE_SLAVE_ID, timeout=PROBE_TIMEOUT,
+             cache_path=DISCOVERY_CACHE, stop_event=None):
+    """
+    지난번 포트를 먼저 확인하고, 응답이 없으면 모든 포트를 동시에 탐색 (처음 응답한 포트 사용)
+    stop_event: set 하면 탐색 중단 (응답한 포트를 찾은 경우에도 set 됨)
+    :return: dict (port, baudrate, slave_id, elapsed_ms) 또는 None
+    """
+    start = time.monotonic()
+    cache = loadCache(cache_path) if cache_path else None
+    if baudrates is None:
+        baudrates = orderedBaudrates(cache['baudrate'] if cache else None)
+    result = None
+    if stop_event is None:
+        stop_event = threading.Event()
+    if cache and cache.get('port') in port_names:
+        result = probePort(cache['port'], [cache['baudrate']], slave_id, timeout, stop_event)
+    if result is None and not stop_event.is_set():
+        lock = threading.Lock()
+        found = []
+
+        def probe(port_name):
+            probed = probePort(port_name, baudrates, slave_id, timeout, stop_event)
+            if probed is not None:
+                with lock:
+                    found.append(probed)
+                stop_event.set()
+            return probed
+
+        with ThreadPoolExecutor(max_workers=max(1, min(PROBE_WORKERS, len(port_names)))) as executor:
+            list(executor.map(probe, port_names))
+        if found:
+            result = found[0]
+    if result is not None:
+        result['elapsed_ms'] = int((time.monotonic() - start) * 1000)
+        if cache_path:
+            saveCache(result, cache_path)
+    print("dsDiscovery discover:", result)
+    return result
+
+class PortDiscoveryThread(QThread):
+    """포트 탐색을 GUI 스레드 밖에서 실행 (결과는 finished_discovery 시그널)"""
+    finished_discovery = Signal(object, name="finishedDiscovery")   # dict 또는 None
+
+    def __init__(self, port_names, slave_id=PROBE_SLAVE_ID, cache_path=DISCOVERY_CACHE):
+        QThread.__init__(self)
+        self.port_names = list(port_names)
+        self.slave_id = slave_id
+        self.cache_path = cache_path
+        self.stop_event = threading.Event()
+        self.stopped = False
+
+    def stop(self):
+        # 탐색 중단 후 스레드 종료까지 대기 (통신 속도 1개당 PROBE_TIMEOUT 이내, 결과 시그널 없음)
+        self.stopped = True
+        self.stop_event.set()
+        self.wait()
+
+    def run(self):
+        result = discover(self.port_names, slave_id=self.slave_id, cache_path=self.cache_path,
+                          stop_event=self.stop_event)
+        if not self.stopped:
+            self.finished_discovery.emit(result)
@@ -0,0 +1,159 @@
+""" Modbus RTU Frame (수신 프레임 분리) """
+import time
+import dsCrc
+
+# 프레임 최대 길이 (Modbus RTU 규격: 256 bytes)
+FRAME_MAX = 256
+# 문자 1개 비트 수 (start 1 + data 8 + parity/stop 2)
+CHAR_BITS = 11
+# PC/USB 시리얼 어댑터 지연(latency timer)을 고려한 최소 무응답 간격 (초 단위)
+HOST_GAP_MIN = 0.02
+
+# 응답(슬레이브 -> 호스트) 고정 길이 프레임: 기능 코드 -> 길이
+RESPONSE_FIXED = {5: 8, 6: 8, 15: 8, 16: 8}
+# 응답 바이트 카운트 기반 프레임: id, func, byte_count, data..., crc
+RESPONSE_COUNTED = (1, 2, 3, 4)
+# 요청(호스트 -> 슬레이브) 고정 길이 프레임
+REQUEST_FIXED = {1: 8, 2: 8, 3: 8, 4: 8, 5: 8, 6: 8}
+# 요청 바이트 카운트 기반 프레임: id, func, address, qor, byte_count, data..., crc
+REQUEST_COUNTED = (15, 16)
+
+def charTime(baudrate):
+    return CHAR_BITS / baudrate
+
+def silenceTime(baudrate):
+    """
+    프레임 사이 3.5 문자 무응답 시간 (19200 bps 초과는 규격상 1.75 ms 고정)
+    :return: float (초 단위)
+    """
+    if baudrate > 19200:
+        return 0.00175
+    return 3.5 * charTime(baudrate)
+
+def frameLength(buf, start, avail, request=False):
+    """
+    버퍼의 start 위치에서 시작하는 프레임 길이를 계산
+    :return: int (길이, 0: 헤더가 더 필요, -1: 알 수 없는 프레임)
+    """
+    if avail < 2:
+        return 0
+    mid = buf[start]
+    func = buf[start + 1]
+    if mid > 247 or (mid == 0 and not request):
+        return -1
+    if request:
+        if func in REQUEST_FIXED:
+            return REQUEST_FIXED[func]
+        if func in REQUEST_COUNTED:
+            if avail < 7:
+                return 0
+            return 9 + buf[start + 6]
+        return -1
+    if func & 0x80:
+        return 5  # 예외 응답: id, func|0x80, exception code, crc
+    if func in RESPONSE_FIXED:
+        return RESPONSE_FIXED[func]
+    if func in RESPONSE_COUNTED:
+        if avail < 3:
+            return 0
+        return 5 + buf[start + 2]
+    return -1
+
+class RtuFrameParser:
+    """
+    읽은 바이트를 재사용 버퍼에 누적하고, 기능 코드/길이와 3.5 문자 무응답 간격으로
+    프레임을 분리한 뒤 CRC를 확인하여 완전한 프레임만 돌려준다.
+    """
+    def __init__(self, baudrate=9600, request=False, gap_min=HOST_GAP_MIN):
+        self.request = request
+        self.gap_min = gap_min
+        self.buffer = bytearray()
+        self.last_rx_time = 0.0
+        self.frame_count = 0
+        self.crc_errors = 0
+        self.dropped_bytes = 0
+        self.gap_resets = 0
+        self.synced = True
+        self.setBaudrate(baudrate)
+
+    def setBaudrate(self, baudrate):
+        self.baudrate = baudrate
+        self.gap = max(silenceTime(baudrate), self.gap_min)
+
+    def reset(self):
+        self.dropped_bytes += len(self.buffer)
+        del self.buffer[:]
+        self.synced = True
+
+    def _isFrameAt(self, buf, pos, size):
+        length = frameLength(buf, pos, size - pos, self.request)
+        if length <= 2 or pos + length > size:
+            return 0
+        with memoryview(buf) as view:
+            if dsCrc.checkFrame(view[pos:pos + length]):
+                return length
+        return 0
+
+    def _findNextFrame(self, buf, pos, size):
+        # 동기가 깨진 상태에서 잘못된 헤더가 긴 길이를 가리키면, 뒤쪽의 완전한 프레임을 찾음
+        for start in range(pos + 1, size - 3):
+            if self._isFrameAt(buf, start, size):
+                return start
+        return -1
+
+    def feed(self, data, now=None):
+        """
+        수신 데이터를 넣고 완성된 프레임 목록을 반환
+        :return: list of bytes
+        """
+        if now is None:
+            now = time.monotonic()
+        buf = self.buffer
+        # 무응답 간격이 지난 뒤 남아있는 미완성 프레임은 버림 (재동기화)
+        if buf and now - self.last_rx_time > self.gap:
+            self.gap_resets += 1
+            self.reset()
+        if data:
+            buf += data
+            self.last_rx_time = now
+        frames = []
+        pos = 0
+        size = len(buf)
+        while pos < size:
+            avail = size - pos
+            length = frameLength(buf, pos, avail, self.request)
+            if length == 0:
+                break
+            if length < 0 or length > FRAME_MAX:
+                pos += 1
+                self.dropped_bytes += 1
+                self.synced = False
+                continue
+            if avail < length:
+                if not self.synced:
+                    start = self._findNextFrame(buf, pos, size)
+                    if start > 0:
+                        self.dropped_bytes += start - pos
+                        pos = start
+                        continue
+                break
+            # CRC는 버퍼에서 복사 없이 검사
+            with memoryview(buf) as view:
+                is_valid = dsCrc.checkFrame(view[pos:pos + length])
+            if is_valid:
+                frames.append(bytes(buf[pos:pos + length]))
+                self.frame_count += 1
+                self.synced = True
+                pos += length
+            else:
+                # CRC 오류: 1 바이트 이동하여 다음 프레임 시작점을 찾음
+                self.crc_errors += 1
+                self.dropped_bytes += 1
+                self.synced = False
+                pos += 1
+        if pos:
+            del buf[:pos]
+        return frames
+
+    def pending(self):
+        return len(self.buffer)
@@ -1,3 +1,9 @@
+import os
+import re
+import json
+
+from PySide6.QtGui import QPixmap
+
 # button image files
 dsBtnImg = {
     # Korean
@@ -270,4 +276,90 @@ dsResultImg = {
     'Warning': './ui/images/tdi/result_warning.png',
     'Bad': './ui/images/tdi/result_bad.png',
     'None': './ui/images/tdi/result_none.png',
-}
\ No newline at end of file
+}
+# 최적화 이미지 (python dsAssets.py로 생성, 설정 image_assets_onoff)
+ASSET_MANIFEST = "./ui/images_opt/manifest.json"
+URL_PATTERN = re.compile(r'url\(([^)]*)\)')
+STYLE_PATTERN = re.compile(r'(border-image|background-image|image)\s*:\s*url\(([^)]*)\)')   # (속성, 경로)
+
+_assets = {}    # 원본 경로 -> manifest 항목
+_atlases = {}   # atlas 경로 -> QPixmap
+_resources = {} # 파일 경로 -> :/ 경로 (dsResource.register)
+_originals = {} # 'dsBtnImg', 'dsBgImg' -> 처음 정의된 스타일시트
+
+def loadManifest(path=ASSET_MANIFEST):
+    """
+    manifest의 최적화 이미지로 dsBtnImg, dsBgImg 스타일시트 경로 변경
+    원본 파일 크기가 바뀌었거나 결과 파일이 없는 항목은 원본 사용
+    :return: int (사용하는 항목 수)
+    """
+    _assets.clear()
+    _atlases.clear()
+    if not os.path.isfile(path):
+        print("dsImage loadManifest: no manifest", path)
+        _applyPaths()
+        return 0
+    try:
+        with open(path, encoding='utf-8') as f:
+            images = json.load(f)['images']
+    except (OSError, ValueError, KeyError) as err:
+        print("dsImage loadManifest:", err)
+        _applyPaths()
+        return 0
+    for source, entry in images.items():
+        if not os.path.isfile(source) or os.path.getsize(source) != entry['bytes']:
+            continue
+        if not os.path.isfile(entry['path']):
+            continue
+        _assets[source] = entry
+    _applyPaths()
+    return len(_assets)
+
+def setResources(table):
+    """
+    .rcc 묶음 경로 변환표 반영 (dsBtnImg, dsBgImg 스타일시트 경로를 :/ 경로로)
+    :return: int (변환표 항목 수)
+    """
+    _resources.clear()
+    _resources.update(table)
+    _atlases.clear()
+    _applyPaths()
+    return len(_resources)
+
+def _applyPaths():
+    # 처음 정의된 스타일시트 기준으로 다시 변환 (loadManifest, setResources 순서와 관계없이)
+    for name, images_dict in (('dsBtnImg', dsBtnImg), ('dsBgImg', dsBgImg)):
+        originals = _originals.setdefault(name, dict(images_dict))
+        for key, style in originals.items():
+            images_dict[key] = resolveStyleSheet(style)
+
+def isActive():
+    return len(_assets) > 0 or len(_resources) > 0
+
+def assetPath(path):
+    # 최적화 이미지 -> .rcc 경로 순서로 변환
+    entry = _assets.get(path)
+    if entry is not None:
+        path = entry['path']
+    return _resources.get(path, path)
+
+def resolveStyleSheet(text):
+    # 스타일시트의 url(...) 경로를 최적화 이미지, .rcc 경로로
+    if not _assets and not _resources:
+        return text
+    return URL_PATTERN.sub(lambda match: "url(%s)" % assetPath(match.group(1)), text)
+
+def pixmap(path):
+    """
+    이미지 파일 -> QPixmap (atlas에 있는 아이콘은 atlas에서 잘라서)
+    :return: QPixmap
+    """
+    entry = _assets.get(path)
+    if entry is None or 'atlas' not in entry:
+        return QPixmap(assetPath(path))
+    atlas = _atlases.get(entry['atlas'])
+    if atlas is None:
+        atlas = QPixmap(_resources.get(entry['atlas'], entry['atlas']))
+        _atlases[entry['atlas']] = atlas
+    x, y, width, height = entry['rect']
+    return atlas.copy(x, y, width, height)
@@ -0,0 +1,124 @@
+""" Image Cache (이미지를 표시 크기로 한 번만 디코딩해 QPixmapCache에 보관, 버튼에 setIcon으로 적용) """
+import time
+
+from PySide6.QtCore import QSize, QObject, QTimer
+from PySide6.QtGui import QPixmap, QPixmapCache, QIcon, QImageReader
+
+import dsImage
+
+CACHE_LIMIT_KB = 65536      # QPixmapCache 메모리 한도 (초과 시 오래 사용하지 않은 이미지부터 삭제)
+PRELOAD_GAP_MS = 10         # 미리 로딩 이미지 사이 대기 (발향 진행바 갱신 우선)
+STYLE_IMAGE_PROPERTY = 'dsStyleImage'  # 버튼 속성: .ui 스타일시트에 이미지가 있음
+
+# 표시 방식 (dsBtnImg 스타일시트 속성과 같은 의미)
+FIT_STRETCH = 'border-image'        # 위젯 크기로 늘림
+FIT_NATIVE = 'background-image'     # 원본 크기 (위젯 밖은 잘림)
+
+_styles = {}    # dsBtnImg 스타일시트 -> (표시 방식, 경로) 또는 None
+stats = {'hits': 0, 'misses': 0, 'decode_ms': 0.0}
+
+def setCacheLimit(limit_kb=CACHE_LIMIT_KB):
+    QPixmapCache.setCacheLimit(limit_kb)
+
+def buttonImage(key):
+    """
+    dsBtnImg 항목 -> (표시 방식, 경로) ('null' 등 이미지가 없으면 None)
+    manifest(dsImage.loadManifest)로 바뀐 경로도 그대로 사용
+    :return: tuple 또는 None
+    """
+    style = dsImage.dsBtnImg[key]
+    if style not in _styles:
+        match = dsImage.STYLE_PATTERN.search(style)
+        _styles[style] = None if match is None else (match.group(1), match.group(2))
+    return _styles[style]
+
+def _cacheKey(path, size, mode):
+    return "%s@%dx%d:%s" % (path, size.width(), size.height(), mode)
+
+def pixmap(path, size, mode=FIT_STRETCH):
+    """
+    표시 크기 QPixmap (크기별로 한 번만 디코딩)
+    FIT_STRETCH: 디코딩할 때 size로 축소/확대, FIT_NATIVE: 원본 크기에서 size만큼 잘라냄
+    :return: QPixmap
+    """
+    key = _cacheKey(path, size, mode)
+    cached = QPixmapCache.find(key)
+    if cached is not None:
+        stats['hits'] += 1
+        return cached
+    start = time.perf_counter()
+    reader = QImageReader(path)
+    if mode == FIT_STRETCH:
+        reader.setScaledSize(size)
+    image = reader.read()
+    if image.isNull():
+        print("dsImageCache: %s %s" % (path, reader.errorString()))
+        return QPixmap()
+    if mode == FIT_NATIVE and (image.width() > size.width() or image.height() > size.height()):
+        image = image.copy(0, 0, min(image.width(), size.width()), min(image.height(), size.height()))
+    result = QPixmap.fromImage(image)
+    stats['decode_ms'] += (time.perf_counter() - start) * 1000
+    stats['misses'] += 1
+    QPixmapCache.insert(key, result)
+    return result
+
+def _hasStyleImage(button):
+    # .ui 스타일시트에 배경 이미지가 있는 버튼 (처음 확인한 결과를 속성으로 기억, setStyleSheet 후에도 유지)
+    value = button.property(STYLE_IMAGE_PROPERTY)
+    if value is None:
+        value = dsImage.URL_PATTERN.search(button.styleSheet()) is not None
+        button.setProperty(STYLE_IMAGE_PROPERTY, value)
+    return value
+
+def setButtonImage(button, key):
+    """
+    dsBtnImg 이미지를 아이콘으로 표시 (setStyleSheet 대신, 스타일 다시 적용 없음)
+    .ui의 버튼 스타일시트(border : 0px)는 그대로 유지한다.
+    .ui 스타일시트에 이미지가 있는 버튼(번호 이미지, hover)은 아이콘이 그 위에 겹치므로 기존처럼 스타일시트를 바꾼다.
+    """
+    if _hasStyleImage(button):
+        button.setStyleSheet(dsImage.dsBtnImg[key])
+        return
+    item = buttonImage(key)
+    if item is None:
+        button.setIcon(QIcon())
+        return
+    mode, path = item
+    size = button.size()
+    button.setIcon(QIcon(pixmap(path, size, mode)))
+    button.setIconSize(size)
+
+def printStats():
+    total = stats['hits'] + stats['misses']
+    print("dsImageCache: %d hits / %d, decode %.1f ms, limit %d KB" % (
+        stats['hits'], total, stats['decode_ms'], QPixmapCache.cacheLimit()))
+
+class ImagePreloader(QObject):
+    """
+    다음에 표시할 버튼 이미지를 GUI 스레드 유휴 시간에 하나씩 디코딩해 둔다.
+    발향 중에는 스케줄러 이벤트 루프가 돌고 있으므로 진행바 갱신 사이에 처리된다.
+    """
+    def __init__(self, parent=None):
+        QObject.__init__(self, parent)
+        self.queue = []
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self._next)
+
+    def preload(self, keys, size):
+        # dsBtnImg 항목을 size 버튼에 표시할 크기로
+        for key in keys:
+            item = buttonImage(key)
+            if item is not None:
+                self.queue.append((item[1], QSize(size), item[0]))
+        if self.queue and not self.timer.isActive():
+            self.timer.start(PRELOAD_GAP_MS)
+
+    def _next(self):
+        if not self.queue:
+            return
+        path, size, mode = self.queue.pop(0)
+        if QPixmapCache.find(_cacheKey(path, size, mode)) is None:
+            pixmap(path, size, mode)
+        if self.queue:
+            self.timer.start(PRELOAD_GAP_MS)
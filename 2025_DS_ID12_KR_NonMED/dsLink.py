@@ -0,0 +1,228 @@
+""" Link Monitor (통신 상태 확인, 자동 재연결, 분당 오류 통계) """
+from collections import deque
+from datetime import datetime
+
+import serial
+from PySide6.QtCore import QObject, QTimer, QElapsedTimer
+from PySide6.QtCore import Signal # Slot
+
+import dsComm
+import dsRegister
+import dsSerial
+
+CHECK_MS = 500              # 읽기/쓰기 오류 확인 주기
+HEARTBEAT_MS = 2000         # 통신이 없을 때 상태 확인 요청 주기
+HEARTBEAT_TIMEOUT_MS = 300
+HEARTBEAT_FAILS = 3         # 연속 응답 없음 횟수 (모든 명령) -> 연결 끊김
+RECONNECT_MIN_MS = 500      # 재연결 대기 (실패할 때마다 2배)
+RECONNECT_MAX_MS = 10000
+HISTORY_MINUTES = 60        # 분당 오류 통계 보관 개수
+
+# 연결 상태
+LINK_CLOSED = 'closed'      # 열지 않음 (또는 사용자가 닫음)
+LINK_UP = 'up'
+LINK_DOWN = 'down'          # 끊김, 재연결 중
+
+def heartbeatFrame(slave_id):
+    # 압력 레지스터 1개 읽기 (응답 7 바이트)
+    return dsComm.sendMsgReadRegister(slave_id, 4, dsRegister.REG_PRESSURE, 1)
+
+class LinkMonitor(QObject):
+    """
+    연결 1개(DeviceConnection)의 상태를 확인한다.
+    통신이 없으면 HEARTBEAT_MS마다 레지스터 1개를 읽고, 연속 실패하거나 읽기/쓰기 오류가 생기면
+    끊김으로 판단하여 진행 중인 발향 스케줄러를 멈추고 지수 backoff로 다시 연결한다.
+    다시 연결되면 스케줄러를 멈춘 단계부터 재개한다 (같은 검사 회차).
+    """
+    linkChanged = Signal(str, name="linkChanged")          # LINK_*
+    minuteStats = Signal(object, name="minuteStats")       # 분당 오류 통계 dict
+
+    def __init__(self, connection, slave_id=1, scheduler=None, parent=None):
+        QObject.__init__(self, parent)
+        self.connection = connection
+        self.slave_id = slave_id
+        self.scheduler = scheduler
+        self.state = LINK_CLOSED
+        self.heartbeat_fails = 0
+        self.heartbeat_pending = None
+        self.heartbeat_count = 0
+        self.reconnect_ms = RECONNECT_MIN_MS
+        self.reconnect_count = 0
+        self.disconnect_count = 0
+        self.paused_scheduler = False
+        self.last_errors = self._errorCount()
+        self.idle = QElapsedTimer()
+        self.idle.start()
+        self.history = deque(maxlen=HISTORY_MINUTES)
+        self.minute = self._minute()
+        self.minute_totals = self.totals()
+        connection.frameReceived.connect(self._onFrame)
+        connection.client.requestFailed.connect(self._onRequestFailed)
+        self.check_timer = QTimer(self)
+        self.check_timer.setInterval(CHECK_MS)
+        self.check_timer.timeout.connect(self._onCheck)
+        self.reconnect_timer = QTimer(self)
+        self.reconnect_timer.setSingleShot(True)
+        self.reconnect_timer.timeout.connect(self._reconnect)
+
+    def _minute(self):
+        return datetime.now().strftime('%Y-%m-%d %H:%M')
+
+    def start(self):
+        self.check_timer.start()
+
+    def stop(self):
+        self.check_timer.stop()
+        self.reconnect_timer.stop()
+
+    def totals(self):
+        """
+        누적 오류 수 (crc, 프레임 분리, timeout, 읽기/쓰기 오류)
+        :return: dict
+        """
+        parser = self.connection.read_thread.parser
+        counters = self.connection.counters.values()
+        return {'crc_errors': parser.crc_errors,
+                'framing_errors': parser.gap_resets,
+                'dropped_bytes': parser.dropped_bytes,
+                'timeouts': self.connection.client.timeout_count,
+                'read_errors': self.connection.read_thread.error_count,
+                'write_errors': sum(counter['write_errors'] for counter in counters),
+                'rx_frames': sum(counter['rx'] for counter in counters)}
+
+    def _errorCount(self):
+        # 끊김으로 판단하는 오류 (포트 읽기/쓰기 실패)
+        counters = self.connection.counters.values()
+        return self.connection.read_thread.error_count + \
+            sum(counter['write_errors'] for counter in counters)
+
+    def _updateMinute(self):
+        minute = self._minute()
+        if minute == self.minute:
+            return
+        totals = self.totals()
+        stats = {key: totals[key] - self.minute_totals[key] for key in totals}
+        stats['minute'] = self.minute
+        stats['state'] = self.state
+        self.history.append(stats)
+        self.minute = minute
+        self.minute_totals = totals
+        self.minuteStats.emit(stats)
+
+    def _setState(self, state):
+        if state == self.state:
+            return
+        print("LinkMonitor:", self.connection.name, self.state, "->", state)
+        if self.connection.console is not None:
+            self.connection.console.append("Link %s: %s" % (self.connection.name, state))
+        self.state = state
+        self.linkChanged.emit(state)
+
+    def _onFrame(self, rdata, response):
+        self.idle.start()
+        self.heartbeat_fails = 0
+
+    def _onRequestFailed(self, request):
+        if request.error == 'timeout':
+            self.heartbeat_fails += 1
+
+    def _onCheck(self):
+        self._updateMinute()
+        if self.state == LINK_DOWN:
+            return
+        if not self.connection.isOpen():
+            # 사용자가 닫은 경우
+            self._setState(LINK_CLOSED)
+            return
+        if self.state == LINK_CLOSED:
+            self._setState(LINK_UP)
+            self.last_errors = self._errorCount()
+            self.heartbeat_fails = 0
+        errors = self._errorCount()
+        if errors != self.last_errors:
+            self.last_errors = errors
+            self._linkLost("read/write error")
+            return
+        if self.heartbeat_fails >= HEARTBEAT_FAILS:
+            self._linkLost("no response")
+            return
+        # 응답이 없었으면 바로 다시 확인
+        client = self.connection.client
+        if self.heartbeat_pending is None and (self.idle.elapsed() >= HEARTBEAT_MS or self.heartbeat_fails > 0) \
+                and not client.queue and not client.in_flight:
+            self._heartbeat()
+
+    def _heartbeat(self, on_finished=None):
+        self.heartbeat_count += 1
+        self.idle.start()
+        request = self.connection.client.submit(heartbeatFrame(self.slave_id), HEARTBEAT_TIMEOUT_MS, 0)
+        self.heartbeat_pending = request
+        request.finished.connect(lambda response, r=request: self._onHeartbeat(r, on_finished))
+        if request.done:
+            self._onHeartbeat(request, on_finished)
+
+    def _onHeartbeat(self, request, on_finished):
+        if self.heartbeat_pending is not request:
+            return
+        self.heartbeat_pending = None
+        if on_finished is not None:
+            on_finished(request.ok())
+
+    def _linkLost(self, reason):
+        print("LinkMonitor link lost:", self.connection.name, reason)
+        self.disconnect_count += 1
+        self._setState(LINK_DOWN)
+        if self.scheduler is not None and self.scheduler.pause():
+            self.paused_scheduler = True
+        # 대기 중인 명령 취소, 포트 닫기 (장치가 분리되어도 is_open은 True로 남음)
+        self.connection.client.clear()
+        self._closePort()
+        self.reconnect_ms = RECONNECT_MIN_MS
+        self.reconnect_timer.start(self.reconnect_ms)
+
+    def _closePort(self):
+        self.connection.write_thread.clear()
+        try:
+            dsSerial._disconnect(self.connection._serial, self.connection.read_thread, self.connection.write_thread)
+        except (OSError, serial.SerialException) as err:
+            print("LinkMonitor close:", err)
+
+    def _reconnect(self):
+        self.reconnect_count += 1
+        _serial = self.connection._serial
+        try:
+            # 포트 이름, 통신 속도 등 기존 설정으로 다시 열기 (사용자가 이미 다시 연 경우 제외)
+            if not _serial.is_open:
+                _serial.open()
+        except (OSError, ValueError, serial.SerialException) as err:
+            print("LinkMonitor reconnect:", _serial.port, err)
+            self._retry()
+            return
+        self.connection.read_thread.set_status(True)
+        self.last_errors = self._errorCount()
+        self.heartbeat_fails = 0
+        self._heartbeat(self._onReconnectHeartbeat)
+
+    def _onReconnectHeartbeat(self, ok):
+        if not ok:
+            self._closePort()
+            self._retry()
+            return
+        self.reconnect_ms = RECONNECT_MIN_MS
+        self._setState(LINK_UP)
+        if self.paused_scheduler:
+            self.paused_scheduler = False
+            self.scheduler.resume()
+
+    def _retry(self):
+        self.reconnect_ms = min(self.reconnect_ms * 2, RECONNECT_MAX_MS)
+        self.reconnect_timer.start(self.reconnect_ms)
+
+    def stats(self):
+        totals = self.totals()
+        totals.update({'state': self.state,
+                       'heartbeats': self.heartbeat_count,
+                       'disconnects': self.disconnect_count,
+                       'reconnect_attempts': self.reconnect_count,
+                       'history': list(self.history)})
+        return totals
@@ -0,0 +1,134 @@
+""" Latency Metrics (송수신 단계별 지연 시간 측정) """
+import os
+import csv
+import json
+import time
+from collections import deque
+from datetime import datetime
+
+# 측정 단계
+#  build:      요청 프레임 구성
+#  write:      serial write 호출
+#  turnaround: 송신 완료 -> 응답 프레임 수신 (장치 처리 + 전송 시간)
+#  dispatch:   수신 스레드에서 프레임 분리 -> GUI 스레드 DeviceConnection 도착
+STAGES = ('build', 'write', 'turnaround', 'dispatch')
+RING_SIZE = 4096        # 단계별 최근 측정값 개수
+PERCENTILES = (50, 95, 99)
+HISTOGRAM_BOUNDS_MS = (0.01, 0.1, 1, 5, 10, 20, 50, 100, 200, 500, 1000)
+METRICS_DIR = "./metrics"
+
+# 단조 증가 고해상도 시계 (초)
+now = time.perf_counter
+
+def percentile(sorted_values, p):
+    # nearest-rank 방식
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-p * len(sorted_values) // 100))
+    return sorted_values[int(rank) - 1]
+
+class LatencyRecorder:
+    """
+    단계별 지연 시간(초)을 링 버퍼에 기록 (print 없음, 기록은 deque append 1회)
+    수신 프레임의 분리 시각은 수신 시그널에 함께 실려 GUI 스레드에서 기록된다.
+    """
+    def __init__(self, ring_size=RING_SIZE):
+        self.session = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.ring_size = ring_size
+        self.samples = {stage: deque(maxlen=ring_size) for stage in STAGES}
+        self.counts = {stage: 0 for stage in STAGES}
+
+    def record(self, stage, seconds):
+        self.samples[stage].append(seconds)
+        self.counts[stage] += 1
+
+    def since(self, stage, start):
+        # start 시각부터 지금까지의 지연 기록
+        self.record(stage, now() - start)
+
+    def reset(self):
+        for stage in STAGES:
+            self.samples[stage].clear()
+            self.counts[stage] = 0
+
+    def histogram(self, stage, bounds_ms=HISTOGRAM_BOUNDS_MS):
+        """
+        구간별 개수 (마지막 항목은 마지막 경계 초과)
+        :return: list of int
+        """
+        bins = [0] * (len(bounds_ms) + 1)
+        for value in self.samples[stage]:
+            ms = value * 1000
+            for i, bound in enumerate(bounds_ms):
+                if ms <= bound:
+                    bins[i] += 1
+                    break
+            else:
+                bins[-1] += 1
+        return bins
+
+    def stats(self, stage):
+        """
+        단계별 통계 (ms)
+        :return: dict (count, total, min, max, mean, p50, p95, p99)
+        """
+        values = sorted(self.samples[stage])
+        result = {'count': len(values), 'total': self.counts[stage],
+                  'min': 0.0, 'max': 0.0, 'mean': 0.0}
+        if values:
+            result['min'] = values[0] * 1000
+            result['max'] = values[-1] * 1000
+            result['mean'] = sum(values) * 1000 / len(values)
+        for p in PERCENTILES:
+            result['p%d' % p] = percentile(values, p) * 1000
+        return result
+
+    def summary(self):
+        return {stage: self.stats(stage) for stage in STAGES}
+
+    def exportJson(self, path):
+        data = {'session': self.session,
+                'histogram_bounds_ms': list(HISTOGRAM_BOUNDS_MS),
+                'stages': {}}
+        for stage in STAGES:
+            data['stages'][stage] = self.stats(stage)
+            data['stages'][stage]['histogram'] = self.histogram(stage)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent='\t')
+        return path
+
+    def exportCsv(self, path):
+        # 측정값 원본 (stage, index, ms)
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['stage', 'index', 'ms'])
+            for stage in STAGES:
+                for i, value in enumerate(self.samples[stage]):
+                    writer.writerow([stage, i, '%.4f' % (value * 1000)])
+        return path
+
+    def export(self, directory=METRICS_DIR):
+        """
+        세션 단위로 JSON(통계, 히스토그램)과 CSV(측정값) 저장
+        :return: (str, str) 저장 경로
+        """
+        os.makedirs(directory, exist_ok=True)
+        base = os.path.join(directory, "latency_%s" % self.session)
+        return self.exportJson(base + ".json"), self.exportCsv(base + ".csv")
+
+    def hasSamples(self):
+        return any(self.samples[stage] for stage in STAGES)
+
+# 앱 전체에서 사용하는 기록기
+metrics = LatencyRecorder()
+
+if __name__ == '__main__':
+    # 저장된 세션 요약 출력 (python dsMetrics.py metrics/latency_xxx.json)
+    import sys
+    for path in sys.argv[1:]:
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        print(data['session'])
+        for stage, s in data['stages'].items():
+            print("  %-10s n=%-6d p50 %8.3f  p95 %8.3f  p99 %8.3f  max %8.3f ms" % (
+                stage, s['count'], s['p50'], s['p95'], s['p99'], s['max']))
@@ -0,0 +1,223 @@
+""" Register Map (장치 레지스터 정의, 묶음 읽기/쓰기) """
+import struct
+
+from PySide6.QtCore import QObject, QElapsedTimer
+from PySide6.QtCore import Signal # Slot
+
+# 명령 (register 4200)
+CMD_EMIT = 1
+CMD_CLEAN = 2
+CMD_STOP = 3
+CMD_EMIT_CLEAN = 4
+
+MERGE_GAP_MAX = 0       # 묶어서 읽을 때 허용하는 빈 레지스터 수
+REGISTERS_MAX = 125     # 요청 1개로 읽을 수 있는 최대 레지스터 수 (Modbus)
+
+# 값 형식: (레지스터 수, struct 형식)
+FORMATS = {'u16': (1, '>H'),
+           'i16': (1, '>h'),
+           'u32': (2, '>I'),
+           'f32': (2, '>f')}
+
+def makeRegister(name, address, fmt='u16', func=3, writable=False, scale=1, ttl_ms=0):
+    """
+    레지스터 정의 (func: 읽기 기능 코드 3 holding / 4 input, ttl_ms: 읽기 값 유지 시간, 0이면 항상 읽음)
+    :return: dict
+    """
+    return {'name': name,
+            'address': address,
+            'fmt': fmt,
+            'width': FORMATS[fmt][0],
+            'func': func,
+            'writable': writable,
+            'scale': scale,
+            'ttl_ms': ttl_ms}
+
+REGISTERS = {}
+for _register in (
+        # 발향/세정 명령 블록 (FrameBuilder.emitClean 순서)
+        makeRegister('command', 4200, writable=True),
+        makeRegister('scent_no', 4201, writable=True),
+        makeRegister('scent_power', 4202, writable=True),
+        makeRegister('clean_power', 4203, writable=True),
+        makeRegister('scent_period', 4204, writable=True),
+        makeRegister('clean_period', 4205, writable=True),
+        makeRegister('scent_delay', 4206, writable=True),
+        makeRegister('cleanup_delay', 4207, writable=True),
+        makeRegister('pwm_frequency', 4212, writable=True),
+        # 센서 (읽기 전용)
+        makeRegister('temperature', 4043, fmt='f32', func=4, ttl_ms=1000),
+        makeRegister('pressure', 4045, func=4, ttl_ms=200)):
+    REGISTERS[_register['name']] = _register
+
+REG_COMMAND = REGISTERS['command']['address']
+REG_PWM_FREQUENCY = REGISTERS['pwm_frequency']['address']
+REG_TEMPERATURE = REGISTERS['temperature']['address']
+REG_PRESSURE = REGISTERS['pressure']['address']
+
+def decodeValue(register, words, offset=0):
+    width, fmt = FORMATS[register['fmt']]
+    raw = struct.pack('>%dH' % width, *words[offset:offset + width])
+    value = struct.unpack(fmt, raw)[0]
+    if register['scale'] != 1:
+        value = value * register['scale']
+    return value
+
+def encodeValue(register, value):
+    """
+    값 -> 레지스터 값 목록 (big endian, 상위 word 먼저)
+    :return: tuple of int
+    """
+    width, fmt = FORMATS[register['fmt']]
+    if register['scale'] != 1:
+        value = value / register['scale']
+    if fmt != '>f':
+        value = int(round(value))
+    return struct.unpack('>%dH' % width, struct.pack(fmt, value))
+
+def mergeRanges(registers, gap_max=MERGE_GAP_MAX):
+    """
+    같은 기능 코드의 인접한 레지스터를 요청 1개로 묶음
+    :return: list of (func, address, qor, registers)
+    """
+    ranges = []
+    for register in sorted(registers, key=lambda r: (r['func'], r['address'])):
+        if ranges:
+            func, address, qor, members = ranges[-1]
+            end = address + qor
+            new_end = register['address'] + register['width']
+            if func == register['func'] and register['address'] - end <= gap_max \
+                    and new_end - address <= REGISTERS_MAX:
+                ranges[-1] = (func, address, max(end, new_end) - address, members + [register])
+                continue
+        ranges.append((register['func'], register['address'], register['width'], [register]))
+    return ranges
+
+class RegisterClient(QObject):
+    """
+    이름으로 레지스터를 읽고 쓰는 API
+    인접한 레지스터는 읽기(3/4)/쓰기(16) 요청 1개로 묶고, 읽기 전용 값은 ttl_ms 동안 캐시한다.
+    """
+    valuesRead = Signal(object, name="valuesRead")  # {name: value}
+
+    def __init__(self, submit_func, frame_builder, slave_id=1, registers=REGISTERS):
+        QObject.__init__(self)
+        self.submit_func = submit_func
+        self.frame_builder = frame_builder
+        self.slave_id = slave_id
+        self.registers = registers
+        self.cache = {}     # name -> (value, ms)
+        self.clock = QElapsedTimer()
+        self.clock.start()
+        self.transaction_count = 0
+
+    def cached(self, name):
+        """
+        TTL 이내의 캐시 값
+        :return: 값 또는 None
+        """
+        item = self.cache.get(name)
+        if item is None:
+            return None
+        value, stamp = item
+        if self.clock.elapsed() - stamp > self.registers[name]['ttl_ms']:
+            return None
+        return value
+
+    def invalidate(self, names=None):
+        if names is None:
+            self.cache.clear()
+        else:
+            for name in names:
+                self.cache.pop(name, None)
+
+    def _onReadFinished(self, members, address, response, result, pending, callback):
+        if response is not None and not response['exception']:
+            words = response['values']
+            now = self.clock.elapsed()
+            for register in members:
+                value = decodeValue(register, words, register['address'] - address)
+                result[register['name']] = value
+                if register['ttl_ms'] > 0:
+                    self.cache[register['name']] = (value, now)
+        pending.pop()
+        if not pending:
+            self.valuesRead.emit(result)
+            if callback is not None:
+                callback(result)
+
+    def read(self, names, callback=None, slave_id=None, retries=None):
+        """
+        레지스터 묶음 읽기 (캐시에 있는 값은 요청하지 않음, 모두 끝나면 callback(result))
+        retries: 응답이 없을 때 재시도 횟수 (None이면 장치 기본값)
+        :return: (dict 결과(채워지는 중), list of DeviceRequest)
+        """
+        slave_id = self.slave_id if slave_id is None else slave_id
+        result = {}
+        missing = []
+        for name in names:
+            value = self.cached(name)
+            if value is None:
+                missing.append(self.registers[name])
+            else:
+                result[name] = value
+        ranges = mergeRanges(missing)
+        if not ranges:
+            self.valuesRead.emit(result)
+            if callback is not None:
+                callback(result)
+            return result, []
+        pending = [None] * len(ranges)
+        requests = []
+        for func, address, qor, members in ranges:
+            frame = self.frame_builder.readRegister(id=slave_id, func=func, address=address, qor=qor)
+            request = self.submit_func(frame, retries=retries)
+            self.transaction_count += 1
+            request.finished.connect(
+                lambda response, m=members, a=address: self._onReadFinished(m, a, response, result, pending, callback))
+            if request.done:
+                # 큐가 가득 찬 경우 등 이미 끝난 요청
+                self._onReadFinished(members, address, request.response, result, pending, callback)
+            requests.append(request)
+        return result, requests
+
+    def readWait(self, names, timeout_ms=1000, slave_id=None):
+        """
+        응답까지 대기하여 값 반환 (응답이 없는 레지스터는 결과에 없음)
+        :return: dict
+        """
+        result, requests = self.read(names, slave_id=slave_id)
+        for request in requests:
+            request.wait(timeout_ms)
+        return result
+
+    def write(self, values, slave_id=None, policy=None):
+        """
+        레지스터 쓰기 (인접한 레지스터는 function 16 요청 1개, 단일 레지스터는 function 6)
+        policy: 큐 처리 방식 (dsDevice.POLICY_*, None이면 장치 기본값)
+        :return: list of DeviceRequest
+        """
+        slave_id = self.slave_id if slave_id is None else slave_id
+        registers = []
+        for name in values:
+            register = self.registers[name]
+            if not register['writable']:
+                raise ValueError("read-only register: %s" % name)
+            registers.append(dict(register, func=16))
+        requests = []
+        for func, address, qor, members in mergeRanges(registers):
+            words = [0] * qor
+            for register in members:
+                offset = register['address'] - address
+                words[offset:offset + register['width']] = encodeValue(register, values[register['name']])
+            if qor == 1:
+                frame = self.frame_builder.writeSingleRegister(id=slave_id, func=6, address=address, data_command=words[0])
+            else:
+                frame = self.frame_builder.writeMultipleRegisters(id=slave_id, func=16, address=address, values=words)
+            if policy is None:
+                requests.append(self.submit_func(frame))
+            else:
+                requests.append(self.submit_func(frame, policy=policy))
+            self.transaction_count += 1
+        self.invalidate(values.keys())
+        return requests
@@ -0,0 +1,213 @@
+""" Resource Bundle (ui/images -> .rcc 파일, QResource 등록, 파일 경로 -> :/ 경로 변환표) """
+import os
+import sys
+import json
+import time
+import shutil
+import hashlib
+import argparse
+import subprocess
+from xml.sax.saxutils import escape
+
+import PySide6
+from PySide6.QtCore import QResource
+
+# 실행 위치(작업 디렉터리)와 관계없이 찾도록 모듈 위치 기준
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+RCC_DIR = os.path.join(BASE_DIR, "ui", "rcc")
+TABLE_FILE = "resources.json"   # RCC_DIR 아래 변환표
+
+# 묶음 이름 -> 포함할 디렉터리 (ui/images_opt는 dsAssets.py로 만든 경우만, 파일이 없는 묶음은 건너뜀)
+# 안내 음성(ui/sound)은 winsound가 파일 경로만 재생할 수 있어 (SND_MEMORY는 비동기 재생 불가) 파일로 둔다.
+# ui/font는 사용하지 않으므로 (main의 addApplicationFont 주석 처리) 묶지 않는다.
+BUNDLES = {'images': ("ui/images",),
+           'images_opt': ("ui/images_opt",)}
+STORED_EXTS = ('.png', '.jpg', '.jpeg', '.webp')    # 이미 압축된 형식은 압축 없이 (mmap 영역을 그대로 사용)
+
+_table = {}         # './ui/images/x.png' -> ':/ui/images/x.png'
+_registered = []    # 등록한 .rcc 경로
+
+def rccCommand():
+    """
+    PySide6 rcc 실행 명령 (PySide6 설치 경로의 rcc, 없으면 pyside6-rcc)
+    :return: list
+    """
+    pyside_dir = os.path.dirname(PySide6.__file__)
+    if sys.platform == "win32":
+        exe = os.path.join(pyside_dir, "rcc.exe")
+    else:
+        exe = os.path.join(pyside_dir, "Qt", "libexec", "rcc")
+    if os.path.isfile(exe):
+        return [exe]
+    exe = shutil.which("pyside6-rcc")
+    if exe is None:
+        raise RuntimeError("rcc not found (PySide6)")
+    return [exe]
+
+def listFiles(dirs, base_dir=BASE_DIR):
+    # BASE_DIR 기준 상대 경로 ('ui/images/x.png')
+    files = []
+    for directory in dirs:
+        for root, dir_names, file_names in os.walk(os.path.join(base_dir, directory)):
+            dir_names.sort()
+            for file_name in sorted(file_names):
+                if file_name == "manifest.json":
+                    continue
+                files.append(os.path.relpath(os.path.join(root, file_name), base_dir).replace(os.sep, '/'))
+    return files
+
+def listingHash(files, base_dir=BASE_DIR):
+    # 파일 목록, 크기, 수정 시각이 같으면 다시 만들지 않음
+    digest = hashlib.sha1()
+    for name in files:
+        stat = os.stat(os.path.join(base_dir, name))
+        digest.update(("%s %d %d\n" % (name, stat.st_size, stat.st_mtime_ns)).encode('utf-8'))
+    return digest.hexdigest()
+
+def writeQrc(name, files, rcc_dir=RCC_DIR, base_dir=BASE_DIR):
+    """
+    .qrc 작성 (이미지는 압축 없이, 그 외는 rcc 기본 압축)
+    :return: str (.qrc 경로)
+    """
+    os.makedirs(rcc_dir, exist_ok=True)
+    qrc_path = os.path.join(rcc_dir, name + ".qrc")
+    lines = ['<!DOCTYPE RCC>', '<RCC version="1.0">', '<qresource prefix="/">']
+    for file_name in files:
+        source = os.path.relpath(os.path.join(base_dir, file_name), rcc_dir).replace(os.sep, '/')
+        stored = ' compression-algorithm="none"' if file_name.lower().endswith(STORED_EXTS) else ''
+        lines.append('  <file alias="%s"%s>%s</file>' % (escape(file_name), stored, escape(source)))
+    lines += ['</qresource>', '</RCC>']
+    with open(qrc_path, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(lines) + '\n')
+    return qrc_path
+
+def loadTable(rcc_dir=RCC_DIR):
+    path = os.path.join(rcc_dir, TABLE_FILE)
+    if not os.path.isfile(path):
+        return {}
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError) as err:
+        print("dsResource loadTable:", err)
+        return {}
+
+def buildBundles(rcc_dir=RCC_DIR, base_dir=BASE_DIR, force=False):
+    """
+    빌드 단계: 파일 목록이 바뀐 묶음만 rcc로 다시 만들고 변환표 작성
+    :return: dict (변환표)
+    """
+    previous = loadTable(rcc_dir).get('bundles', {})
+    bundles = {}
+    for name, dirs in BUNDLES.items():
+        files = listFiles(dirs, base_dir)
+        if not files:
+            continue
+        listing = listingHash(files, base_dir)
+        rcc_path = os.path.join(rcc_dir, name + ".rcc")
+        item = previous.get(name)
+        if not force and item is not None and item['listing'] == listing and os.path.isfile(rcc_path):
+            bundles[name] = item
+            continue
+        qrc_path = writeQrc(name, files, rcc_dir, base_dir)
+        subprocess.run(rccCommand() + ['--binary', '-o', rcc_path, qrc_path], check=True, capture_output=True)
+        bundles[name] = {'rcc': name + ".rcc",
+                         'listing': listing,
+                         'files': files,
+                         'bytes': os.path.getsize(rcc_path),
+                         'source_bytes': sum(os.path.getsize(os.path.join(base_dir, f)) for f in files)}
+        print("rcc: %s %d files, %.1f MB -> %.1f MB" % (
+            name, len(files), bundles[name]['source_bytes'] / 1e6, bundles[name]['bytes'] / 1e6))
+    table = {'bundles': bundles}
+    with open(os.path.join(rcc_dir, TABLE_FILE), 'w', encoding='utf-8') as f:
+        json.dump(table, f, ensure_ascii=False, indent='\t')
+    return table
+
+def register(rcc_dir=RCC_DIR):
+    """
+    .rcc 등록 (QResource가 파일을 메모리 매핑) 후 등록한 묶음의 경로 변환표
+    등록에 실패한 묶음의 파일은 원래 경로 사용
+    :return: dict ('./ui/images/x.png' -> ':/ui/images/x.png')
+    """
+    unregister()
+    for name, item in loadTable(rcc_dir).get('bundles', {}).items():
+        rcc_path = os.path.join(rcc_dir, item['rcc'])
+        if not QResource.registerResource(rcc_path):
+            print("dsResource register failed:", rcc_path)
+            continue
+        _registered.append(rcc_path)
+        for file_name in item['files']:
+            _table["./" + file_name] = ":/" + file_name
+    return dict(_table)
+
+def unregister():
+    while _registered:
+        QResource.unregisterResource(_registered.pop())
+    _table.clear()
+
+def path(file_path):
+    # 등록한 묶음에 있으면 :/ 경로
+    return _table.get(file_path, file_path)
+
+def _readIo():
+    # 프로세스 누적 read 호출 수, 읽은 바이트 (Linux /proc, 다른 OS는 None)
+    try:
+        with open("/proc/self/io") as f:
+            values = dict(line.split(': ') for line in f.read().splitlines())
+        return int(values['syscr']), int(values['rchar'])
+    except (OSError, KeyError, ValueError):
+        return None
+
+def benchStartup(mode):
+    """
+    프로그램 시작 + 주요 화면 첫 표시까지 파일 읽기 (rcc: 묶음 등록 후)
+    :return: dict
+    """
+    from PySide6.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication(sys.argv)
+    os.chdir(BASE_DIR)
+    import dsSetting
+    dsSetting.dsParam['resource_bundle_onoff'] = 1 if mode == 'rcc' else 0
+    import ScentSmart
+    before = _readIo()
+    start = time.perf_counter()
+    ui = ScentSmart.UiDlg()
+    ui.uiDlgStart()
+    for name in ('ui_main_dlg', 'ui_menu_dlg', 'ui_test_identification_response', 'ui_test_results'):
+        getattr(ui, name).grab()
+    ms = (time.perf_counter() - start) * 1000
+    after = _readIo()
+    result = {'ms': ms}
+    if before is not None and after is not None:
+        result['read_calls'] = after[0] - before[0]
+        result['read_bytes'] = after[1] - before[1]
+    return result
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="ui/images -> .rcc (빌드 단계)")
+    parser.add_argument('--force', action='store_true', help="모두 다시 만들기")
+    parser.add_argument('--bench', action='store_true', help="파일/rcc 시작 시 파일 읽기 비교")
+    parser.add_argument('--bench-mode', choices=('files', 'rcc'), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.bench_mode is not None:
+        print(json.dumps(benchStartup(args.bench_mode)))
+        sys.stdout.flush()
+        os._exit(0)
+    table = buildBundles(force=args.force)
+    print("bundles: %s (%s)" % (", ".join(table['bundles']), RCC_DIR))
+    if args.bench:
+        # 처음 시작 비교이므로 방식마다 별도 프로세스
+        for mode in ('files', 'rcc'):
+            output = subprocess.run([sys.executable, os.path.abspath(__file__), '--bench-mode', mode],
+                                    capture_output=True, cwd=BASE_DIR).stdout.decode('utf-8')
+            lines = output.strip().splitlines()
+            if not lines or not lines[-1].startswith('{'):
+                print("bench %s: no result (process failed)" % mode)
+                continue
+            result = json.loads(lines[-1])
+            print("%-5s %7.1f ms, read calls %s, read %.1f MB" % (
+                mode, result['ms'], result.get('read_calls', 'n/a'), result.get('read_bytes', 0) / 1e6))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
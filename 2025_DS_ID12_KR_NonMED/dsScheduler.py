@@ -0,0 +1,184 @@
+""" Emission Scheduler (발향 단계 타이머) """
+from PySide6.QtCore import Qt, QObject, QTimer, QElapsedTimer, QEventLoop
+from PySide6.QtCore import Signal # Slot
+
+TICK_MS = 30 # 진행바 갱신 주기
+
+class SchedulerBusyError(RuntimeError):
+    """발향 진행 중에 다시 시작 (진행 중 버튼 입력 등)"""
+
+def makePhase(name, duration_ms, progress_bar=None, on_start=None):
+    """
+    발향 단계 (emit, post_delay, clean, clean_post_delay, interval)
+    :return: dict
+    """
+    return {'name': name,
+            'duration_ms': max(0, int(duration_ms)),
+            'progress_bar': progress_bar,
+            'on_start': on_start}
+
+class EmissionScheduler(QObject):
+    """
+    하나의 QTimer와 monotonic 시계로 발향 단계를 순서대로 진행한다.
+    단계 종료 시각은 시작 시각 기준으로 계산하므로 tick 지연이 누적되지 않고,
+    진행바는 tick 횟수가 아닌 경과 시간으로 갱신한다.
+    """
+    phaseChanged = Signal(str, name="phaseChanged")
+    progressChanged = Signal(int, name="progressChanged")
+    finished = Signal(int, name="finished") # 실제 소요 시간 (ms)
+    pausedChanged = Signal(bool, name="pausedChanged")
+
+    def __init__(self, parent=None):
+        QObject.__init__(self, parent)
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self.timer.timeout.connect(self._onTick)
+        self.clock = QElapsedTimer()
+        self.phases = []
+        self.deadlines = []
+        self.phase_index = -1
+        self.running = False
+        self.paused = False
+        self.elapsed_offset_ms = 0   # 일시 정지 전까지 진행한 시간
+        self.last_elapsed_ms = 0
+        self.last_drift_ms = 0
+
+    def elapsed(self):
+        # 일시 정지 시간을 제외한 진행 시간 (ms)
+        if self.paused:
+            return self.elapsed_offset_ms
+        return self.elapsed_offset_ms + self.clock.elapsed()
+
+    def totalMs(self):
+        return self.deadlines[-1] if self.deadlines else 0
+
+    def start(self, phases):
+        if self.running:
+            raise SchedulerBusyError("EmissionScheduler: already running")
+        self.phases = phases
+        self.deadlines = []
+        end = 0
+        for phase in phases:
+            end += phase['duration_ms']
+            self.deadlines.append(end)
+        self.phase_index = -1
+        self.running = True
+        self.paused = False
+        self.elapsed_offset_ms = 0
+        self.clock.start()
+        self._onTick()
+        return True
+
+    def stop(self):
+        self.timer.stop()
+        if self.running:
+            self.last_elapsed_ms = self.elapsed()
+            self.running = False
+            self.paused = False
+            self.last_drift_ms = 0
+            self.finished.emit(self.last_elapsed_ms)
+
+    def pause(self):
+        """
+        진행 중인 단계에서 멈춤 (run()은 계속 대기)
+        :return: bool
+        """
+        if not self.running or self.paused:
+            return False
+        self.elapsed_offset_ms = self.elapsed()
+        self.paused = True
+        self.timer.stop()
+        self.pausedChanged.emit(True)
+        return True
+
+    def resume(self, restart_phase=True):
+        """
+        멈춘 위치부터 다시 진행
+        restart_phase: 멈춘 단계를 처음부터 다시 시작 (발향 명령 재전송, 같은 검사 회차 유지)
+        :return: bool
+        """
+        if not self.running or not self.paused:
+            return False
+        index = self.phase_index
+        if restart_phase and 0 <= index < len(self.phases):
+            self.elapsed_offset_ms = self.deadlines[index] - self.phases[index]['duration_ms']
+            # 단계 시작 처리(on_start)를 다시 실행
+            self.phase_index = index - 1
+        self.paused = False
+        self.clock.start()
+        self.pausedChanged.emit(False)
+        self._onTick()
+        return True
+
+    def endPhase(self):
+        """
+        진행 중인 단계를 바로 끝내고 다음 단계로 (이후 단계 종료 시각을 남은 시간만큼 앞당김)
+        :return: int (줄어든 시간 ms)
+        """
+        if not self.running or self.paused or not 0 <= self.phase_index < len(self.phases):
+            return 0
+        saved = self.deadlines[self.phase_index] - self.elapsed()
+        if saved <= 0:
+            return 0
+        for i in range(self.phase_index, len(self.deadlines)):
+            self.deadlines[i] -= saved
+        self.timer.stop()
+        self._onTick()
+        return saved
+
+    def run(self, phases):
+        """
+        모든 단계가 끝날 때까지 이벤트 루프 하나로 대기
+        진행 중에 다시 호출하면 SchedulerBusyError (기다리지 않으므로 호출하는 쪽은 발향이 끝난 것으로 처리하면 안 됨)
+        :return: int (실제 소요 시간 ms)
+        """
+        self.start(phases)
+        if self.running:
+            loop = QEventLoop()
+            self.finished.connect(loop.quit)
+            loop.exec()
+            self.finished.disconnect(loop.quit)
+        return self.last_elapsed_ms
+
+    def _enterPhase(self, index):
+        # 이전 단계 진행바 완료 표시
+        if 0 <= self.phase_index < len(self.phases):
+            progress_bar = self.phases[self.phase_index]['progress_bar']
+            if progress_bar is not None:
+                progress_bar.setValue(100)
+        self.phase_index = index
+        if index < len(self.phases):
+            phase = self.phases[index]
+            if phase['on_start'] is not None:
+                phase['on_start']()
+            self.phaseChanged.emit(phase['name'])
+
+    def _onTick(self):
+        if not self.running or self.paused:
+            return
+        elapsed = self.elapsed()
+        index = max(self.phase_index, 0)
+        while index < len(self.deadlines) and elapsed >= self.deadlines[index]:
+            index += 1
+        # 건너뛴 단계도 순서대로 시작 처리 (진행바 색상 등)
+        while self.phase_index < index:
+            self._enterPhase(self.phase_index + 1)
+        if index >= len(self.phases):
+            self.running = False
+            self.last_elapsed_ms = elapsed
+            self.last_drift_ms = elapsed - self.totalMs()
+            self.finished.emit(elapsed)
+            return
+        phase = self.phases[index]
+        phase_start = self.deadlines[index] - phase['duration_ms']
+        if phase['progress_bar'] is not None and phase['duration_ms'] > 0:
+            value = int(100 * (elapsed - phase_start) / phase['duration_ms'])
+            phase['progress_bar'].setValue(value)
+            self.progressChanged.emit(value)
+            delay = TICK_MS
+        else:
+            # 진행바가 없는 단계는 종료 시각까지 대기
+            delay = self.deadlines[index] - elapsed
+        # 다음 단계 시작 시각을 넘기지 않도록 조정
+        self.timer.start(max(0, min(delay, self.deadlines[index] - elapsed)))
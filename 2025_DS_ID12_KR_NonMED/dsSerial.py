@@ -1,17 +1,27 @@
 """ Serial Thread """
-from PySide6.QtCore import QThread
-from PySide6.QtCore import QWaitCondition
-from PySide6.QtCore import QMutex
+from collections import deque
+
+from PySide6.QtCore import QThread, QObject, QIODevice, QTimer
 from PySide6.QtCore import Signal # Slot
-from PySide6.QtSerialPort import QSerialPortInfo
+from PySide6.QtSerialPort import QSerialPortInfo, QSerialPort
 
 import serial
+import time
+import threading
+import dsFrame
+import dsMetrics
+import dsCapture
 
 BAUDRATES = (9600, 19200, 38400, 57600, 115200)
 DATABITS = (serial.FIVEBITS, serial.SIXBITS, serial.SEVENBITS, serial.EIGHTBITS)
 FLOWCONTROL = ("No flowcontrol", "Hardware flowcontrol", "Software flowcontrol")
 PARITY = (serial.PARITY_NONE, serial.PARITY_EVEN, serial.PARITY_ODD, serial.PARITY_MARK, serial.PARITY_SPACE)
 STOPBITS = (serial.STOPBITS_ONE, serial.STOPBITS_ONE_POINT_FIVE, serial.STOPBITS_TWO)
+# 수신 방식 (설정 serial_backend)
+SERIAL_BACKEND_PYSERIAL = 'pyserial'
+SERIAL_BACKEND_QSERIALPORT = 'qserialport'
+SERIAL_BACKENDS = (SERIAL_BACKEND_PYSERIAL, SERIAL_BACKEND_QSERIALPORT)
+WRITE_TIMEOUT = 0.5     # 프레임 1개를 OS 버퍼에 모두 쓰기까지 대기 (초)
 
 def _get_available_ports():
     return QSerialPortInfo().availablePorts()
@@ -77,48 +87,446 @@ def _connect_default(_serial, _serial_read_thread,
     _serial_read_thread.set_status(status)
     return status
 
-def _disconnect(_serial, _serial_read_thread):
+def _disconnect(_serial, _serial_read_thread, _serial_write_thread=None):
     print("dsSerial _disconnect")
+    # 진행 중인 읽기(읽기 timeout 이내)와 쓰기가 끝난 뒤 포트 닫기
     _serial_read_thread.set_status(False)
-    _serial.close()
+    if _serial_write_thread is not None:
+        _serial_write_thread.close_port()
+    else:
+        _serial.close()
     return False
 
+def _dispatchFrames(reader, data):
+    # 수신 바이트를 프레임으로 분리하여 시그널 발생 (console, capture는 선택)
+    now = time.monotonic()
+    if reader.capture is not None:
+        # 프레임 분리 전 원본 바이트 (재생 시 같은 시각으로 parser에 다시 넣음)
+        reader.capture.append(dsCapture.DIR_RX, data, now)
+    for frame in reader.parser.feed(data, now):
+        # 프레임 분리 시각을 프레임과 함께 전달 (dispatch/turnaround 측정)
+        rx_time = dsMetrics.now()
+        if reader.console is not None:
+            reader.console.appendFrame("RX", frame)
+        reader._serial_received_data.emit(frame, rx_time)
+
 class SerialReadThread(QThread):
-    """SerialReadThread Class"""
+    """SerialReadThread Class (pyserial, 읽기 timeout 주기로 깨어남)"""
     # 데이터 수신한 경우 Signal 전달
-    _serial_received_data = Signal(bytes, name="serialReceivedData")
+    _serial_received_data = Signal(bytes, float, name="serialReceivedData")   # 프레임, 분리 시각 (dsMetrics.now)
 
     def __init__(self, _serial):
         QThread.__init__(self)
-        self.wait_condition = QWaitCondition()
+        # 수신 대기/깨우기 (프레임마다 호출되므로 QMutex/QWaitCondition 대신 threading 사용)
+        self.wait_condition = threading.Condition()
         self.data_status = False
-        self.mutex = QMutex()
+        self.running = True
+        # 포트 읽기/프레임 분리 중에는 상태 변경(포트 닫기, parser 초기화)을 기다림
+        self.read_lock = threading.Lock()
         self._serial = _serial
+        # 수신 프레임 분리 (readline은 0x0A 데이터에서 프레임이 잘림)
+        self.parser = dsFrame.RtuFrameParser()
+        # 송수신 콘솔 (dsConsole.SerialConsole, 수신 프레임 hex 변환을 이 스레드에서 처리)
+        self.console = None
+        # 송수신 기록 (dsCapture.CaptureWriter, 없으면 기록 안 함)
+        self.capture = None
+        self.wakeup_count = 0
+        # 읽기 오류 (USB 어댑터 분리 등, dsLink가 연결 끊김 판단에 사용)
+        self.error_count = 0
 
     def __del__(self):
+        try:
+            self.stop()
+        except RuntimeError:
+            # Qt 객체가 이미 삭제된 경우
+            pass
+
+    def stop(self):
+        # 루프 종료 후 스레드가 끝날 때까지 대기 (읽기 timeout 이내)
+        with self.wait_condition:
+            self.running = False
+            self.wait_condition.notify_all()
         self.wait()
 
     def run(self):
         # 들어온 데이터가 있다면 시그널을 발생
         while True:
-            self.mutex.lock()
-            if not self.data_status:
-                self.wait_condition.wait(self.mutex)
-            if self._serial and self._serial.is_open:
-                buf = self._serial.readline()
+            with self.wait_condition:
+                while self.running and not self.data_status:
+                    self.wait_condition.wait()
+                running = self.running
+            if not running:
+                break
+            self.wakeup_count += 1
+            # 포트 읽기는 read_lock 안에서 (set_status(False)는 읽기가 끝난 뒤 반환, 그 다음 포트를 닫음)
+            with self.read_lock:
+                buf = self._read()
                 if buf:
-                    # print("buf:", buf.hex())
-                    self._serial_received_data.emit(buf)
-            self.mutex.unlock()
+                    _dispatchFrames(self, buf)
+            if buf is None:
+                time.sleep(0.05)
+
+    def _read(self):
+        # 수신된 만큼 읽음 (없으면 1 바이트를 timeout까지 대기), 읽을 수 없으면 None
+        if not self.data_status or not self._serial.is_open:
+            return None
+        try:
+            return self._serial.read(self._serial.in_waiting or 1)
+        except (serial.SerialException, OSError) as err:
+            # 장치가 분리된 경우 등 (계속 실패하므로 잠시 대기)
+            if self.error_count == 0:
+                print("dsSerial SerialReadThread read:", err)
+            self.error_count += 1
+            return None
 
     def toggle_status(self):
         print("dsSerial SerialReadThread toggle_status: ")
-        self.data_status = not self.data_status
-        if self.data_status:
-            self.wait_condition.wakeAll()
+        self.set_status(not self.data_status)
 
     def set_status(self, status):
         print("dsSerial SerialReadThread set_status:", status)
+        if not status:
+            # 새 읽기를 시작하지 않도록 먼저 표시하고, 진행 중인 읽기는 취소 (읽기 timeout을 기다리지 않음)
+            self.data_status = False
+            if self._serial.is_open:
+                self._serial.cancel_read()
+        with self.read_lock, self.wait_condition:
+            self.data_status = status
+            if self.data_status:
+                self.parser.setBaudrate(self._serial.baudrate)
+                self.parser.reset()
+                # 포트를 열 때마다 기록 파일 헤더의 통신 속도 갱신 (재생 시 프레임 분리 기준)
+                if self.capture is not None:
+                    self.capture.setBaudrate(self._serial.baudrate)
+                self.wait_condition.notify_all()
+
+# pyserial 설정값 -> QSerialPort 설정값
+QT_PARITY = {serial.PARITY_NONE: QSerialPort.Parity.NoParity,
+             serial.PARITY_EVEN: QSerialPort.Parity.EvenParity,
+             serial.PARITY_ODD: QSerialPort.Parity.OddParity,
+             serial.PARITY_MARK: QSerialPort.Parity.MarkParity,
+             serial.PARITY_SPACE: QSerialPort.Parity.SpaceParity}
+QT_STOPBITS = {serial.STOPBITS_ONE: QSerialPort.StopBits.OneStop,
+               serial.STOPBITS_ONE_POINT_FIVE: QSerialPort.StopBits.OneAndHalfStop,
+               serial.STOPBITS_TWO: QSerialPort.StopBits.TwoStop}
+QT_DATABITS = {serial.FIVEBITS: QSerialPort.DataBits.Data5,
+               serial.SIXBITS: QSerialPort.DataBits.Data6,
+               serial.SEVENBITS: QSerialPort.DataBits.Data7,
+               serial.EIGHTBITS: QSerialPort.DataBits.Data8}
+
+class QtSerial:
+    """
+    QSerialPort를 serial.Serial과 같은 방식으로 사용하기 위한 래퍼
+    (_open, _disconnect, write_data 등 기존 함수를 그대로 사용)
+    """
+    def __init__(self):
+        self.qport = QSerialPort()
+        self.port = None
+        self._baudrate = 9600
+        self.parity = serial.PARITY_NONE
+        self.stopbits = serial.STOPBITS_ONE
+        self.bytesize = serial.EIGHTBITS
+        self.timeout = None         # 사용하지 않음 (readyRead)
+        self.write_timeout = None   # 사용하지 않음
+
+    @property
+    def baudrate(self):
+        return self._baudrate
+
+    @baudrate.setter
+    def baudrate(self, baudrate):
+        self._baudrate = baudrate
+        if self.qport.isOpen():
+            self.qport.setBaudRate(baudrate)
+
+    @property
+    def is_open(self):
+        return self.qport.isOpen()
+
+    @property
+    def in_waiting(self):
+        return self.qport.bytesAvailable()
+
+    def open(self):
+        self.qport.setPortName(self.port)
+        self.qport.setBaudRate(self._baudrate)
+        self.qport.setParity(QT_PARITY[self.parity])
+        self.qport.setStopBits(QT_STOPBITS[self.stopbits])
+        self.qport.setDataBits(QT_DATABITS[self.bytesize])
+        self.qport.setFlowControl(QSerialPort.FlowControl.NoFlowControl)
+        if not self.qport.open(QIODevice.OpenModeFlag.ReadWrite):
+            raise serial.SerialException(self.qport.errorString())
+
+    def close(self):
+        self.qport.close()
+
+    def write(self, data):
+        written = self.qport.write(bytes(data))
+        # 이벤트 루프를 기다리지 않고 바로 전송
+        self.qport.flush()
+        return written
+
+    def read(self, size=1):
+        return bytes(self.qport.read(size))
+
+class QtSerialReader(QObject):
+    """
+    QSerialPort readyRead로 수신 (바이트가 도착할 때만 GUI 스레드에서 호출, 스레드/mutex 없음)
+    SerialReadThread와 같은 인터페이스 (set_status, start, stop, _serial_received_data)
+    """
+    _serial_received_data = Signal(bytes, float, name="serialReceivedData")   # 프레임, 분리 시각 (dsMetrics.now)
+
+    def __init__(self, _serial):
+        QObject.__init__(self)
+        self.data_status = False
+        self._serial = _serial
+        self.parser = dsFrame.RtuFrameParser()
+        self.console = None
+        self.capture = None
+        self.wakeup_count = 0
+        self.error_count = 0
+        _serial.qport.readyRead.connect(self._onReadyRead)
+        _serial.qport.errorOccurred.connect(self._onError)
+
+    def start(self, priority=None):
+        pass
+
+    def stop(self):
+        self.data_status = False
+
+    def wait(self, timeout=None):
+        return True
+
+    def _onError(self, error):
+        if error != QSerialPort.SerialPortError.NoError:
+            self.error_count += 1
+
+    def _onReadyRead(self):
+        self.wakeup_count += 1
+        data = bytes(self._serial.qport.readAll())
+        if self.data_status and data:
+            _dispatchFrames(self, data)
+
+    def toggle_status(self):
+        print("dsSerial QtSerialReader toggle_status: ")
+        self.set_status(not self.data_status)
+
+    def set_status(self, status):
+        print("dsSerial QtSerialReader set_status:", status)
         self.data_status = status
         if self.data_status:
-            self.wait_condition.wakeAll()
+            self.parser.setBaudrate(self._serial.baudrate)
+            self.parser.reset()
+            # 포트를 열 때마다 기록 파일 헤더의 통신 속도 갱신 (재생 시 프레임 분리 기준)
+            if self.capture is not None:
+                self.capture.setBaudrate(self._serial.baudrate)
+
+def _txReadyAt(writer):
+    # 다음 송신 가능 시각: 마지막 송신/수신 이후 3.5 문자 무응답 (RS-485 반이중)
+    gap = dsFrame.silenceTime(writer._serial.baudrate)
+    last_rx = writer.reader.parser.last_rx_time if writer.reader is not None else 0.0
+    return max(writer.last_tx_end, last_rx) + gap
+
+def _onWritten(writer, data, write_start):
+    # 송신 완료 기록 (metrics, console, capture는 선택)
+    now = time.monotonic()
+    # OS 버퍼에 쓴 뒤 실제 선로 전송이 끝나는 시각
+    writer.last_tx_end = now + len(data) * dsFrame.charTime(writer._serial.baudrate)
+    writer.write_count += 1
+    if writer.metrics is not None:
+        writer.metrics.since('write', write_start)
+    if writer.console is not None:
+        writer.console.appendFrame("TX", data)
+    if writer.capture is not None:
+        writer.capture.append(dsCapture.DIR_TX, data, now)
+
+class SerialWriteThread(QThread):
+    """
+    송신 스레드 (pyserial)
+    GUI 스레드는 프레임을 큐에 넣기만 하고, 이 스레드가 프레임 간격(3.5 문자)을 지켜 하나씩 쓴다.
+    write_timeout 0(non blocking)에서 일부만 쓰인 경우 나머지를 WRITE_TIMEOUT까지 이어서 쓴다.
+    Modbus RTU는 프레임마다 무응답 간격이 필요하므로 여러 프레임을 하나로 합쳐 쓰지 않는다.
+    """
+    _serial_written = Signal(bytes, bool, float, name="serialWritten")   # 프레임, 성공 여부, 완료 시각 (dsMetrics.now)
+
+    def __init__(self, _serial, reader=None):
+        QThread.__init__(self)
+        # 송신 큐 대기/깨우기 (SerialReadThread와 같이 threading 사용)
+        self.wait_condition = threading.Condition()
+        # 쓰는 중에는 포트를 닫지 않음 (close_port)
+        self.port_lock = threading.Lock()
+        self.running = True
+        self._serial = _serial
+        self.reader = reader
+        self.queue = deque()
+        self.depth_max = 0
+        self.last_tx_end = 0.0
+        self.metrics = None
+        self.console = None
+        self.capture = None
+        self.write_count = 0
+        self.partial_count = 0
+        self.failed_count = 0
+
+    def __del__(self):
+        try:
+            self.stop()
+        except RuntimeError:
+            pass
+
+    def write(self, data):
+        """
+        송신 큐에 추가 (바로 반환)
+        :return: int (큐 길이)
+        """
+        with self.wait_condition:
+            self.queue.append(bytes(data))
+            depth = len(self.queue)
+            self.depth_max = max(self.depth_max, depth)
+            self.wait_condition.notify_all()
+        return depth
+
+    def depth(self):
+        return len(self.queue)
+
+    def clear(self):
+        with self.wait_condition:
+            self.queue.clear()
+
+    def close_port(self):
+        # 진행 중인 쓰기(WRITE_TIMEOUT 이내)가 끝난 뒤 닫음
+        with self.port_lock:
+            self._serial.close()
+
+    def stop(self):
+        with self.wait_condition:
+            self.running = False
+            self.wait_condition.notify_all()
+        self.wait()
+
+    def run(self):
+        while True:
+            with self.wait_condition:
+                while self.running and not self.queue:
+                    self.wait_condition.wait()
+                if not self.running:
+                    break
+                data = self.queue.popleft()
+            # 프레임 간격
+            delay = _txReadyAt(self) - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            ok = self._writeAll(data)
+            self._serial_written.emit(data, ok, dsMetrics.now())
+
+    def _writeAll(self, data):
+        write_start = dsMetrics.now()
+        deadline = time.monotonic() + WRITE_TIMEOUT
+        view = memoryview(data)
+        sent = 0
+        try:
+            with self.port_lock:
+                if not self._serial.is_open:
+                    raise serial.SerialException("port not open")
+                while sent < len(data):
+                    written = self._serial.write(view[sent:]) or 0
+                    sent += written
+                    if sent < len(data):
+                        # OS 송신 버퍼가 가득 참
+                        self.partial_count += 1
+                        if time.monotonic() > deadline:
+                            raise serial.SerialTimeoutException("write timeout (%d/%d)" % (sent, len(data)))
+                        time.sleep(dsFrame.charTime(self._serial.baudrate))
+        except (serial.SerialException, OSError) as err:
+            # 포트가 닫혀 있거나 장치가 분리된 경우 등
+            print("dsSerial SerialWriteThread write:", err)
+            self.failed_count += 1
+            return False
+        _onWritten(self, data, write_start)
+        return True
+
+class QtSerialWriter(QObject):
+    """
+    QSerialPort 송신 큐 (GUI 스레드, QSerialPort가 내부 버퍼로 나누어 쓰므로 블로킹 없음)
+    SerialWriteThread와 같은 인터페이스, 프레임 간격은 single shot QTimer로 기다린다.
+    """
+    _serial_written = Signal(bytes, bool, float, name="serialWritten")
+
+    def __init__(self, _serial, reader=None):
+        QObject.__init__(self)
+        self._serial = _serial
+        self.reader = reader
+        self.queue = deque()
+        self.depth_max = 0
+        self.last_tx_end = 0.0
+        self.metrics = None
+        self.console = None
+        self.capture = None
+        self.write_count = 0
+        self.partial_count = 0
+        self.failed_count = 0
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self._pump)
+
+    def start(self, priority=None):
+        pass
+
+    def stop(self):
+        self.timer.stop()
+        self.queue.clear()
+
+    def wait(self, timeout=None):
+        return True
+
+    def write(self, data):
+        self.queue.append(bytes(data))
+        self.depth_max = max(self.depth_max, len(self.queue))
+        if not self.timer.isActive():
+            self._pump()
+        return len(self.queue)
+
+    def depth(self):
+        return len(self.queue)
+
+    def clear(self):
+        self.queue.clear()
+
+    def close_port(self):
+        # GUI 스레드에서만 쓰므로 바로 닫음
+        self._serial.close()
+
+    def _pump(self):
+        while self.queue:
+            delay = _txReadyAt(self) - time.monotonic()
+            if delay > 0:
+                self.timer.start(max(1, int(delay * 1000 + 0.999)))
+                return
+            data = self.queue.popleft()
+            write_start = dsMetrics.now()
+            ok = self._serial.qport.isOpen() and self._serial.write(data) == len(data)
+            if ok:
+                _onWritten(self, data, write_start)
+            else:
+                self.failed_count += 1
+            self._serial_written.emit(data, ok, dsMetrics.now())
+
+def createSerial(backend=SERIAL_BACKEND_PYSERIAL):
+    """
+    송수신 backend 생성 (pyserial: 수신 스레드, qserialport: readyRead)
+    :return: (serial 객체, 수신 객체)
+    """
+    if backend == SERIAL_BACKEND_QSERIALPORT:
+        _serial = QtSerial()
+        return _serial, QtSerialReader(_serial)
+    _serial = serial.Serial()
+    return _serial, SerialReadThread(_serial)
+
+def createWriter(_serial, reader, backend=SERIAL_BACKEND_PYSERIAL):
+    """
+    송신 큐 생성 (pyserial: 송신 스레드, qserialport: QSerialPort 내부 버퍼)
+    :return: 송신 객체
+    """
+    if backend == SERIAL_BACKEND_QSERIALPORT:
+        return QtSerialWriter(_serial, reader)
+    return SerialWriteThread(_serial, reader)
@@ -12,7 +12,24 @@ dsParam = {'scent_power': 40,
         # 'monitoring_onoff': 0,
         'result_show_onoff': 0,
         'front_onoff': 0,
-        'window_bars_onoff' : 0}
+        'window_bars_onoff' : 0,
+        'serial_port': '',  # 비어 있으면 첫 번째 포트 (시뮬레이터: pty 경로)
+        'slave_id': 1,  # 명령을 보낼 장치 (RS-485 slave id, 프로토콜 화면에서 선택)
+        'console_max_lines': 2000,  # 프로토콜 화면 콘솔 최대 줄 수
+        'devices': [],  # 추가 장치 [{'port': 'COM4', 'slave_ids': [2, 3]}, ...]
+        'serial_backend': 'pyserial',  # 수신 방식 (pyserial: 수신 스레드, qserialport: readyRead)
+        'telemetry_onoff': 0,  # 온도/압력 주기 측정 (발향 명령과 같은 버스 사용)
+        'telemetry_interval_ms': 1000,  # 온도/압력 측정 주기
+        'capture_onoff': 0,  # 송수신 바이너리 기록 (./capture, python dsCapture.py 파일로 재생)
+        'link_monitor_onoff': 1,  # 통신 상태 확인, 끊기면 자동 재연결 (검사 진행 일시 정지)
+        'calibration_onoff': 0,  # 장치별 출력 보정 곡선으로 발향 출력/시간 변환 (dsCalibration.json)
+        'scent_intensity': 1.0,  # 발향 세기 (1.0: 보정 시점의 scent_power, scent_run_time 발향량)
+        'cleaning_adaptive_onoff': 0,  # 세정 중 압력이 기준값으로 돌아오면 세정 종료 (온도/압력 측정 필요)
+        'cleaning_min_time_ms': 1000,  # 적응형 세정 최소 시간 (최대: cleaning_run_time)
+        'ui_cache_onoff': 0,  # 미리 변환한 .ui 모듈 사용 (python dsUiCache.py, .ui가 바뀌면 QUiLoader)
+        'image_assets_onoff': 0,  # 최적화 이미지 사용 (python dsAssets.py, ui/images_opt/manifest.json)
+        'image_cache_kb': 65536,  # 버튼 이미지 캐시 한도 (QPixmapCache, KB)
+        'resource_bundle_onoff': 0}  # 이미지를 .rcc 묶음에서 읽기 (python dsResource.py, ui/rcc)
 
 dsAP = {
 	"APC": 0,
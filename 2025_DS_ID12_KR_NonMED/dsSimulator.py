@@ -0,0 +1,314 @@
+""" Scent Device Simulator (python dsSimulator.py: 하드웨어 없이 pty로 장치 흉내) """
+import os
+import sys
+import math
+import time
+import random
+import struct
+import argparse
+import threading
+
+import dsComm
+import dsCrc
+import dsFrame
+from dsSetting import dsParam
+
+# 레지스터 주소
+REG_COMMAND = 4200      # 발향/세정 명령 블록 (command, scent_no, scent_power, clean_power,
+                        # scent_period, clean_period, scent_delay, cleanup_delay)
+REG_PWM_FREQUENCY = 4212
+REG_TEMPERATURE = 4043  # 2 registers (float32)
+REG_PRESSURE = 4045     # 1 register
+
+# 명령 (register 4200)
+CMD_EMIT = 1
+CMD_CLEAN = 2
+CMD_STOP = 3
+CMD_EMIT_CLEAN = 4
+
+CLEAN_TAU_S = 0.5       # 세정 중 압력 감소 시정수
+
+# Modbus 예외 코드
+EXC_ILLEGAL_FUNCTION = 1
+EXC_ILLEGAL_ADDRESS = 2
+
+class ScentDeviceModel:
+    """
+    발향 장치 동작 모델: 발향 -> 발향 후 대기 -> 세정 -> 세정 후 대기 시간표를 만들고,
+    시간표에 따라 펌프 상태와 온도/압력 레지스터 값을 계산한다.
+    """
+    def __init__(self, slave_id=1, temperature=24.5, base_pressure=1000):
+        self.slave_id = slave_id
+        self.temperature = temperature
+        self.base_pressure = base_pressure
+        self.registers = {REG_PWM_FREQUENCY: 400}
+        for i in range(8):
+            self.registers[REG_COMMAND + i] = 0
+        self.schedule = []  # [(phase, start, end, power)]
+        self.emit_count = 0
+        self.clean_count = 0
+
+    def _makeSchedule(self, command, now):
+        r = self.registers
+        scent_power, clean_power = r[REG_COMMAND + 2], r[REG_COMMAND + 3]
+        scent_period, clean_period = r[REG_COMMAND + 4], r[REG_COMMAND + 5]
+        scent_delay, cleanup_delay = r[REG_COMMAND + 6] / 1000, r[REG_COMMAND + 7] / 1000
+        schedule = []
+        t = now
+        if command in (CMD_EMIT, CMD_EMIT_CLEAN):
+            schedule.append(('emit', t, t + scent_period, scent_power))
+            t += scent_period
+            schedule.append(('post_delay', t, t + scent_delay, 0))
+            t += scent_delay
+            self.emit_count += 1
+        if command in (CMD_CLEAN, CMD_EMIT_CLEAN):
+            schedule.append(('clean', t, t + clean_period, clean_power))
+            t += clean_period
+            schedule.append(('clean_post_delay', t, t + cleanup_delay, 0))
+            self.clean_count += 1
+        return schedule
+
+    def phase(self, now=None):
+        if now is None:
+            now = time.monotonic()
+        for name, start, end, power in self.schedule:
+            if start <= now < end:
+                return name, power
+        return 'idle', 0
+
+    def _phaseStart(self, name):
+        for phase, start, end, power in self.schedule:
+            if phase == name:
+                return start
+        return None
+
+    def pressure(self, now=None):
+        # 펌프 동작 중에는 출력(power)에 비례하여 압력 상승
+        # 세정 중에는 남은 향이 빠지면서 기준 압력으로 돌아옴 (CLEAN_TAU_S)
+        if now is None:
+            now = time.monotonic()
+        name, power = self.phase(now)
+        if name == 'clean':
+            return self.base_pressure + int(power * 5 * math.exp(-(now - self._phaseStart('clean')) / CLEAN_TAU_S))
+        return self.base_pressure + power * 5
+
+    def writeRegisters(self, address, values, now=None):
+        if now is None:
+            now = time.monotonic()
+        for i, value in enumerate(values):
+            self.registers[address + i] = value
+        if address == REG_COMMAND:
+            command = values[0]
+            if command == CMD_STOP:
+                self.schedule = []
+            else:
+                self.schedule = self._makeSchedule(command, now)
+
+    def readRegisters(self, address, qor, now=None):
+        """
+        :return: list of int (알 수 없는 주소이면 None)
+        """
+        values = {}
+        temperature = struct.unpack(">HH", struct.pack(">f", self.temperature))
+        values[REG_TEMPERATURE] = temperature[0]
+        values[REG_TEMPERATURE + 1] = temperature[1]
+        values[REG_PRESSURE] = self.pressure(now) & 0xFFFF
+        values.update(self.registers)
+        result = []
+        for reg in range(address, address + qor):
+            if reg not in values:
+                return None
+            result.append(values[reg])
+        return result
+
+    def handle(self, request, now=None):
+        """
+        요청 프레임을 처리하고 응답 프레임(CRC 포함)을 반환 (broadcast이거나 다른 장치면 None)
+        :return: bytes
+        """
+        mid, func = request[0], request[1]
+        if mid != self.slave_id:
+            if mid == 0 and func in (6, 16):
+                self._write(request, now)
+            return None
+        response = self._handle(request, now)
+        return response + dsCrc.crc16Bytes(response)
+
+    def _write(self, request, now):
+        parsed = dsComm.parseRequest(request)
+        self.writeRegisters(parsed['address'], parsed['values'], now)
+        return parsed
+
+    def _exception(self, func, code):
+        return bytes((self.slave_id, func | 0x80, code))
+
+    def _handle(self, request, now):
+        func = request[1]
+        if func in (3, 4):
+            parsed = dsComm.parseRequest(request)
+            values = self.readRegisters(parsed['address'], parsed['qor'], now)
+            if values is None:
+                return self._exception(func, EXC_ILLEGAL_ADDRESS)
+            return struct.pack(">BBB%dH" % len(values), self.slave_id, func, len(values) * 2, *values)
+        if func in (6, 16):
+            self._write(request, now)
+            # 6: 요청 그대로 응답, 16: id, func, address, qor
+            return bytes(request[:6])
+        return self._exception(func, EXC_ILLEGAL_FUNCTION)
+
+class SimulatedDevice(threading.Thread):
+    """
+    pty(또는 read/write를 가진 포트 객체)에 붙어 요청 프레임을 해석하고 응답한다.
+    지연(latency), 지터(jitter), CRC 오류, 바이트 누락, 무응답을 주입할 수 있다.
+    """
+    def __init__(self, fd=None, port=None, model=None, baudrate=9600,
+                 latency_ms=5.0, jitter_ms=0.0, crc_error_rate=0.0, drop_byte_rate=0.0,
+                 no_reply_rate=0.0, wire_time=True, seed=None, strict_baudrate=False, slave_fd=None):
+        threading.Thread.__init__(self, daemon=True)
+        self.fd = fd
+        # pty slave 쪽 fd (호스트가 포트를 닫아도 pty가 유지되도록 열어 둠, stop()에서 닫음)
+        self.slave_fd = slave_fd
+        self.port = port
+        self.model = model if model is not None else ScentDeviceModel()
+        self.baudrate = baudrate
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.crc_error_rate = crc_error_rate
+        self.drop_byte_rate = drop_byte_rate
+        self.no_reply_rate = no_reply_rate
+        self.wire_time = wire_time
+        # pty 설정 속도가 다르면 응답하지 않음 (포트 탐색 테스트)
+        self.strict_baudrate = strict_baudrate
+        self.random = random.Random(seed)
+        self.parser = dsFrame.RtuFrameParser(baudrate, request=True)
+        self.running = True
+        self.request_count = 0
+        self.response_count = 0
+        self.fault_count = 0
+
+    def stop(self, timeout=1.0):
+        # 스레드 종료를 기다린 뒤 pty fd 닫기
+        self.running = False
+        if self.is_alive() and threading.current_thread() is not self:
+            self.join(timeout)
+        for name in ('fd', 'slave_fd'):
+            fd = getattr(self, name)
+            if fd is not None:
+                setattr(self, name, None)
+                try:
+                    os.close(fd)
+                except OSError:
+                    pass
+
+    def _read(self):
+        if self.fd is not None:
+            import select
+            readable, _, _ = select.select([self.fd], [], [], 0.05)
+            if not readable:
+                return b''
+            try:
+                return os.read(self.fd, 256)
+            except OSError:
+                return b''
+        return self.port.read(max(1, self.port.in_waiting))
+
+    def _write(self, data):
+        if self.wire_time:
+            # 전송 시간 (문자당 11 bit)
+            time.sleep(len(data) * dsFrame.charTime(self.baudrate))
+        if self.fd is not None:
+            os.write(self.fd, data)
+        else:
+            self.port.write(data)
+
+    def _isHostBaudrate(self):
+        if not self.strict_baudrate or self.fd is None:
+            return True
+        import termios
+        # pty는 양쪽이 같은 termios 설정을 공유
+        return termios.tcgetattr(self.fd)[5] == getattr(termios, 'B%d' % self.baudrate, None)
+
+    def _inject(self, response):
+        rnd = self.random
+        if rnd.random() < self.no_reply_rate:
+            self.fault_count += 1
+            return None
+        response = bytearray(response)
+        if rnd.random() < self.crc_error_rate:
+            response[-1] ^= 0xFF
+            self.fault_count += 1
+        if self.drop_byte_rate > 0:
+            kept = bytearray(b for b in response if rnd.random() >= self.drop_byte_rate)
+            if len(kept) != len(response):
+                self.fault_count += 1
+            response = kept
+        return bytes(response)
+
+    def run(self):
+        while self.running:
+            data = self._read()
+            for request in self.parser.feed(data, time.monotonic()):
+                self.request_count += 1
+                response = self.model.handle(request)
+                if response is None or not self._isHostBaudrate():
+                    continue
+                delay = self.latency_ms + self.random.uniform(-self.jitter_ms, self.jitter_ms)
+                if delay > 0:
+                    time.sleep(delay / 1000)
+                response = self._inject(response)
+                if response:
+                    self._write(response)
+                    self.response_count += 1
+
+def openPty():
+    """
+    pty 쌍을 만들고 master fd, slave fd, slave 장치 경로를 반환 (Linux/macOS, fd는 사용 후 닫아야 함)
+    :return: (int, int, str)
+    """
+    import tty
+    master, slave = os.openpty()
+    tty.setraw(master)
+    tty.setraw(slave)
+    return master, slave, os.ttyname(slave)
+
+def startPtyDevice(**kwargs):
+    """
+    pty에 붙은 시뮬레이터를 시작 (앱/벤치마크는 반환된 경로에 연결)
+    :return: (SimulatedDevice, str)
+    """
+    master, slave, slave_name = openPty()
+    device = SimulatedDevice(fd=master, slave_fd=slave, **kwargs)
+    device.start()
+    return device, slave_name
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Digital Scent device simulator")
+    parser.add_argument('--id', type=int, default=1)
+    parser.add_argument('--baudrate', type=int, default=9600)
+    parser.add_argument('--latency', type=float, default=5.0, help="응답 지연 (ms)")
+    parser.add_argument('--jitter', type=float, default=0.0, help="응답 지연 편차 (ms)")
+    parser.add_argument('--crc-error', type=float, default=0.0, help="CRC 오류 비율 (0~1)")
+    parser.add_argument('--drop', type=float, default=0.0, help="바이트 누락 비율 (0~1)")
+    parser.add_argument('--no-reply', type=float, default=0.0, help="무응답 비율 (0~1)")
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args(argv)
+
+    device, slave_name = startPtyDevice(model=ScentDeviceModel(args.id), baudrate=args.baudrate,
+                                        latency_ms=args.latency, jitter_ms=args.jitter,
+                                        crc_error_rate=args.crc_error, drop_byte_rate=args.drop,
+                                        no_reply_rate=args.no_reply, seed=args.seed)
+    print("Simulator port:", slave_name)
+    print("settings 파일의 serial_port에 위 경로를 지정하면 ScentSmart가 시뮬레이터에 연결됩니다.")
+    print("default timing: scent %ds, cleaning %ds" % (dsParam['scent_run_time'], dsParam['cleaning_run_time']))
+    try:
+        while True:
+            time.sleep(5)
+            print("requests:%d responses:%d faults:%d emit:%d clean:%d phase:%s" % (
+                device.request_count, device.response_count, device.fault_count,
+                device.model.emit_count, device.model.clean_count, device.model.phase()[0]))
+    except KeyboardInterrupt:
+        device.stop()
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,5 +1,9 @@
 '''' Guide sound '''
-import winsound
+try:
+    import winsound
+except ImportError:
+    # Windows 이외 환경 (시뮬레이터 테스트 등)에서는 안내 음성 없이 동작
+    winsound = None
 from dsSetting import dsParam
 
 guideSound = {
@@ -95,6 +99,8 @@ trainIDSound = {
 }
 
 def playGuideSound(sound_name):
+    if winsound is None:
+        return False
     winsound.PlaySound(None, winsound.SND_PURGE)
     if dsParam['voice_onoff'] == 1 and guideSound[sound_name] != '':
         winsound.PlaySound(guideSound[sound_name], winsound.SND_ASYNC)
@@ -103,6 +109,8 @@ def playGuideSound(sound_name):
         return False
     
 def playTrainIDSound(sound_name):
+    if winsound is None:
+        return False
     winsound.PlaySound(None, winsound.SND_PURGE)
     if dsParam['voice_onoff'] == 1 and trainIDSound[sound_name] != '':
         winsound.PlaySound(trainIDSound[sound_name], winsound.SND_ASYNC)
@@ -0,0 +1,196 @@
+""" Telemetry (온도/압력 주기 측정, 분 단위 저장, 검사별 요약) """
+import time
+from array import array
+from datetime import datetime
+
+from PySide6.QtCore import QObject, QTimer
+from PySide6.QtCore import Signal # Slot
+
+import dsTestDB
+
+INTERVAL_MS = 1000      # 측정 주기 기본값
+RING_SIZE = 3600        # 원본 샘플 보관 개수 (1초 주기 1시간)
+BUCKET_S = 60           # 저장 단위 (1분)
+FIELDS = ('temperature', 'pressure')
+
+class TelemetryRing:
+    """
+    원본 샘플 링 버퍼 (고정 크기 array, 잠금 없음)
+    쓰는 쪽은 하나(GUI 스레드의 응답 콜백)이고 값을 먼저 쓴 뒤 count를 올리므로
+    읽는 쪽은 count까지의 샘플을 항상 완성된 값으로 본다.
+    """
+    def __init__(self, size=RING_SIZE):
+        self.size = size
+        self.times = array('d', [0.0]) * size
+        self.temperatures = array('d', [0.0]) * size
+        self.pressures = array('d', [0.0]) * size
+        self.count = 0
+
+    def __len__(self):
+        return min(self.count, self.size)
+
+    def append(self, stamp, temperature, pressure):
+        index = self.count % self.size
+        self.times[index] = stamp
+        self.temperatures[index] = temperature
+        self.pressures[index] = pressure
+        self.count += 1
+
+    def latest(self, n=None):
+        """
+        최근 n개 샘플 (오래된 것부터)
+        :return: list of (time, temperature, pressure)
+        """
+        count = self.count
+        available = min(count, self.size)
+        n = available if n is None else min(n, available)
+        samples = []
+        for i in range(count - n, count):
+            index = i % self.size
+            samples.append((self.times[index], self.temperatures[index], self.pressures[index]))
+        return samples
+
+    def clear(self):
+        self.count = 0
+
+def makeBucket(start):
+    # 분/검사 단위 집계 (min, 합계, max)
+    bucket = {'start': start, 'end': start, 'count': 0}
+    for field in FIELDS:
+        bucket[field + '_min'] = None
+        bucket[field + '_sum'] = 0.0
+        bucket[field + '_max'] = None
+    return bucket
+
+def addSample(bucket, stamp, values):
+    bucket['end'] = stamp
+    bucket['count'] += 1
+    for field in FIELDS:
+        value = values[field]
+        if bucket[field + '_min'] is None or value < bucket[field + '_min']:
+            bucket[field + '_min'] = value
+        if bucket[field + '_max'] is None or value > bucket[field + '_max']:
+            bucket[field + '_max'] = value
+        bucket[field + '_sum'] += value
+
+def bucketSummary(bucket):
+    """
+    집계 -> min/mean/max
+    :return: dict 또는 None (샘플 없음)
+    """
+    if bucket is None or bucket['count'] == 0:
+        return None
+    summary = {'start': datetime.fromtimestamp(bucket['start']).strftime('%Y-%m-%d %H:%M:%S'),
+               'end': datetime.fromtimestamp(bucket['end']).strftime('%Y-%m-%d %H:%M:%S'),
+               'count': bucket['count']}
+    for field in FIELDS:
+        summary[field + '_min'] = bucket[field + '_min']
+        summary[field + '_mean'] = bucket[field + '_sum'] / bucket['count']
+        summary[field + '_max'] = bucket[field + '_max']
+    return summary
+
+class TelemetrySampler(QObject):
+    """
+    온도/압력을 주기적으로 읽어 링 버퍼에 쌓고, 1분마다 min/mean/max를 SQLite에 저장한다.
+    명령 큐에 대기/전송 중인 명령이 있으면 그 주기는 건너뛴다.
+    이미 전송한 읽기 뒤의 발향 명령은 응답(또는 timeout 1번)까지 대기하므로 읽기는 재시도하지 않는다.
+    """
+    sampled = Signal(float, float, float, name="sampled")   # time, temperature, pressure
+
+    def __init__(self, register_client, connection, interval_ms=INTERVAL_MS, parent=None,
+                 store=True, bucket_s=BUCKET_S):
+        QObject.__init__(self, parent)
+        self.register_client = register_client
+        self.connection = connection
+        self.ring = TelemetryRing()
+        self.store = store
+        self.bucket_s = bucket_s
+        self.bucket = None
+        self.sessions = {}      # 검사 이름 -> 집계
+        self.session_name = None
+        self.pending = False
+        self.sample_count = 0
+        self.skip_count = 0
+        self.timer = QTimer(self)
+        self.timer.setInterval(interval_ms)
+        self.timer.timeout.connect(self._onTimer)
+
+    def start(self, interval_ms=None):
+        if interval_ms is not None:
+            self.timer.setInterval(interval_ms)
+        self.timer.start()
+
+    def stop(self):
+        self.timer.stop()
+        self.flushBucket()
+
+    def isBusy(self):
+        # 발향/세정 명령이 큐에 있거나 응답 대기 중
+        client = self.connection.client
+        return self.pending or bool(client.queue) or bool(client.in_flight)
+
+    def _onTimer(self):
+        if not self.connection.isOpen():
+            return
+        if self.isBusy():
+            self.skip_count += 1
+            return
+        self.pending = True
+        # 재시도 없음 (응답이 없으면 다음 주기에 다시 읽음, 버스 점유는 timeout 1번까지)
+        self.register_client.read(FIELDS, callback=self._onValues, retries=0)
+
+    def _onValues(self, values):
+        self.pending = False
+        if any(field not in values for field in FIELDS):
+            # 응답 없음 (timeout 등)
+            return
+        stamp = time.time()
+        self.ring.append(stamp, values['temperature'], values['pressure'])
+        self.sample_count += 1
+        # 분 단위 집계
+        minute = int(stamp // self.bucket_s) * self.bucket_s
+        if self.bucket is not None and self.bucket['start'] != minute:
+            self.flushBucket()
+        if self.bucket is None:
+            self.bucket = makeBucket(minute)
+        addSample(self.bucket, stamp, values)
+        # 검사별 집계
+        if self.session_name is not None:
+            addSample(self.sessions[self.session_name], stamp, values)
+        self.sampled.emit(stamp, values['temperature'], values['pressure'])
+
+    def flushBucket(self):
+        summary = bucketSummary(self.bucket)
+        self.bucket = None
+        if summary is None or not self.store:
+            return
+        dsTestDB.insertTableTelemetry(summary)
+
+    def startSession(self, name):
+        # 검사 시작 (같은 이름으로 다시 시작하면 새로 집계)
+        self.session_name = name
+        self.sessions[name] = makeBucket(time.time())
+
+    def endSession(self):
+        self.session_name = None
+
+    def sessionSummaries(self):
+        """
+        검사별 온도/압력 요약
+        :return: dict (검사 이름 -> summary)
+        """
+        summaries = {}
+        for name, bucket in self.sessions.items():
+            summary = bucketSummary(bucket)
+            if summary is not None:
+                summaries[name] = summary
+        return summaries
+
+    def clearSessions(self):
+        self.sessions.clear()
+        self.session_name = None
+
+    def stats(self):
+        return {'samples': self.sample_count,
+                'skipped': self.skip_count,
+                'buffered': len(self.ring)}
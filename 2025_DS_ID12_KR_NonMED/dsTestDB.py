@@ -165,6 +165,47 @@ def insertTableTestID(text_name, text_birth_date, text_gender,\
     # con.close()
 
 
+# 온도/압력 분 단위 기록 (dsTelemetry)
+def createTableTelemetry():
+    con = sqlite3.connect(DS_TEST_DB)
+    cur = con.cursor()
+    query = "create table if not exists DS_TELEMETRY(\
+        MINUTE datetime primary key,\
+        SAMPLE_COUNT int,\
+        TEMPERATURE_MIN real,\
+        TEMPERATURE_MEAN real,\
+        TEMPERATURE_MAX real,\
+        PRESSURE_MIN real,\
+        PRESSURE_MEAN real,\
+        PRESSURE_MAX real)"
+    cur.execute(query)
+    con.commit()
+    con.close()
+
+def insertTableTelemetry(summary):
+    con = sqlite3.connect(DS_TEST_DB)
+    cur = con.cursor()
+    data = (summary['start'], summary['count'],
+            summary['temperature_min'], summary['temperature_mean'], summary['temperature_max'],
+            summary['pressure_min'], summary['pressure_mean'], summary['pressure_max'])
+    query = "insert or replace into DS_TELEMETRY values(?, ?, ?, ?, ?, ?, ?, ?)"
+    cur.execute(query, data)
+    con.commit()
+    con.close()
+
+def selectTableTelemetry(text_from="", text_to=""):
+    datas = [('minute', 'sample_count', 'temperature_min', 'temperature_mean', 'temperature_max',
+              'pressure_min', 'pressure_mean', 'pressure_max')]
+    con = sqlite3.connect(DS_TEST_DB)
+    cur = con.cursor()
+    query = "select * from DS_TELEMETRY where MINUTE >= ? and (? = '' or MINUTE <= ?) order by MINUTE"
+    cur.execute(query, (text_from, text_to, text_to))
+    data = cur.fetchall()
+    for row in data:
+        datas.append(row)
+    con.commit()
+    con.close()
+    return datas
 
 
 if __name__ == "__main__":
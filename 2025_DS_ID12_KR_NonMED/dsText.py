@@ -5,6 +5,26 @@ serialText = {
     'status_disconnect': 'Disconnect',
 }
 
+telemetryText = {
+    'temperature': '온도',
+    'pressure': '압력',
+    'session': '검사',
+    'start': '시작',
+    'end': '종료',
+    'count': '측정 수',
+    'min': '최소',
+    'mean': '평균',
+    'max': '최대',
+}
+# dsText.telemetryText['temperature']
+
+calibrationText = {
+    'button': '출력 보정',
+    'running': '보정 중 %d/%d',
+    'done': '보정 완료',
+    'failed': '보정 실패',
+}
+
 processText = {
     'cleaning': '코를 띄어주세요. 세정 중입니다.',
     'question_number': '문항',
@@ -74,6 +94,7 @@ reportText = {
     'report_sheet_threshold': 'Threshold',
     'report_sheet_discrimination': 'Discrimination',
     'report_sheet_identification': 'Identification',
+    'report_sheet_telemetry': 'Telemetry',
 
     'report_title': '디지털 후각 검사 결과지 (Digital Olfactory Test Report)',
     'report_reg_num': '등록번호',
@@ -0,0 +1,185 @@
+""" UI Cache (.ui -> Python 모듈 미리 변환, 내용 hash로 갱신 확인) """
+import os
+import sys
+import glob
+import json
+import time
+import shutil
+import hashlib
+import argparse
+import subprocess
+import importlib.util
+import xml.etree.ElementTree as ElementTree
+
+import PySide6
+from PySide6 import QtWidgets
+
+UI_DIR = "./ui"
+CACHE_DIR = "./ui/__uicache__"
+HASH_LENGTH = 16
+
+# .ui 파일의 승격 위젯 header -> 실제 모듈
+HEADER_MODULES = {'scentChartWidgetFile': 'dsUiChartWidget',
+                  'ui_custom': 'dsUiCustom'}
+
+_modules = {}   # 캐시 파일 경로 -> (Ui 클래스, 최상위 위젯 클래스)
+
+def uiHash(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()[:HASH_LENGTH]
+
+def cachePath(path, digest=None, cache_dir=CACHE_DIR):
+    # 예: ./ui/__uicache__/ui_main_0123456789abcdef.py
+    if digest is None:
+        digest = uiHash(path)
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(cache_dir, "%s_%s.py" % (stem, digest))
+
+def uicCommand():
+    """
+    PySide6 uic 실행 명령 (PySide6 설치 경로의 uic, 없으면 pyside6-uic)
+    :return: list
+    """
+    pyside_dir = os.path.dirname(PySide6.__file__)
+    if sys.platform == "win32":
+        exe = os.path.join(pyside_dir, "uic.exe")
+    else:
+        exe = os.path.join(pyside_dir, "Qt", "libexec", "uic")
+    if os.path.isfile(exe):
+        return [exe, '-g', 'python']
+    exe = shutil.which("pyside6-uic")
+    if exe is None:
+        raise RuntimeError("uic not found (PySide6)")
+    return [exe]
+
+def compileUi(path, cache_dir=CACHE_DIR):
+    """
+    .ui -> Python 모듈 (같은 .ui의 이전 hash 파일은 삭제)
+    :return: str (생성한 파일 경로)
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    target = cachePath(path, cache_dir=cache_dir)
+    source = subprocess.run(uicCommand() + [path], check=True, capture_output=True).stdout.decode('utf-8')
+    for header, module in HEADER_MODULES.items():
+        source = source.replace("from %s import" % header, "from %s import" % module)
+    with open(target, 'w', encoding='utf-8') as f:
+        f.write(source)
+    stem = os.path.splitext(os.path.basename(path))[0]
+    for old in glob.glob(os.path.join(cache_dir, "%s_*.py" % stem)):
+        if old != target and len(os.path.basename(old)) == len(stem) + HASH_LENGTH + 4:
+            os.remove(old)
+    return target
+
+def buildCache(ui_dir=UI_DIR, cache_dir=CACHE_DIR, force=False):
+    """
+    빌드 단계: 변경된 .ui만 다시 변환
+    :return: (변환한 수, 최신 수)
+    """
+    built = 0
+    fresh = 0
+    for path in sorted(glob.glob(os.path.join(ui_dir, "*.ui"))):
+        if not force and os.path.isfile(cachePath(path, cache_dir=cache_dir)):
+            fresh += 1
+            continue
+        print("uic:", path)
+        compileUi(path, cache_dir)
+        built += 1
+    return built, fresh
+
+def _rootClass(path):
+    # 최상위 위젯 클래스 (QMainWindow, QDialog, QWidget)
+    return ElementTree.parse(path).getroot().find('widget').get('class')
+
+def _import(path, target):
+    item = _modules.get(target)
+    if item is None:
+        name = os.path.splitext(os.path.basename(target))[0]
+        spec = importlib.util.spec_from_file_location("uicache_" + name, target)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        ui_class = [value for key, value in vars(module).items() if key.startswith('Ui_')][0]
+        item = (ui_class, getattr(QtWidgets, _rootClass(path)))
+        _modules[target] = item
+    return item
+
+def load(path, parent=None, cache_dir=CACHE_DIR):
+    """
+    변환된 모듈로 위젯 생성 (QUiLoader.load와 같이 하위 위젯을 속성으로 사용)
+    캐시가 없거나 .ui 내용이 바뀌었으면 None (QUiLoader 사용)
+    :return: QWidget 또는 None
+    """
+    target = cachePath(path, cache_dir=cache_dir)
+    if not os.path.isfile(target):
+        return None
+    try:
+        ui_class, widget_class = _import(path, target)
+    except Exception as err:
+        print("dsUiCache load:", target, err)
+        return None
+    widget = widget_class(parent)
+    ui = ui_class()
+    ui.setupUi(widget)
+    for name, child in vars(ui).items():
+        setattr(widget, name, child)
+    return widget
+
+def benchLoad(mode, paths, cache_dir=CACHE_DIR, repeat=1):
+    """
+    로딩 방식(uiloader/cache)별 .ui 로딩 시간 (파일별 최소값, ms)
+    이미지 캐시 등이 공유되지 않도록 방식마다 별도 프로세스에서 실행한다.
+    :return: dict (path -> ms)
+    """
+    from PySide6.QtUiTools import QUiLoader
+    from dsUiChartWidget import scentLineChartWidget, scentPieChartWidget, scentSparklineWidget
+    from dsUiCustom import scentSlider
+    loader = QUiLoader()
+    for widget_class in (scentLineChartWidget, scentPieChartWidget, scentSlider, scentSparklineWidget):
+        loader.registerCustomWidget(widget_class)
+    results = {}
+    for path in paths:
+        times = []
+        for i in range(repeat):
+            start = time.perf_counter()
+            widget = loader.load(path) if mode == 'uiloader' else load(path, cache_dir=cache_dir)
+            times.append((time.perf_counter() - start) * 1000)
+            if widget is None:
+                break
+            widget.deleteLater()
+        results[path] = min(times)
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=".ui -> Python 모듈 변환 (빌드 단계)")
+    parser.add_argument('--force', action='store_true', help="모두 다시 변환")
+    parser.add_argument('--bench', action='store_true', help="QUiLoader/캐시 로딩 시간 비교")
+    parser.add_argument('--bench-mode', choices=('uiloader', 'cache'), help=argparse.SUPPRESS)
+    parser.add_argument('--repeat', type=int, default=1, help="비교 반복 횟수 (1: 처음 로딩, 파일별 최소값)")
+    parser.add_argument('paths', nargs='*', help="비교할 .ui 파일 (기본: 전체)")
+    args = parser.parse_args(argv)
+    paths = args.paths or sorted(glob.glob(os.path.join(UI_DIR, "*.ui")))
+    if args.bench_mode is not None:
+        app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv)
+        print(json.dumps(benchLoad(args.bench_mode, paths, repeat=args.repeat)))
+        sys.stdout.flush()
+        os._exit(0)
+    built, fresh = buildCache(force=args.force)
+    print("built %d, up to date %d (%s)" % (built, fresh, CACHE_DIR))
+    if args.bench:
+        results = {}
+        for mode in ('uiloader', 'cache'):
+            output = subprocess.run([sys.executable, __file__, '--bench-mode', mode, '--repeat', str(args.repeat)] + paths,
+                                    capture_output=True).stdout.decode('utf-8')
+            lines = output.strip().splitlines()
+            if not lines or not lines[-1].startswith('{'):
+                print("bench %s: no result (process failed)" % mode)
+                return 1
+            results[mode] = json.loads(lines[-1])
+        for path in results['uiloader']:
+            print("  %-48s uiloader %7.1f ms  cache %7.1f ms" % (
+                os.path.basename(path), results['uiloader'][path], results['cache'][path]))
+        print("total: uiloader %.1f ms, cache %.1f ms" % (
+            sum(results['uiloader'].values()), sum(results['cache'].values())))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,5 @@
-from PySide6.QtCore import Qt
-from PySide6.QtGui import QColor, QPainter #, QPalette, QImage
+from PySide6.QtCore import Qt, QPointF
+from PySide6.QtGui import QColor, QPainter, QPen, QPolygonF #, QPalette, QImage
 from PySide6.QtWidgets import (QWidget, QSizePolicy, QHBoxLayout)
 from PySide6.QtCharts import (QChart, QChartView,
                               QLineSeries, QPieSeries, 
@@ -227,4 +227,50 @@ class scentLineChartWidget(QWidget):
         axis_y.setMax(10)
         # # axis_y.setRange(0, 12)
         axis_y.setLabelFormat("%d")
-        # axis_y.setTickCount(10)
\ No newline at end of file
+        # axis_y.setTickCount(10)
+
+# 스파크라인 위젯 (온도/압력 실시간 추이, 차트보다 가볍게 QPainter로 직접 그림)
+class scentSparklineWidget(QWidget):
+    def __init__(self, parent = None, max_points = 120):
+        QWidget.__init__(self, parent)
+        self.max_points = max_points
+        self.series = [] # (이름, 색, 값 목록, 표시 형식)
+
+    def setSeries(self, series):
+        self.series = series
+        self.update()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.fillRect(self.rect(), QColor("white"))
+        if not self.series:
+            return
+        # 시리즈마다 높이를 나누어 그림 (자체 최소/최대 기준)
+        row_height = self.height() / len(self.series)
+        width = self.width()
+        text_height = self.fontMetrics().height()
+        for row, (name, color, values, form) in enumerate(self.series):
+            top = row * row_height
+            values = values[-self.max_points:]
+            painter.setPen(QColor("gray"))
+            painter.drawText(4, int(top + text_height), name)
+            if not values:
+                continue
+            painter.drawText(int(width - 80), int(top + text_height), form % values[-1])
+            # 그래프 영역 (이름 아래)
+            graph_top = top + text_height + 4
+            graph_height = row_height - text_height - 8
+            low = min(values)
+            high = max(values)
+            step = width / max(1, self.max_points - 1)
+            x0 = width - step * (len(values) - 1)
+            polygon = QPolygonF()
+            for i, value in enumerate(values):
+                if high > low:
+                    y = graph_top + graph_height - (value - low) / (high - low) * graph_height
+                else:
+                    y = graph_top + graph_height / 2 # 변화 없음
+                polygon.append(QPointF(x0 + step * i, y))
+            painter.setPen(QPen(QColor(color), 2))
+            painter.drawPolyline(polygon)
@@ -0,0 +1,158 @@
+""" Dialog Registry (다이얼로그 지연 로딩, 유휴 시간 미리 로딩, 로딩 시간 측정) """
+import os
+import json
+import time
+
+from PySide6.QtCore import QObject, QTimer, QBuffer, QByteArray, QIODevice
+from PySide6.QtUiTools import QUiLoader
+
+import dsImage
+import dsMetrics
+import dsUiCache
+
+PREFETCH_DELAY_MS = 300     # 메인 화면 표시 후 미리 로딩 시작까지 대기
+PREFETCH_GAP_MS = 30        # 미리 로딩 그룹 사이 대기 (사용자 입력 처리)
+
+# 로딩 이유
+LOAD_STARTUP = 'startup'
+LOAD_DEMAND = 'demand'      # 처음 사용할 때
+LOAD_PREFETCH = 'prefetch'  # 유휴 시간
+
+class TimedUiLoader(QUiLoader):
+    """
+    .ui 파일별 로딩 시간 기록 (ms)
+    use_cache: 미리 변환한 모듈(dsUiCache) 사용, 없거나 .ui가 바뀌었으면 QUiLoader
+    """
+    def __init__(self, parent=None, use_cache=False):
+        QUiLoader.__init__(self, parent)
+        self.use_cache = use_cache
+        self.timings = {}
+        self.sources = {}       # .ui 파일 -> 'cache' 또는 'uiloader'
+
+    def load(self, path, parent=None):
+        start = time.perf_counter()
+        # 변환된 모듈에는 원본 이미지 경로가 들어 있으므로 최적화 이미지 사용 시에는 QUiLoader
+        widget = dsUiCache.load(path, parent) if self.use_cache and not dsImage.isActive() else None
+        if widget is not None:
+            self.sources[path] = 'cache'
+        else:
+            device = self._device(path)
+            if parent is None:
+                widget = QUiLoader.load(self, device)
+            else:
+                widget = QUiLoader.load(self, device, parent)
+            self.sources[path] = 'uiloader'
+        self.timings[path] = (time.perf_counter() - start) * 1000
+        return widget
+
+    def _device(self, path):
+        # 최적화 이미지 사용 시 스타일시트의 이미지 경로를 바꾼 .ui 내용 (dsImage manifest)
+        if not dsImage.isActive():
+            return path
+        with open(path, encoding='utf-8') as f:
+            text = dsImage.resolveStyleSheet(f.read())
+        buffer = QBuffer()
+        buffer.setData(QByteArray(text.encode('utf-8')))
+        buffer.open(QIODevice.OpenModeFlag.ReadOnly)
+        return buffer
+
+class DialogRegistry(QObject):
+    """
+    다이얼로그 그룹(uiDlg* 로딩 함수 1개)을 이름으로 등록해 두고 처음 사용할 때 로딩한다.
+    위젯은 GUI 스레드에서만 만들 수 있으므로 미리 로딩도 GUI 스레드에서 유휴 시간에 그룹 1개씩 진행한다.
+    """
+    def __init__(self, loader, parent=None):
+        QObject.__init__(self, parent)
+        self.loader = loader
+        self.groups = {}        # 그룹 -> (로딩 함수, 속성 이름 목록)
+        self.owners = {}        # 속성 이름 -> 그룹
+        self.loaded = {}        # 그룹 -> {'reason', 'ms', 'files', 'sources'}
+        self.loading = set()
+        self.prefetch_queue = []
+        self.startup_ms = None
+        self.prefetch_timer = QTimer(self)
+        self.prefetch_timer.setSingleShot(True)
+        self.prefetch_timer.timeout.connect(self._prefetchNext)
+
+    def register(self, group, load_func, names):
+        self.groups[group] = (load_func, tuple(names))
+        for name in names:
+            self.owners[name] = group
+
+    def isLoaded(self, name):
+        # 속성 이름 기준
+        return self.owners.get(name) in self.loaded
+
+    def load(self, group, reason=LOAD_DEMAND):
+        """
+        그룹 로딩 (이미 로딩했으면 아무것도 하지 않음)
+        :return: bool (이번에 로딩함)
+        """
+        if group in self.loaded or group in self.loading:
+            return False
+        load_func, names = self.groups[group]
+        self.loading.add(group)
+        before = set(self.loader.timings)
+        start = time.perf_counter()
+        try:
+            load_func(self.loader)
+        finally:
+            self.loading.discard(group)
+        ms = (time.perf_counter() - start) * 1000
+        files = {path: self.loader.timings[path] for path in self.loader.timings if path not in before}
+        sources = {path: self.loader.sources[path] for path in files}
+        self.loaded[group] = {'reason': reason, 'ms': ms, 'files': files, 'sources': sources}
+        print("DialogRegistry: %s %s %.1f ms" % (group, reason, ms))
+        return True
+
+    def loadFor(self, name):
+        """
+        속성 이름으로 그룹 로딩 (UiDlg.__getattr__에서 호출)
+        :return: bool (로딩 후 속성 사용 가능)
+        """
+        group = self.owners.get(name)
+        if group is None or group in self.loading:
+            return False
+        self.load(group, LOAD_DEMAND)
+        return True
+
+    def prefetch(self, groups, delay_ms=PREFETCH_DELAY_MS):
+        # 다음에 쓸 가능성이 높은 순서로 (이미 로딩한 그룹은 건너뜀)
+        self.prefetch_queue = [group for group in groups if group not in self.loaded]
+        if self.prefetch_queue:
+            self.prefetch_timer.start(delay_ms)
+
+    def _prefetchNext(self):
+        while self.prefetch_queue:
+            group = self.prefetch_queue.pop(0)
+            if self.load(group, LOAD_PREFETCH):
+                break
+        if self.prefetch_queue:
+            self.prefetch_timer.start(PREFETCH_GAP_MS)
+        else:
+            self.printReport()
+
+    def report(self):
+        """
+        그룹별 로딩 시간 (로딩한 순서)
+        :return: dict
+        """
+        return {'startup_ms': self.startup_ms,
+                'groups': self.loaded,
+                'pending': [group for group in self.groups if group not in self.loaded]}
+
+    def printReport(self):
+        if self.startup_ms is not None:
+            print("DialogRegistry startup: %.1f ms" % self.startup_ms)
+        for group, item in self.loaded.items():
+            print("  %-20s %-8s %7.1f ms" % (group, item['reason'], item['ms']))
+            for path, ms in item['files'].items():
+                print("    %-48s %7.1f ms  %s" % (os.path.basename(path), ms, item['sources'][path]))
+
+    def export(self, directory=dsMetrics.METRICS_DIR):
+        # 측정 세션과 같은 이름으로 저장 (ui_load_xxx.json)
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, "ui_load_%s.json" % dsMetrics.metrics.session)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.report(), f, ensure_ascii=False, indent='\t')
+        return path
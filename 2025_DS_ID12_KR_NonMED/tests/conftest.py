@@ -0,0 +1,5 @@
+""" pytest 설정 (ds*.py 모듈을 tests 밖에서 import) """
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
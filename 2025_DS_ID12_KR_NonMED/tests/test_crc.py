@@ -0,0 +1,71 @@
+""" dsCrc 골든 벡터, memoryview 입력, 이어서 계산, 기존 crc16_modbus와 비교 """
+import random
+
+import pytest
+
+import dsComm
+import dsCrc
+
+def crcBytes(value):
+    return bytes((value & 0xFF, value >> 8))
+
+@pytest.mark.parametrize('data, expected', dsCrc.CRC16_VECTORS)
+def test_golden_vectors(data, expected):
+    assert dsCrc.crc16(data) == expected
+    assert dsCrc.crc16Bytes(data) == crcBytes(expected)
+
+@pytest.mark.parametrize('func', [dsCrc.crc16, dsCrc._crc16Table], ids=['selected', 'table'])
+@pytest.mark.parametrize('data, expected', dsCrc.CRC16_VECTORS)
+def test_backends(func, data, expected):
+    assert func(data) == expected
+
+@pytest.mark.parametrize('data, expected', dsCrc.CRC16_VECTORS)
+def test_memoryview(data, expected):
+    assert dsCrc.crc16(memoryview(data)) == expected
+    assert dsCrc.crc16(memoryview(bytearray(data))) == expected
+    # 홀수 시작 위치의 slice (복사 없이 검사)
+    buf = bytearray(b'\x00' + data)
+    assert dsCrc.crc16(memoryview(buf)[1:]) == expected
+
+@pytest.mark.parametrize('data, expected', [x for x in dsCrc.CRC16_VECTORS if x[0]])
+def test_check_frame(data, expected):
+    frame = data + crcBytes(expected)
+    assert dsCrc.checkFrame(frame)
+    assert dsCrc.checkFrame(memoryview(bytearray(frame)))
+    broken = bytearray(frame)
+    broken[0] ^= 0x01
+    assert not dsCrc.checkFrame(broken)
+
+def test_check_frame_short():
+    assert not dsCrc.checkFrame(b'')
+    assert not dsCrc.checkFrame(b'\xff\xff')
+
+def test_pack_crc_into():
+    buf = bytearray(11)
+    buf[:9] = b'123456789'
+    assert dsCrc.packCrcInto(buf, 9) == 11
+    assert bytes(buf[9:]) == crcBytes(0x4B37)
+
+@pytest.mark.parametrize('step', [1, 2, 3, 5])
+@pytest.mark.parametrize('data, expected', dsCrc.CRC16_VECTORS)
+def test_incremental(data, expected, step):
+    crc = dsCrc.Crc16()
+    for i in range(0, len(data), step):
+        crc.update(data[i:i + step])
+    assert crc.value == expected
+    assert crc.digest() == crcBytes(expected)
+    crc.reset()
+    assert crc.value == dsCrc.CRC16_INIT
+
+def test_incremental_function():
+    assert dsCrc.crc16(b'56789', dsCrc.crc16(b'1234')) == 0x4B37
+
+def test_legacy_crc16_modbus():
+    rnd = random.Random(1)
+    for size in list(range(0, 40)) + [255, 256]:
+        data = bytes(rnd.getrandbits(8) for i in range(size))
+        assert dsComm.crc16_modbus(0xFFFF, data, len(data)) == dsCrc.crc16Bytes(data)
+
+def test_legacy_len_argument():
+    # 기존 함수는 len 인자까지만 계산
+    assert dsComm.crc16_modbus(0xFFFF, b'123456789xyz', 9) == crcBytes(0x4B37)
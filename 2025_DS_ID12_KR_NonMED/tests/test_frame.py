@@ -0,0 +1,57 @@
+""" dsComm 송신 프레임 구성 (FrameBuilder, 기존 sendMsg* 함수와 비교, 요청 해석) """
+import pytest
+
+import dsBench
+import dsComm
+import dsCrc
+
+# requestScentNo 기본 설정값 (발향/세정, scent 10, power 40/80, period 3/4, delay 500/500)
+EMIT_CLEAN_FRAME = bytes.fromhex('01 10 1068 0008 10 0004 000a 0028 0050 0003 0004 01f4 01f4')
+
+def test_emit_clean_golden():
+    frame = bytes(dsComm.FrameBuilder().emitClean(*dsBench.BENCH_EMIT_CLEAN))
+    assert frame[:-2] == EMIT_CLEAN_FRAME
+    assert dsCrc.checkFrame(frame)
+
+def test_emit_clean_legacy():
+    args = dsBench.BENCH_EMIT_CLEAN
+    expected = dsBench._sendMsgForEmitCleanLegacy(*args)
+    assert bytes(dsComm.FrameBuilder().emitClean(*args)) == expected
+    assert dsComm.sendMsgForEmitClean(*args) == expected
+
+@pytest.mark.parametrize('args', [(1, 6, 4212, 400), (2, 6, 4200, 3), (247, 6, 0, 0xFFFF)])
+def test_write_single_register(args):
+    frame = bytes(dsComm.FrameBuilder().writeSingleRegister(*args))
+    assert len(frame) == 8
+    assert dsCrc.checkFrame(frame)
+    assert frame == dsComm.sendMsgWriteSingleRegister(*args)
+    request = dsComm.parseRequest(frame)
+    assert (request['id'], request['func'], request['address'], request['values']) == \
+        (args[0], args[1], args[2], (args[3],))
+
+@pytest.mark.parametrize('args', [(1, 4, 4043, 3), (1, 3, 4212, 1), (5, 4, 4045, 1)])
+def test_read_register(args):
+    frame = bytes(dsComm.FrameBuilder().readRegister(*args))
+    assert len(frame) == 8
+    assert dsCrc.checkFrame(frame)
+    assert frame == dsComm.sendMsgReadRegister(*args)
+    request = dsComm.parseRequest(frame)
+    assert (request['id'], request['func'], request['address'], request['qor']) == args
+
+@pytest.mark.parametrize('values', [[1], [1, 10, 40, 80, 3, 4, 500, 500], list(range(123))])
+def test_write_multiple_registers(values):
+    frame = bytes(dsComm.FrameBuilder().writeMultipleRegisters(1, 16, 4200, values))
+    assert len(frame) == 9 + len(values) * 2
+    assert dsCrc.checkFrame(frame)
+    request = dsComm.parseRequest(frame)
+    assert request['qor'] == len(values)
+    assert list(request['values']) == values
+
+def test_builder_reuses_buffer():
+    # 반환된 memoryview는 다음 호출 전까지만 유효 (bytes로 복사해서 보관)
+    builder = dsComm.FrameBuilder()
+    first = builder.readRegister(1, 4, 4043, 3)
+    kept = bytes(first)
+    builder.readRegister(2, 4, 4045, 1)
+    assert first[0] == 2
+    assert kept[0] == 1
@@ -0,0 +1,70 @@
+""" 수신 경로 fuzzing (seed 고정, 재현 가능): 임의 바이트/잘린 프레임/비트 오류/잡음 """
+import random
+
+import pytest
+
+import dsBench
+import dsCrc
+import dsFrame
+
+SEEDS = [1, 2, 3, 4, 5]
+ITERATIONS = 200
+
+def feedChunks(parser, data, rnd, now):
+    # 임의 위치에서 나누어 넣음 (같은 시각: 무응답 간격 없음)
+    frames = []
+    pos = 0
+    while pos < len(data):
+        size = rnd.randrange(1, 32)
+        frames += parser.feed(data[pos:pos + size], now)
+        pos += size
+    return frames
+
+def randomNoise(rnd):
+    return bytes(rnd.randrange(256) for _ in range(rnd.randrange(1, 300)))
+
+def truncatedFrame(rnd):
+    frame = dsBench.makeResponseFrame(rnd)
+    return frame[:rnd.randrange(1, len(frame))]
+
+def bitflipFrame(rnd):
+    frame = bytearray(dsBench.makeResponseFrame(rnd))
+    frame[rnd.randrange(len(frame))] ^= 1 << rnd.randrange(8)
+    return bytes(frame)
+
+@pytest.mark.parametrize('make', [randomNoise, truncatedFrame, bitflipFrame],
+                         ids=['random', 'truncated', 'bitflip'])
+@pytest.mark.parametrize('seed', SEEDS)
+def test_bad_data_then_resync(make, seed):
+    # 잘못된 데이터에서 예외가 없고 반환된 프레임은 CRC가 맞으며,
+    # 무응답 간격이 지나면 다음 정상 프레임을 받아야 함
+    rnd = random.Random(seed)
+    for i in range(ITERATIONS):
+        parser = dsFrame.RtuFrameParser()
+        parsed = feedChunks(parser, make(rnd), rnd, 0.0)
+        assert all(dsCrc.checkFrame(frame) for frame in parsed), i
+        frame = dsBench.makeResponseFrame(rnd)
+        assert feedChunks(parser, frame, rnd, parser.gap * 2) == [frame], i
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_clean_stream_any_split(seed):
+    # 정상 프레임만 이어진 스트림은 어떻게 나누어 넣어도 모두 순서대로 분리
+    rnd = random.Random(seed)
+    for i in range(ITERATIONS):
+        frames, stream = dsBench.makeFrameStream(rnd.randrange(1, 20), rnd.randrange(1 << 30))
+        assert feedChunks(dsFrame.RtuFrameParser(), stream, rnd, 0.0) == frames, i
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_noisy_stream_recovery(seed):
+    # 정상 프레임 사이에 잡음 (간격 없음): 잘못된 프레임은 없고 대부분 복구
+    rnd = random.Random(seed)
+    sent = received = 0
+    for i in range(ITERATIONS):
+        frames = [dsBench.makeResponseFrame(rnd) for _ in range(5)]
+        stream = b"".join(frame + bytes(rnd.randrange(256) for _ in range(rnd.randrange(4)))
+                          for frame in frames)
+        parsed = feedChunks(dsFrame.RtuFrameParser(), stream, rnd, 0.0)
+        assert all(dsCrc.checkFrame(frame) for frame in parsed), i
+        sent += len(frames)
+        received += sum(1 for frame in parsed if frame in frames)
+    assert received / sent > 0.7
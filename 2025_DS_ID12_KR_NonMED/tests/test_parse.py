@@ -0,0 +1,63 @@
+""" dsFrame 수신 프레임 분리 (길이 계산, 나누어 넣기, 무응답 간격, CRC 오류) """
+import pytest
+
+import dsBench
+import dsCrc
+import dsFrame
+
+def withCrc(body):
+    return body + dsCrc.crc16Bytes(body)
+
+READ_RESPONSE = withCrc(bytes.fromhex('01040641c4000003e8'))
+WRITE_RESPONSE = withCrc(bytes.fromhex('010610740190'))
+EXCEPTION_RESPONSE = withCrc(bytes.fromhex('018402'))
+
+@pytest.mark.parametrize('frame, length', [(READ_RESPONSE, 11), (WRITE_RESPONSE, 8), (EXCEPTION_RESPONSE, 5)])
+def test_frame_length(frame, length):
+    assert dsFrame.frameLength(frame, 0, len(frame)) == length
+    # 길이를 알기 전에는 헤더가 더 필요
+    assert dsFrame.frameLength(frame, 0, 1) == 0
+
+def test_frame_length_unknown():
+    assert dsFrame.frameLength(b'\x00\x03', 0, 2) == -1    # 응답에 broadcast id 없음
+    assert dsFrame.frameLength(b'\xf8\x03', 0, 2) == -1    # id 248 이상
+    assert dsFrame.frameLength(b'\x01\x07', 0, 2) == -1    # 알 수 없는 기능 코드
+
+def test_silence_time():
+    assert dsFrame.silenceTime(9600) == pytest.approx(3.5 * 11 / 9600)
+    assert dsFrame.silenceTime(115200) == 0.00175
+    # 파서는 USB 어댑터 지연을 고려한 최소 간격 이상
+    assert dsFrame.RtuFrameParser(115200).gap == dsFrame.HOST_GAP_MIN
+
+@pytest.mark.parametrize('chunk', [None, 8, 1], ids=['bulk', 'chunk_8', 'byte'])
+def test_stream(chunk):
+    frames, stream = dsBench.makeFrameStream(500)
+    parser = dsFrame.RtuFrameParser()
+    chunk = chunk or len(stream)
+    parsed = []
+    for i in range(0, len(stream), chunk):
+        parsed += parser.feed(stream[i:i + chunk], 0.0)
+    assert parsed == frames
+    assert parser.pending() == 0
+    assert parser.crc_errors == 0
+
+def test_crc_error_dropped():
+    parser = dsFrame.RtuFrameParser()
+    broken = bytearray(READ_RESPONSE)
+    broken[-1] ^= 0xFF
+    assert parser.feed(bytes(broken), 0.0) == []
+    # 무응답 간격 뒤 다음 프레임은 정상 분리
+    assert parser.feed(WRITE_RESPONSE, 1.0) == [WRITE_RESPONSE]
+    assert parser.crc_errors >= 1
+
+def test_gap_discards_partial_frame():
+    parser = dsFrame.RtuFrameParser()
+    assert parser.feed(READ_RESPONSE[:5], 0.0) == []
+    assert parser.feed(READ_RESPONSE, parser.gap * 2) == [READ_RESPONSE]
+
+def test_request_mode():
+    # 시뮬레이터는 요청 프레임을 분리 (읽기 8 bytes, 여러 레지스터 쓰기는 바이트 수 포함)
+    read = withCrc(bytes.fromhex('01040fcb0003'))
+    write = withCrc(bytes.fromhex('0110106800020400010002'))
+    parser = dsFrame.RtuFrameParser(request=True)
+    assert parser.feed(read + write, 0.0) == [read, write]